@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Parse-stage benchmark for every platform crawler.
+
+Runs each crawler's ``parse_content`` over a recorded HTML corpus (see
+:class:`news_crawler.core.fetchers.RecordingFetcher`) and reports docs/sec,
+p50/p99 latency and peak RSS per platform as JSON.
+
+    python -m benchmarks.parse_bench record --corpus bench_corpus URL [URL ...]
+    python -m benchmarks.parse_bench run --corpus bench_corpus --output run.json
+    python -m benchmarks.parse_bench compare old.json new.json
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import platform as platform_module
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from news_crawler.core.fetchers import RecordingFetcher, iter_corpus
+
+# Twitter is not listed: its "parse" step maps GraphQL API objects rather than
+# HTML, and the API client bypasses the fetch layer, so there is no corpus.
+PLATFORM_CRAWLERS: Dict[str, str] = {
+    "wechat": "news_crawler.wechat_news:WeChatNewsCrawler",
+    "toutiao": "news_crawler.toutiao_news:ToutiaoNewsCrawler",
+    "netease": "news_crawler.netease_news:NeteaseNewsCrawler",
+    "sohu": "news_crawler.sohu_news:SohuNewsCrawler",
+    "tencent": "news_crawler.tencent_news:TencentNewsCrawler",
+    "detik": "news_crawler.detik_news:DetikNewsCrawler",
+    "naver": "news_crawler.naver_news:NaverNewsCrawler",
+    "lenny": "news_crawler.lennysnewsletter:LennysNewsletterCrawler",
+    "quora": "news_crawler.quora:QuoraAnswerCrawler",
+    "bbc": "news_crawler.bbc_news:BBCNewsCrawler",
+    "cnn": "news_crawler.cnn_news:CNNNewsCrawler",
+}
+
+# Sub-steps that are worth tracking on their own: (label, "module:callable").
+# Callables take the HTML string; bound methods are resolved on the crawler.
+PLATFORM_STAGES: Dict[str, List[Tuple[str, str]]] = {
+    "wechat": [("ssr_data", "news_crawler.wechat_news.wechat_news:_parse_ssr_data")],
+    "quora": [("answer_json", "self:extract_answer_json")],
+    "sohu": [("image_json", "self:_extract_images_from_json")],
+}
+
+ENHANCED_PREFIX = "enhanced:"
+
+logger = logging.getLogger("benchmarks.parse_bench")
+
+
+# -------------------------------------------------------------------------- #
+# Crawler construction
+# -------------------------------------------------------------------------- #
+def _import(path: str) -> Any:
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _crawler_class(platform: str) -> type:
+    if platform.startswith(ENHANCED_PREFIX):
+        from news_crawler.sites.enhanced_crawlers import ENHANCED_CRAWLERS
+
+        return ENHANCED_CRAWLERS[platform[len(ENHANCED_PREFIX):]]
+    return _import(PLATFORM_CRAWLERS[platform])
+
+
+def _make_crawler(cls: type, url: str, save_path: str) -> Any:
+    crawler = cls(url, save_path=save_path)
+    crawler.logger.setLevel(logging.WARNING)
+    return crawler
+
+
+def _detect_platform(url: str) -> Optional[str]:
+    from news_extractor_core.services.detector import detect_platform
+
+    platform = detect_platform(url)
+    if platform in PLATFORM_CRAWLERS:
+        return platform
+    from news_crawler.sites.enhanced_crawlers import ENHANCED_CRAWLERS
+
+    host = urlsplit(url).hostname or ""
+    for name, cls in ENHANCED_CRAWLERS.items():
+        base_host = urlsplit(cls.base_url).hostname or ""
+        if base_host and (host == base_host or host.endswith("." + base_host)):
+            return ENHANCED_PREFIX + name
+    return None
+
+
+# -------------------------------------------------------------------------- #
+# Recording
+# -------------------------------------------------------------------------- #
+def record(corpus: Path, urls: List[str], platform: Optional[str]) -> int:
+    """Fetch ``urls`` through each crawler's own fetcher and record them."""
+    failures = 0
+    for url in urls:
+        target = platform or _detect_platform(url)
+        if target is None:
+            logger.error("Cannot detect platform for %s", url)
+            failures += 1
+            continue
+        cls = _crawler_class(target)
+        directory = corpus / target.replace(":", "_")
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                crawler = cls(url, save_path=tmp)
+                crawler.fetcher = RecordingFetcher(crawler.fetcher, directory)
+                crawler.fetch_content()
+            logger.info("Recorded %s -> %s", url, directory)
+        except Exception as exc:
+            logger.error("Failed to record %s: %s", url, exc)
+            failures += 1
+    return failures
+
+
+def _load_documents(directory: Path) -> List[Tuple[str, str]]:
+    documents = []
+    for item in iter_corpus(directory):
+        response = item["response"]
+        if response["status_code"] == 200 and response["text"]:
+            documents.append((item["request"]["url"], response["text"]))
+    return documents
+
+
+def _discover(corpus: Path) -> Dict[str, Path]:
+    platforms = {}
+    for directory in sorted(p for p in corpus.iterdir() if p.is_dir()):
+        name = directory.name
+        if name.startswith("enhanced_"):
+            name = ENHANCED_PREFIX + name[len("enhanced_"):]
+        platforms[name] = directory
+    return platforms
+
+
+# -------------------------------------------------------------------------- #
+# Measurement
+# -------------------------------------------------------------------------- #
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _summarise(latencies: List[float], errors: int) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "docs": len(ordered),
+        "errors": errors,
+        "docs_per_sec": round(len(ordered) / total, 2) if total else 0.0,
+        "mean_ms": round(total / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def _time_calls(
+    calls: List[Callable[[], Any]], repeat: int, warmup: int
+) -> Tuple[List[float], int, Optional[str]]:
+    for _ in range(warmup):
+        for call in calls:
+            try:
+                call()
+            except Exception:
+                pass
+    latencies: List[float] = []
+    errors = 0
+    last_error = None
+    for _ in range(repeat):
+        for call in calls:
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception as exc:
+                errors += 1
+                last_error = f"{type(exc).__name__}: {exc}"
+                continue
+            latencies.append(time.perf_counter() - start)
+    return latencies, errors, last_error
+
+
+def bench_platform(
+    platform: str, directory: str, repeat: int, warmup: int
+) -> Dict[str, Any]:
+    """Benchmark one platform; meant to run in its own process."""
+    logging.disable(logging.INFO)
+    documents = _load_documents(Path(directory))
+    cls = _crawler_class(platform)
+    baseline_rss = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crawlers = [(_make_crawler(cls, url, tmp), html) for url, html in documents]
+        calls = [
+            (lambda c=crawler, h=html: c.parse_content(h)) for crawler, html in crawlers
+        ]
+        latencies, errors, last_error = _time_calls(calls, repeat, warmup)
+        result = _summarise(latencies, errors)
+        if last_error:
+            result["last_error"] = last_error
+
+        stages = {}
+        for label, target in PLATFORM_STAGES.get(platform, []):
+            if target.startswith("self:"):
+                method = target[len("self:"):]
+                stage_calls = [
+                    (lambda c=crawler, h=html: getattr(c, method)(h))
+                    for crawler, html in crawlers
+                ]
+            else:
+                func = _import(target)
+                stage_calls = [(lambda h=html: func(h)) for _, html in crawlers]
+            stage_latencies, stage_errors, _ = _time_calls(stage_calls, repeat, warmup)
+            stages[label] = _summarise(stage_latencies, stage_errors)
+        if stages:
+            result["stages"] = stages
+
+    result["corpus_bytes"] = sum(len(html.encode("utf-8")) for _, html in documents)
+    result["baseline_rss_mb"] = baseline_rss
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    corpus: Path,
+    platforms: Optional[List[str]],
+    repeat: int,
+    warmup: int,
+    isolate: bool,
+) -> Dict[str, Any]:
+    available = _discover(corpus)
+    selected = {k: v for k, v in available.items() if not platforms or k in platforms}
+    results: Dict[str, Any] = {}
+    for name, directory in selected.items():
+        logger.info("Benchmarking %s", name)
+        if isolate:
+            # A fresh process per platform keeps peak RSS attributable.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[name] = pool.submit(
+                    bench_platform, name, str(directory), repeat, warmup
+                ).result()
+        else:
+            results[name] = bench_platform(name, str(directory), repeat, warmup)
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform_module.python_version(),
+            "machine": platform_module.machine(),
+            "corpus": str(corpus),
+            "repeat": repeat,
+            "warmup": warmup,
+            "isolated": isolate,
+        },
+        "results": results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Render a per-platform diff of two ``run`` outputs."""
+
+    def delta(before: float, after: float) -> str:
+        if not before:
+            return "n/a"
+        return f"{(after - before) / before * 100:+.1f}%"
+
+    lines = [
+        f"{'platform':<24}{'docs/s old':>12}{'docs/s new':>12}{'Δ':>9}"
+        f"{'p99 old':>10}{'p99 new':>10}{'Δ':>9}{'rss new':>10}"
+    ]
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        before = old["results"].get(name)
+        after = new["results"].get(name)
+        if before is None or after is None:
+            lines.append(f"{name:<24}{'only in ' + ('new' if before is None else 'old'):>12}")
+            continue
+        lines.append(
+            f"{name:<24}{before['docs_per_sec']:>12}{after['docs_per_sec']:>12}"
+            f"{delta(before['docs_per_sec'], after['docs_per_sec']):>9}"
+            f"{before['p99_ms']:>10}{after['p99_ms']:>10}"
+            f"{delta(before['p99_ms'], after['p99_ms']):>9}{after['peak_rss_mb']:>10}"
+        )
+    return lines
+
+
+# -------------------------------------------------------------------------- #
+# CLI
+# -------------------------------------------------------------------------- #
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="record article pages into a corpus")
+    rec.add_argument("--corpus", type=Path, required=True)
+    rec.add_argument("--platform", help="force the platform instead of detecting it")
+    rec.add_argument("--urls-file", type=Path, help="file with one URL per line")
+    rec.add_argument("urls", nargs="*")
+
+    bench = sub.add_parser("run", help="benchmark parse_content over a corpus")
+    bench.add_argument("--corpus", type=Path, required=True)
+    bench.add_argument("--platform", action="append", dest="platforms")
+    bench.add_argument("--repeat", type=int, default=5)
+    bench.add_argument("--warmup", type=int, default=1)
+    bench.add_argument("--no-isolate", action="store_true", help="run in this process")
+    bench.add_argument("--output", type=Path, help="write JSON results here")
+
+    cmp_parser = sub.add_parser("compare", help="diff two JSON result files")
+    cmp_parser.add_argument("old", type=Path)
+    cmp_parser.add_argument("new", type=Path)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.command == "record":
+        urls = list(args.urls)
+        if args.urls_file:
+            urls += [
+                line.strip()
+                for line in args.urls_file.read_text(encoding="utf-8").splitlines()
+                if line.strip() and not line.startswith("#")
+            ]
+        return 1 if record(args.corpus, urls, args.platform) else 0
+
+    if args.command == "run":
+        report = run(args.corpus, args.platforms, args.repeat, args.warmup, not args.no_isolate)
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output:
+            args.output.write_text(payload, encoding="utf-8")
+        print(payload)
+        return 0
+
+    old = json.loads(args.old.read_text(encoding="utf-8"))
+    new = json.loads(args.new.read_text(encoding="utf-8"))
+    print("\n".join(compare(old, new)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,13 +7,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from parsel import Selector
 from pydantic import Field
 
 from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
@@ -78,11 +78,11 @@ class BBCNewsCrawler(BaseNewsCrawler):
         request.impersonate = "chrome"
         return request
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -90,7 +90,7 @@ class BBCNewsCrawler(BaseNewsCrawler):
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         # Extract publish time from time tag with datetime attribute
         publish_time = sel.xpath('//time/@datetime').get() or \
@@ -109,17 +109,17 @@ class BBCNewsCrawler(BaseNewsCrawler):
             author_url=author_url,
         )
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
         """
         contents = []
-        selector = Selector(text=html_content)
+        selector = self.parse_document(html_content).selector
 
         # BBC content is structured in article tag
         article = selector.xpath('//article')
@@ -205,7 +205,8 @@ class BBCNewsCrawler(BaseNewsCrawler):
         Returns:
             NewsItem: 新闻详情
         """
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
 
         # Get title from h1 tag
         title = selector.xpath('//h1/text()').get("")
@@ -216,8 +217,8 @@ class BBCNewsCrawler(BaseNewsCrawler):
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title.strip(),
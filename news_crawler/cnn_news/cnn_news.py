@@ -7,13 +7,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from parsel import Selector
 from pydantic import Field
 
 from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
@@ -79,11 +79,11 @@ class CNNNewsCrawler(BaseNewsCrawler):
         request.impersonate = "chrome"
         return request
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -91,7 +91,7 @@ class CNNNewsCrawler(BaseNewsCrawler):
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         # Extract publish time from time tag with datetime attribute
         publish_time = sel.xpath('//time/@datetime').get() or ""
@@ -115,17 +115,17 @@ class CNNNewsCrawler(BaseNewsCrawler):
             author_url=author_url,
         )
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
         """
         contents = []
-        selector = Selector(text=html_content)
+        selector = self.parse_document(html_content).selector
 
         # CNN content is in main tag
         main = selector.xpath('//main')
@@ -180,7 +180,8 @@ class CNNNewsCrawler(BaseNewsCrawler):
         Returns:
             NewsItem: 新闻详情
         """
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
 
         # Get title from h1 tag
         title = selector.xpath('//h1/text()').get("")
@@ -191,8 +192,8 @@ class CNNNewsCrawler(BaseNewsCrawler):
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title.strip(),
@@ -4,7 +4,23 @@ Core primitives shared by all news crawler implementations.
 """
 
 from .base import BaseNewsCrawler
-from .fetchers import CurlCffiFetcher, FetchRequest, FetchStrategy, RequestsFetcher
+from .dom import DomBackend, get_dom_backend
+from .document import HtmlSource, ParsedDocument, as_document
+from .fetchers import (
+    AsyncCurlCffiFetcher,
+    AsyncFetchStrategy,
+    CurlCffiFetcher,
+    FetchRequest,
+    FetchResponse,
+    FetchStrategy,
+    HttpxFetcher,
+    RecordingFetcher,
+    ReplayFetcher,
+    RequestsFetcher,
+    iter_corpus,
+    request_key,
+)
+from .http_cache import CachingFetcher, HttpCache, configure_http_cache, get_http_cache
 from .models import (
     DEFAULT_USER_AGENT,
     ContentItem,
@@ -13,19 +29,82 @@ from .models import (
     NewsMetaInfo,
     RequestHeaders,
 )
+from .pipeline import CrawlJob, CrawlPipeline, CrawlResult
 from .protocols import ContentParser
+from .ratelimit import HostRateLimiter, RateLimit, get_rate_limiter
+from .selectors import CompiledSelector, compile_css, compile_xpath
+from .sessions import (
+    SessionPool,
+    SessionPoolConfig,
+    aclose_async_clients,
+    close_session_pools,
+    configure_session_pools,
+    get_async_client,
+    get_session_pool,
+)
+from .sinks import (
+    ItemSink,
+    JsonFileSink,
+    JsonlSink,
+    configure_default_sink,
+    get_default_sink,
+    iter_jsonl,
+    iter_news_items,
+)
+from .urls import canonicalize_url
 
 __all__ = [
+    "AsyncCurlCffiFetcher",
+    "AsyncFetchStrategy",
     "BaseNewsCrawler",
+    "CachingFetcher",
+    "CompiledSelector",
     "ContentItem",
     "ContentParser",
     "ContentType",
+    "CrawlJob",
+    "CrawlPipeline",
+    "CrawlResult",
     "CurlCffiFetcher",
     "DEFAULT_USER_AGENT",
+    "DomBackend",
     "FetchRequest",
+    "FetchResponse",
     "FetchStrategy",
+    "HostRateLimiter",
+    "HtmlSource",
+    "HttpCache",
+    "HttpxFetcher",
+    "ItemSink",
+    "JsonFileSink",
+    "JsonlSink",
     "NewsItem",
     "NewsMetaInfo",
+    "ParsedDocument",
+    "RateLimit",
+    "RecordingFetcher",
+    "ReplayFetcher",
     "RequestHeaders",
     "RequestsFetcher",
+    "SessionPool",
+    "SessionPoolConfig",
+    "aclose_async_clients",
+    "as_document",
+    "canonicalize_url",
+    "close_session_pools",
+    "compile_css",
+    "compile_xpath",
+    "configure_default_sink",
+    "configure_http_cache",
+    "configure_session_pools",
+    "get_async_client",
+    "get_default_sink",
+    "get_dom_backend",
+    "get_http_cache",
+    "get_rate_limiter",
+    "get_session_pool",
+    "iter_corpus",
+    "iter_jsonl",
+    "iter_news_items",
+    "request_key",
 ]
@@ -1,16 +1,26 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional, Type
 
-from tenacity import Retrying, stop_after_attempt, wait_fixed
-
-from .fetchers import CurlCffiFetcher, FetchRequest, FetchStrategy, RequestsFetcher
+from tenacity import AsyncRetrying, Retrying, stop_after_attempt, wait_fixed
+
+from .document import HtmlSource, ParsedDocument, as_document
+from .fetchers import (
+    AsyncCurlCffiFetcher,
+    AsyncFetchStrategy,
+    CurlCffiFetcher,
+    FetchRequest,
+    FetchStrategy,
+    RequestsFetcher,
+)
 from .models import ContentItem, NewsItem, NewsMetaInfo, RequestHeaders
+from .ratelimit import RateLimit, get_rate_limiter
+from .sinks import ItemSink, JsonFileSink, get_default_sink
 
 
 class BaseNewsCrawler(ABC):
@@ -23,10 +33,19 @@ class BaseNewsCrawler(ABC):
 
     headers_model: Type[RequestHeaders] = RequestHeaders
     fetch_strategy: Type[FetchStrategy] = RequestsFetcher
+    async_fetch_strategy: Type[AsyncFetchStrategy] = AsyncCurlCffiFetcher
     fetch_attempts: int = 3
     fetch_wait_seconds: float = 1.0
     fetch_timeout: float = 15.0
+    use_http_cache: bool = False
+    cache_ttl: Optional[float] = None  # seconds served from cache without revalidating
+    http_cache_dir: Optional[str] = None  # None = shared cache under NEWS_CRAWLER_HTTP_CACHE
+    rate_limit: Optional[float] = None  # requests per second per host, None = unlimited
+    rate_burst: int = 1
     persist_by_default: bool = True
+    # False when parse_content relies on state captured by fetch_content, so
+    # CrawlPipeline must parse in-process instead of in a worker process.
+    parse_in_worker: bool = True
 
     def __init__(
         self,
@@ -34,13 +53,18 @@ class BaseNewsCrawler(ABC):
         save_path: str = "data/",
         headers: Optional[RequestHeaders] = None,
         fetcher: Optional[FetchStrategy] = None,
+        afetcher: Optional[AsyncFetchStrategy] = None,
+        sink: Optional[ItemSink] = None,
     ):
         self.new_url = new_url
         self.url = new_url  # Compatibility with legacy usages
         self.save_path = Path(save_path)
+        self.sink = sink  # None: process default, else one JSON file per item
         self.headers_model_instance = headers or self.headers_model()
         self.headers = self.headers_model_instance.to_http_headers()
         self.fetcher = fetcher or self.create_fetcher()
+        self.afetcher = afetcher or self.create_async_fetcher()
+        self.configure_rate_limit()
         self.logger = logging.getLogger(self.__class__.__name__)
         if not self.logger.handlers:
             handler = logging.StreamHandler()
@@ -57,15 +81,41 @@ class BaseNewsCrawler(ABC):
     # ---------------------------------------------------------------------- #
     def create_fetcher(self) -> FetchStrategy:
         """Instantiate the fetch strategy used for this crawler."""
-        return self.fetch_strategy()
+        return self._with_http_cache(self.fetch_strategy())
+
+    def create_async_fetcher(self) -> AsyncFetchStrategy:
+        """Instantiate the async fetch strategy used by :meth:`arun`."""
+        return self._with_http_cache(self.async_fetch_strategy())
+
+    def _with_http_cache(self, fetcher):
+        if not self.use_http_cache:
+            return fetcher
+        from .http_cache import CachingFetcher, get_http_cache  # avoid import cycle
+
+        return CachingFetcher(fetcher, get_http_cache(self.http_cache_dir))
+
+    def get_rate_limit(self) -> Optional[RateLimit]:
+        """Politeness policy for this crawler's host, shared process-wide."""
+        if self.rate_limit is None:
+            return None
+        return RateLimit(rate=self.rate_limit, burst=self.rate_burst)
+
+    def configure_rate_limit(self) -> None:
+        """Register :meth:`get_rate_limit` with the shared per-host limiter."""
+        limit = self.get_rate_limit()
+        if limit is not None and self.new_url:
+            get_rate_limiter().configure(self.new_url, limit)
 
     def build_fetch_request(self) -> FetchRequest:
         """Produce the request parameters for the fetcher."""
-        return FetchRequest(
+        request = FetchRequest(
             url=self.new_url,
             headers=self.headers,
             timeout=self.fetch_timeout,
         )
+        if self.cache_ttl is not None:
+            request.extras["cache_ttl"] = self.cache_ttl
+        return request
 
     def fetch_content(self) -> str:
         """Fetch remote HTML with retry semantics."""
@@ -81,6 +131,20 @@ class BaseNewsCrawler(ABC):
         self.logger.info("Start to fetch content from %s", request.url)
         return self.fetcher.fetch(request)
 
+    async def afetch_content(self) -> str:
+        """Async variant of :meth:`fetch_content` with the same retry policy."""
+        request = self.build_fetch_request()
+        retryer = AsyncRetrying(
+            stop=stop_after_attempt(self.fetch_attempts),
+            wait=wait_fixed(self.fetch_wait_seconds),
+            reraise=True,
+        )
+        return await retryer(self._afetch_once, request)
+
+    async def _afetch_once(self, request: FetchRequest) -> str:
+        self.logger.info("Start to fetch content from %s", request.url)
+        return await self.afetcher.afetch(request)
+
     # ---------------------------------------------------------------------- #
     # Parsing
     # ---------------------------------------------------------------------- #
@@ -88,6 +152,16 @@ class BaseNewsCrawler(ABC):
     def parse_content(self, html: str) -> NewsItem:
         """Convert raw HTML into a NewsItem."""
 
+    def parse_document(self, source: HtmlSource) -> ParsedDocument:
+        """
+        Return the parsed document for ``source``.
+
+        ``parse_content`` calls this once and hands the document to the
+        title/meta/content hooks; hooks call it again on their argument, which
+        is a no-op for documents and keeps them usable with raw HTML.
+        """
+        return as_document(source, self.new_url)
+
     # ---------------------------------------------------------------------- #
     # Validation & persistence
     # ---------------------------------------------------------------------- #
@@ -96,15 +170,20 @@ class BaseNewsCrawler(ABC):
         if not news_item.contents and not news_item.texts:
             raise ValueError(f"Empty content for article: {news_item.title}")
 
+    def get_sink(self) -> Optional[ItemSink]:
+        """Sink configured for this crawler, falling back to the process default."""
+        return self.sink if self.sink is not None else get_default_sink()
+
+    def save_item(self, news_item: NewsItem) -> str:
+        """Persist the NewsItem through the configured sink."""
+        sink = self.get_sink()
+        if sink is None:
+            return str(self.save_as_json(news_item))
+        return sink.write(news_item, self.get_article_id())
+
     def save_as_json(self, news_item: NewsItem) -> Path:
-        """Persist the NewsItem as JSON."""
-        self.save_path.mkdir(parents=True, exist_ok=True)
-        path = self.save_path / f"{self.get_article_id()}.json"
-        path.write_text(
-            json.dumps(news_item.to_dict(), ensure_ascii=False, indent=4),
-            encoding="utf-8",
-        )
-        return path
+        """Persist the NewsItem as a standalone JSON file under ``save_path``."""
+        return Path(JsonFileSink(self.save_path).write(news_item, self.get_article_id()))
 
     def run(self, persist: Optional[bool] = None) -> NewsItem:
         """Full crawling pipeline."""
@@ -113,7 +192,23 @@ class BaseNewsCrawler(ABC):
         news_item = self.parse_content(html)
         self.validate_item(news_item)
         if should_persist:
-            self.save_as_json(news_item)
+            self.save_item(news_item)
+        self.logger.info("Success to get content from %s", self.new_url)
+        return news_item
+
+    async def arun(self, persist: Optional[bool] = None) -> NewsItem:
+        """
+        Async crawling pipeline.
+
+        Fetching happens on the event loop; parsing and persistence are CPU/disk
+        bound and run in worker threads so many crawlers can share one loop.
+        """
+        should_persist = self.persist_by_default if persist is None else persist
+        html = await self.afetch_content()
+        news_item = await asyncio.to_thread(self.parse_content, html)
+        self.validate_item(news_item)
+        if should_persist:
+            await asyncio.to_thread(self.save_item, news_item)
         self.logger.info("Success to get content from %s", self.new_url)
         return news_item
 
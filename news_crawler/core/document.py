@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Union
+
+from .selectors import CompiledSelector
+
+
+class ParsedDocument:
+    """
+    One fetched page, parsed at most once.
+
+    The lxml tree behind :attr:`selector` is built lazily on first access and
+    then shared by every title/meta/content hook, so a crawler that consults
+    the DOM from several places still pays for a single parse. Queries on it
+    use the precompiled expressions from :mod:`.selectors`. Values derived
+    from the raw HTML (embedded JSON, regex matches) can be cached alongside
+    it with :meth:`memo`.
+    """
+
+    __slots__ = ("html", "url", "_selector", "_memo")
+
+    def __init__(self, html: str, url: str = ""):
+        self.html = html
+        self.url = url
+        self._selector: Optional[CompiledSelector] = None
+        self._memo: Dict[str, Any] = {}
+
+    @property
+    def selector(self) -> CompiledSelector:
+        if self._selector is None:
+            self._selector = CompiledSelector(text=self.html)
+        return self._selector
+
+    def memo(self, key: str, factory: Callable[[str], Any]) -> Any:
+        """Return ``factory(html)``, computing it only once per document."""
+        if key not in self._memo:
+            self._memo[key] = factory(self.html)
+        return self._memo[key]
+
+    def __str__(self) -> str:
+        return self.html
+
+
+HtmlSource = Union[str, ParsedDocument]
+
+
+def as_document(source: HtmlSource, url: str = "") -> ParsedDocument:
+    """Wrap raw HTML in a :class:`ParsedDocument`; documents pass through."""
+    if isinstance(source, ParsedDocument):
+        return source
+    return ParsedDocument(source, url)
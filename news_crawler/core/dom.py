@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Type
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from .selectors import compile_css, compile_soup_css, compile_xpath
+
+DEFAULT_DOM_BACKEND = os.getenv("NEWS_CRAWLER_DOM_BACKEND", "lxml")
+
+# BeautifulSoup's get_text() skips these; every backend matches that.
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+
+class DomBackend(ABC):
+    """
+    Minimal DOM interface used by selector-driven crawlers.
+
+    Semantics follow the BeautifulSoup calls the crawlers were written
+    against: CSS selection in document order, ``text`` behaves like
+    ``get_text(strip=True)`` and ``remove`` keeps the text that follows the
+    removed node.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def parse(self, html: str) -> Any:
+        """Parse ``html`` into this backend's document root."""
+
+    @abstractmethod
+    def select(self, root: Any, css: str) -> List[Any]:
+        """Nodes under ``root`` matching ``css``, in document order."""
+
+    def select_one(self, root: Any, css: str) -> Optional[Any]:
+        matches = self.select(root, css)
+        return matches[0] if matches else None
+
+    @abstractmethod
+    def remove(self, node: Any) -> None:
+        """Detach ``node``, keeping the text that follows it."""
+
+    @abstractmethod
+    def text(self, node: Any) -> str:
+        """Stripped text content, like ``get_text(strip=True)``."""
+
+    @abstractmethod
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        """Attribute ``name`` of ``node``, or ``None`` when missing."""
+
+    @abstractmethod
+    def tag(self, node: Any) -> str:
+        """Tag name of ``node``."""
+
+    @abstractmethod
+    def descendants(self, node: Any, tags: Iterable[str]) -> List[Any]:
+        """Descendants (not ``node`` itself) with one of ``tags``, in order."""
+
+
+class LxmlBackend(DomBackend):
+    """lxml.html tree queried with precompiled cssselect XPath."""
+
+    name = "lxml"
+    _text_xpath = compile_xpath(
+        "descendant-or-self::text()"
+        "[not(ancestor::script or ancestor::style or ancestor::template)]"
+    )
+
+    def parse(self, html: str) -> Any:
+        try:
+            return lxml_html.document_fromstring(html)
+        except ValueError:
+            # Unicode input with an XML encoding declaration.
+            parser = lxml_html.HTMLParser(encoding="utf-8")
+            return lxml_html.document_fromstring(html.encode("utf-8"), parser=parser)
+        except etree.ParserError:
+            return lxml_html.document_fromstring("<html></html>")
+
+    def select(self, root: Any, css: str) -> List[Any]:
+        return compile_css(css)(root)
+
+    def remove(self, node: Any) -> None:
+        if node.getparent() is not None:
+            node.drop_tree()
+
+    def text(self, node: Any) -> str:
+        return "".join(part.strip() for part in self._text_xpath(node))
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.get(name)
+
+    def tag(self, node: Any) -> str:
+        return node.tag
+
+    def descendants(self, node: Any, tags: Iterable[str]) -> List[Any]:
+        return [el for el in node.iter(*tags) if el is not node]
+
+
+class SelectolaxBackend(DomBackend):
+    """Lexbor tree from selectolax; fastest, needs the optional dependency."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("selectolax is required for this DOM backend") from exc
+        self._parser_cls = LexborHTMLParser
+
+    def parse(self, html: str) -> Any:
+        return self._parser_cls(html).root
+
+    def select(self, root: Any, css: str) -> List[Any]:
+        return root.css(css)
+
+    def select_one(self, root: Any, css: str) -> Optional[Any]:
+        return root.css_first(css)
+
+    def remove(self, node: Any) -> None:
+        node.decompose()
+
+    def text(self, node: Any) -> str:
+        return "".join(
+            child.text_content.strip()
+            for child in node.traverse(include_text=True)
+            if child.tag == "-text"
+            and child.text_content
+            and child.parent is not None
+            and child.parent.tag not in _NON_TEXT_TAGS
+        )
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+    def tag(self, node: Any) -> str:
+        return node.tag
+
+    def descendants(self, node: Any, tags: Iterable[str]) -> List[Any]:
+        wanted = set(tags)
+        nodes = iter(node.traverse())
+        next(nodes, None)  # traverse() starts with the node itself
+        return [child for child in nodes if child.tag in wanted]
+
+
+class SoupBackend(DomBackend):
+    """The original BeautifulSoup implementation, kept for comparison."""
+
+    name = "bs4"
+
+    def parse(self, html: str) -> Any:
+        from bs4 import BeautifulSoup
+
+        return BeautifulSoup(html, "lxml")
+
+    def select(self, root: Any, css: str) -> List[Any]:
+        return compile_soup_css(css).select(root)
+
+    def select_one(self, root: Any, css: str) -> Optional[Any]:
+        return compile_soup_css(css).select_one(root)
+
+    def remove(self, node: Any) -> None:
+        node.decompose()
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node: Any, name: str) -> Optional[str]:
+        value = node.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+    def tag(self, node: Any) -> str:
+        return node.name
+
+    def descendants(self, node: Any, tags: Iterable[str]) -> List[Any]:
+        return node.find_all(list(tags))
+
+
+DOM_BACKENDS: Dict[str, Type[DomBackend]] = {
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+    "bs4": SoupBackend,
+}
+
+_backends: Dict[str, DomBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_dom_backend(name: Optional[str] = None) -> DomBackend:
+    """Return the shared backend instance registered under ``name``."""
+    name = name or DEFAULT_DOM_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        try:
+            backend_cls = DOM_BACKENDS[name]
+        except KeyError:
+            raise ValueError(f"Unknown DOM backend: {name}") from None
+        with _backends_lock:
+            backend = _backends.setdefault(name, backend_cls())
+    return backend
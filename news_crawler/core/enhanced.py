@@ -4,13 +4,14 @@
 from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass, field
 import random
-import time
 import hashlib
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 
 from news_crawler.core.base import BaseNewsCrawler
 from news_crawler.core.models import NewsItem, NewsMetaInfo, ContentItem, ContentType
+from news_crawler.core.ratelimit import RateLimit
+from news_crawler.core.dom import DomBackend, get_dom_backend
+from news_crawler.core.selectors import compile_css
 
 
 @dataclass
@@ -40,6 +41,23 @@ class SelectorConfig:
     
     # 自定义提取规则
     custom_extractors: Dict[str, Any] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        # 配置多在模块导入时创建，此时预编译全部选择器，解析时不再重复编译
+        for selector in self.selectors():
+            compile_css(selector)
+    
+    def selectors(self) -> List[str]:
+        """返回配置中的全部CSS选择器"""
+        values = [
+            value for name, value in vars(self).items()
+            if name.startswith(('list_', 'article_')) and isinstance(value, str)
+        ]
+        return values + list(self.remove_selectors)
+
+
+# 正文中按顺序提取的元素
+CONTENT_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'img', 'video']
 
 
 @dataclass
@@ -85,6 +103,13 @@ class EnhancedNewsCrawler(BaseNewsCrawler):
     base_url: str = ""
     selector_config: Optional[SelectorConfig] = None
     anti_crawler_config: Optional[AntiCrawlerConfig] = None
+    # DOM 解析后端：lxml（默认）、selectolax（需额外安装）、bs4（旧实现）
+    dom_backend: Optional[str] = None
+    
+    # 未配置对应选择器时依次尝试的常见选择器
+    TITLE_FALLBACKS = ['h1.title', 'h1', '.article-title', '#article-title']
+    AUTHOR_FALLBACKS = ['.author', '.byline', '[itemprop="author"]', '.article-author']
+    DATE_FALLBACKS = ['time', '.publish-time', '.date', '[itemprop="datePublished"]']
     
     def __init__(self, new_url: str = "", save_path: str = 'data/', **kwargs):
         # 如果没有提供new_url，使用base_url
@@ -99,8 +124,11 @@ class EnhancedNewsCrawler(BaseNewsCrawler):
         if self.anti_crawler_config is None:
             self.anti_crawler_config = AntiCrawlerConfig()
         
+        self.dom: DomBackend = get_dom_backend(self.dom_backend)
+        
         # 应用反爬配置
         self._apply_anti_crawler_config()
+        self.configure_rate_limit()
     
     def _apply_anti_crawler_config(self):
         """应用反爬配置到headers"""
@@ -119,34 +147,39 @@ class EnhancedNewsCrawler(BaseNewsCrawler):
             cookie_str = '; '.join([f"{k}={v}" for k, v in config.cookies.items()])
             self.headers['Cookie'] = cookie_str
     
-    def _random_delay(self):
-        """随机延迟"""
+    def get_rate_limit(self) -> Optional[RateLimit]:
+        """
+        将反爬延迟配置转换为按主机共享的令牌桶限速
+        同一主机的所有爬虫实例共享间隔 min_delay ~ max_delay，空闲时不再等待
+        """
+        if self.rate_limit is not None:
+            return super().get_rate_limit()
         config = self.anti_crawler_config
-        delay = random.uniform(config.min_delay, config.max_delay)
-        time.sleep(delay)
-    
-    def fetch_content(self) -> str:
-        """重写fetch_content，添加延迟"""
-        self._random_delay()
-        return super().fetch_content()
+        if config is None or config.min_delay <= 0:
+            return None
+        return RateLimit(
+            rate=1.0 / config.min_delay,
+            burst=self.rate_burst,
+            jitter=max(0.0, config.max_delay - config.min_delay),
+        )
     
     def parse_content(self, html: str) -> NewsItem:
         """解析HTML内容"""
-        soup = BeautifulSoup(html, 'lxml')
+        root = self.dom.parse(html)
         
         # 移除不需要的元素
-        self._remove_unwanted_elements(soup)
+        self._remove_unwanted_elements(root)
         
         # 提取文章信息
-        title = self._extract_title(soup)
-        subtitle = self._extract_subtitle(soup)
-        author = self._extract_author(soup)
-        date = self._extract_date(soup)
-        source = self._extract_source(soup)
-        tags = self._extract_tags(soup)
+        title = self._extract_title(root)
+        subtitle = self._extract_subtitle(root)
+        author = self._extract_author(root)
+        date = self._extract_date(root)
+        source = self._extract_source(root)
+        tags = self._extract_tags(root)
         
         # 提取内容
-        contents = self._extract_contents(soup)
+        contents = self._extract_contents(root)
         
         # 构建 meta_info
         meta_info = NewsMetaInfo(
@@ -167,138 +200,133 @@ class EnhancedNewsCrawler(BaseNewsCrawler):
         
         return news_item
     
-    def _remove_unwanted_elements(self, soup: BeautifulSoup):
+    def _remove_unwanted_elements(self, root: Any):
         """移除不需要的元素"""
         for selector in self.selector_config.remove_selectors:
-            for elem in soup.select(selector):
-                elem.decompose()
+            for elem in self.dom.select(root, selector):
+                self.dom.remove(elem)
     
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _select_text(self, root: Any, selector: Optional[str]) -> Optional[str]:
+        """返回选择器命中的第一个元素的文本"""
+        if selector:
+            elem = self.dom.select_one(root, selector)
+            if elem is not None:
+                return self.dom.text(elem)
+        return None
+    
+    def _extract_title(self, root: Any) -> str:
         """提取标题"""
-        if self.selector_config.article_title:
-            elem = soup.select_one(self.selector_config.article_title)
-            if elem:
-                return elem.get_text(strip=True)
+        title = self._select_text(root, self.selector_config.article_title)
+        if title is not None:
+            return title
         
         # 默认尝试常见选择器
-        for selector in ['h1.title', 'h1', '.article-title', '#article-title']:
-            elem = soup.select_one(selector)
-            if elem:
-                return elem.get_text(strip=True)
+        for selector in self.TITLE_FALLBACKS:
+            title = self._select_text(root, selector)
+            if title is not None:
+                return title
         
         return "Untitled"
     
-    def _extract_subtitle(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_subtitle(self, root: Any) -> Optional[str]:
         """提取副标题"""
-        if self.selector_config.article_subtitle:
-            elem = soup.select_one(self.selector_config.article_subtitle)
-            if elem:
-                return elem.get_text(strip=True)
-        return None
+        return self._select_text(root, self.selector_config.article_subtitle)
     
-    def _extract_author(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_author(self, root: Any) -> Optional[str]:
         """提取作者"""
-        if self.selector_config.article_author:
-            elem = soup.select_one(self.selector_config.article_author)
-            if elem:
-                return elem.get_text(strip=True)
+        author = self._select_text(root, self.selector_config.article_author)
+        if author is not None:
+            return author
         
         # 尝试常见选择器
-        for selector in ['.author', '.byline', '[itemprop="author"]', '.article-author']:
-            elem = soup.select_one(selector)
-            if elem:
-                return elem.get_text(strip=True)
+        for selector in self.AUTHOR_FALLBACKS:
+            author = self._select_text(root, selector)
+            if author is not None:
+                return author
         
         return None
     
-    def _extract_date(self, soup: BeautifulSoup) -> Optional[str]:
+    def _date_of(self, elem: Any) -> str:
+        # 尝试从 datetime 属性获取
+        return self.dom.attr(elem, 'datetime') or self.dom.text(elem)
+    
+    def _extract_date(self, root: Any) -> Optional[str]:
         """提取发布时间"""
         if self.selector_config.article_date:
-            elem = soup.select_one(self.selector_config.article_date)
-            if elem:
-                # 尝试从 datetime 属性获取
-                if elem.get('datetime'):
-                    return elem.get('datetime')
-                return elem.get_text(strip=True)
+            elem = self.dom.select_one(root, self.selector_config.article_date)
+            if elem is not None:
+                return self._date_of(elem)
         
         # 尝试常见选择器
-        for selector in ['time', '.publish-time', '.date', '[itemprop="datePublished"]']:
-            elem = soup.select_one(selector)
-            if elem:
-                if elem.get('datetime'):
-                    return elem.get('datetime')
-                return elem.get_text(strip=True)
+        for selector in self.DATE_FALLBACKS:
+            elem = self.dom.select_one(root, selector)
+            if elem is not None:
+                return self._date_of(elem)
         
         return None
     
-    def _extract_source(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_source(self, root: Any) -> Optional[str]:
         """提取来源"""
-        if self.selector_config.article_source:
-            elem = soup.select_one(self.selector_config.article_source)
-            if elem:
-                return elem.get_text(strip=True)
-        return None
+        return self._select_text(root, self.selector_config.article_source)
     
-    def _extract_tags(self, soup: BeautifulSoup) -> Optional[List[str]]:
+    def _extract_tags(self, root: Any) -> Optional[List[str]]:
         """提取标签"""
         if self.selector_config.article_tags:
             tags = []
-            for elem in soup.select(self.selector_config.article_tags):
-                tag = elem.get_text(strip=True)
+            for elem in self.dom.select(root, self.selector_config.article_tags):
+                tag = self.dom.text(elem)
                 if tag:
                     tags.append(tag)
             return tags if tags else None
         return None
     
-    def _extract_contents(self, soup: BeautifulSoup) -> List[ContentItem]:
+    def _absolute_url(self, url: str) -> str:
+        # 处理相对路径
+        if url.startswith('//'):
+            return 'https:' + url
+        if url.startswith('/'):
+            return self.base_url + url
+        return url
+    
+    def _extract_contents(self, root: Any) -> List[ContentItem]:
         """提取文章内容"""
         contents = []
+        dom = self.dom
         
         # 提取正文
         if self.selector_config.article_content:
-            content_elem = soup.select_one(self.selector_config.article_content)
-            if content_elem:
+            content_elem = dom.select_one(root, self.selector_config.article_content)
+            if content_elem is not None:
                 # 遍历内容元素，保持结构
-                for elem in content_elem.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'img', 'video']):
-                    if elem.name == 'img':
+                for elem in dom.descendants(content_elem, CONTENT_TAGS):
+                    tag = dom.tag(elem)
+                    if tag == 'img':
                         # 图片
-                        src = elem.get('src') or elem.get('data-src')
+                        src = dom.attr(elem, 'src') or dom.attr(elem, 'data-src')
                         if src:
-                            # 处理相对路径
-                            if src.startswith('//'):
-                                src = 'https:' + src
-                            elif src.startswith('/'):
-                                src = self.base_url + src
-                            
                             contents.append(ContentItem(
                                 type=ContentType.IMAGE,
-                                content=src,
-                                caption=elem.get('alt', '')
+                                content=self._absolute_url(src),
+                                caption=dom.attr(elem, 'alt') or ''
                             ))
                     
-                    elif elem.name == 'video':
+                    elif tag == 'video':
                         # 视频
-                        src = elem.get('src') or elem.find('source', src=True)
-                        if src:
-                            if isinstance(src, str):
-                                video_url = src
-                            else:
-                                video_url = src.get('src')
-                            
-                            # 处理相对路径
-                            if video_url.startswith('//'):
-                                video_url = 'https:' + video_url
-                            elif video_url.startswith('/'):
-                                video_url = self.base_url + video_url
-                            
+                        video_url = dom.attr(elem, 'src')
+                        if not video_url:
+                            for source in dom.descendants(elem, ['source']):
+                                video_url = dom.attr(source, 'src')
+                                if video_url:
+                                    break
+                        if video_url:
                             contents.append(ContentItem(
                                 type=ContentType.VIDEO,
-                                content=video_url
+                                content=self._absolute_url(video_url)
                             ))
                     
                     else:
                         # 文本段落
-                        text = elem.get_text(strip=True)
+                        text = dom.text(elem)
                         if text:
                             contents.append(ContentItem(
                                 type=ContentType.TEXT,
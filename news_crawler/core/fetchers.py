@@ -1,9 +1,23 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
+import gzip
+import hashlib
+import json
 import logging
-from dataclasses import dataclass, field
-from typing import Mapping, MutableMapping, Optional, Protocol
+import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Mapping, MutableMapping, Optional, Protocol, Tuple, Union
+from urllib.parse import urlencode
+
+from .ratelimit import HostRateLimiter, get_rate_limiter
+from .sessions import SessionPool, get_async_client, get_session_pool
+from .urls import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +38,16 @@ class FetchRequest:
     extras: MutableMapping[str, object] = field(default_factory=dict)
 
 
+@dataclass
+class FetchResponse:
+    """Decoded HTTP response returned by a fetch strategy."""
+
+    url: str
+    status_code: int
+    text: str
+    headers: Mapping[str, str] = field(default_factory=dict)
+
+
 class FetchStrategy(Protocol):
     """Strategy interface for fetching raw content."""
 
@@ -31,55 +55,267 @@ class FetchStrategy(Protocol):
         ...
 
 
-class RequestsFetcher(FetchStrategy):
-    """Default fetcher implemented with the `requests` library."""
+class AsyncFetchStrategy(Protocol):
+    """Asynchronous counterpart of :class:`FetchStrategy`."""
+
+    async def afetch(self, request: FetchRequest) -> str:
+        ...
+
+
+def request_key(request: FetchRequest) -> str:
+    """Key a request by method, canonical URL and query parameters."""
+    key = f"{request.method.upper()} {canonicalize_url(request.url)}"
+    if request.params:
+        key += "?" + urlencode(sorted(request.params.items()))
+    return key
+
+
+def _ensure_ok(response: FetchResponse) -> str:
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to fetch content: {response.status_code}")
+    return response.text
+
+
+def _to_fetch_response(response) -> FetchResponse:
+    """Normalise a requests/curl_cffi/httpx response into a FetchResponse."""
+    if not response.encoding:
+        response.encoding = "utf-8"
+    return FetchResponse(
+        url=str(response.url),
+        status_code=response.status_code,
+        text=response.text,
+        headers={k.lower(): v for k, v in response.headers.items()},
+    )
+
+
+def _curl_cffi_kwargs(request: FetchRequest) -> dict:
+    kwargs = {
+        "headers": request.headers,
+        "timeout": request.timeout,
+        "allow_redirects": request.allow_redirects,
+        "params": request.params,
+        "data": request.data,
+        "cookies": request.cookies,
+    }
+    impersonate = request.impersonate or request.extras.get("impersonate")
+    if impersonate:
+        kwargs["impersonate"] = impersonate
+    return kwargs
+
+
+class _RateLimitedFetcher:
+    """Mixin consulting the shared per-host rate limiter around each request."""
+
+    def __init__(self, limiter: Optional[HostRateLimiter] = None):
+        self.limiter = limiter or get_rate_limiter()
+
+    def _report(self, request: FetchRequest, response: FetchResponse) -> FetchResponse:
+        self.limiter.feedback(
+            request.url, response.status_code, response.headers.get("retry-after")
+        )
+        return response
+
+
+class RequestsFetcher(_RateLimitedFetcher, FetchStrategy):
+    """Default fetcher implemented with pooled `requests` sessions."""
+
+    def __init__(
+        self,
+        pool: Optional[SessionPool] = None,
+        limiter: Optional[HostRateLimiter] = None,
+    ):
+        super().__init__(limiter)
+        self.pool = pool or get_session_pool("requests")
+
+    def fetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(self.fetch_response(request))
+
+    def fetch_response(self, request: FetchRequest) -> FetchResponse:
+        """Perform the request and return the response without status checks."""
+        self.limiter.acquire(request.url)
+        with self.pool.session(request.url) as session:
+            response = session.request(
+                method=request.method,
+                url=request.url,
+                headers=request.headers,
+                timeout=request.timeout,
+                allow_redirects=request.allow_redirects,
+                params=request.params,
+                data=request.data,
+                cookies=request.cookies,
+            )
+            return self._report(request, _to_fetch_response(response))
+
+
+class CurlCffiFetcher(_RateLimitedFetcher, FetchStrategy):
+    """Fetcher backed by pooled curl_cffi sessions for browser impersonation."""
+
+    def __init__(
+        self,
+        pool: Optional[SessionPool] = None,
+        limiter: Optional[HostRateLimiter] = None,
+    ):
+        super().__init__(limiter)
+        self.pool = pool or get_session_pool("curl_cffi")
 
     def fetch(self, request: FetchRequest) -> str:
-        from requests import request as http_request  # lazy import
+        return _ensure_ok(self.fetch_response(request))
+
+    def fetch_response(self, request: FetchRequest) -> FetchResponse:
+        """Perform the request and return the response without status checks."""
+        self.limiter.acquire(request.url)
+        with self.pool.session(request.url) as session:
+            response = session.request(
+                method=request.method,
+                url=request.url,
+                **_curl_cffi_kwargs(request),
+            )
+            return self._report(request, _to_fetch_response(response))
+
+
+class AsyncCurlCffiFetcher(_RateLimitedFetcher, AsyncFetchStrategy):
+    """Async fetcher sharing one curl_cffi ``AsyncSession`` per event loop."""
 
-        response = http_request(
+    async def afetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(await self.afetch_response(request))
+
+    async def afetch_response(self, request: FetchRequest) -> FetchResponse:
+        """Perform the request and return the response without status checks."""
+        await self.limiter.aacquire(request.url)
+        session = get_async_client("curl_cffi")
+        response = await session.request(
+            method=request.method,
+            url=request.url,
+            **_curl_cffi_kwargs(request),
+        )
+        return self._report(request, _to_fetch_response(response))
+
+
+class HttpxFetcher(_RateLimitedFetcher, AsyncFetchStrategy):
+    """Async fetcher sharing one ``httpx.AsyncClient`` per event loop."""
+
+    async def afetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(await self.afetch_response(request))
+
+    async def afetch_response(self, request: FetchRequest) -> FetchResponse:
+        """Perform the request and return the response without status checks."""
+        await self.limiter.aacquire(request.url)
+        client = get_async_client("httpx")
+        response = await client.request(
             method=request.method,
             url=request.url,
             headers=request.headers,
             timeout=request.timeout,
-            allow_redirects=request.allow_redirects,
+            follow_redirects=request.allow_redirects,
             params=request.params,
             data=request.data,
             cookies=request.cookies,
         )
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to fetch content: {response.status_code}")
-        response.encoding = response.encoding or "utf-8"
-        return response.text
+        return self._report(request, _to_fetch_response(response))
+
 
+# -------------------------------------------------------------------------- #
+# Record / replay
+# -------------------------------------------------------------------------- #
+def _corpus_path(directory: Path, request: FetchRequest) -> Path:
+    digest = hashlib.sha256(request_key(request).encode("utf-8")).hexdigest()
+    return directory / f"{digest}.json.gz"
 
-class CurlCffiFetcher(FetchStrategy):
-    """Fetcher backed by curl_cffi for high-fidelity browser impersonation."""
+
+def iter_corpus(directory: Union[str, Path]) -> Iterator[dict]:
+    """Yield every recorded ``{"request": ..., "response": ...}`` pair."""
+    for path in sorted(Path(directory).glob("*.json.gz")):
+        yield json.loads(gzip.decompress(path.read_bytes()))
+
+
+class RecordingFetcher(FetchStrategy):
+    """
+    Pass-through fetcher that saves every response to a corpus directory.
+
+    Each request/response pair is stored as gzip-compressed JSON named by the
+    sha256 of :func:`request_key`, so :class:`ReplayFetcher` can serve the
+    corpus back offline. Non-200 responses are recorded too.
+    """
+
+    def __init__(self, inner, directory: Union[str, Path]):
+        self.inner = inner
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _record(self, request: FetchRequest, response: FetchResponse) -> FetchResponse:
+        record = {
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "params": dict(request.params or {}),
+            },
+            "response": asdict(response),
+            "recorded_at": time.time(),
+        }
+        path = _corpus_path(self.directory, request)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(gzip.compress(json.dumps(record, ensure_ascii=False).encode("utf-8")))
+        os.replace(tmp, path)
+        return response
 
     def fetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(self.fetch_response(request))
+
+    def fetch_response(self, request: FetchRequest) -> FetchResponse:
+        return self._record(request, self.inner.fetch_response(request))
+
+    async def afetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(await self.afetch_response(request))
+
+    async def afetch_response(self, request: FetchRequest) -> FetchResponse:
+        response = await self.inner.afetch_response(request)
+        return await asyncio.to_thread(self._record, request, response)
+
+
+class ReplayFetcher(FetchStrategy):
+    """
+    Serve responses from a corpus written by :class:`RecordingFetcher`.
+
+    ``latency`` injects a delay per request: either a fixed number of seconds
+    or a ``(low, high)`` range sampled uniformly, to mimic network time under
+    load without any network access. Unrecorded requests raise RuntimeError.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        latency: Union[float, Tuple[float, float]] = 0.0,
+    ):
+        self.directory = Path(directory)
+        self.latency = latency
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            return random.uniform(*self.latency)
+        return float(self.latency)
+
+    def _load(self, request: FetchRequest) -> FetchResponse:
+        path = _corpus_path(self.directory, request)
         try:
-            from curl_cffi import requests as curl_requests
-        except ImportError as exc:  # pragma: no cover - optional dependency
-            raise RuntimeError("curl_cffi is required for this fetcher") from exc
-
-        kwargs = {
-            "headers": request.headers,
-            "timeout": request.timeout,
-            "allow_redirects": request.allow_redirects,
-            "params": request.params,
-            "data": request.data,
-            "cookies": request.cookies,
-        }
-        impersonate = request.impersonate or request.extras.get("impersonate")
-        if impersonate:
-            kwargs["impersonate"] = impersonate
+            record = json.loads(gzip.decompress(path.read_bytes()))
+        except FileNotFoundError as exc:
+            raise RuntimeError(f"No recorded response for {request.url}") from exc
+        return FetchResponse(**record["response"])
 
-        response = curl_requests.request(
-            method=request.method,
-            url=request.url,
-            **kwargs,
-        )
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to fetch content: {response.status_code}")
-        response.encoding = response.encoding or "utf-8"
-        return response.text
+    def fetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(self.fetch_response(request))
+
+    def fetch_response(self, request: FetchRequest) -> FetchResponse:
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._load(request)
+
+    async def afetch(self, request: FetchRequest) -> str:
+        return _ensure_ok(await self.afetch_response(request))
+
+    async def afetch_response(self, request: FetchRequest) -> FetchResponse:
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._load(request)
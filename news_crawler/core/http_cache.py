@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .fetchers import (
+    FetchRequest,
+    FetchResponse,
+    FetchStrategy,
+    _ensure_ok,
+    request_key,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv("NEWS_CRAWLER_HTTP_CACHE", "data/.http_cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_STORED_HEADERS = ("etag", "last-modified", "content-type")
+
+
+@dataclass
+class CacheEntry:
+    """Cached body plus the validators needed to revalidate it."""
+
+    url: str
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    stored_at: float = 0.0
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+
+class HttpCache:
+    """
+    Size-bounded on-disk store of HTTP responses.
+
+    Each entry is one gzip-compressed JSON file named by the key's sha256.
+    File mtimes record the last access, so LRU order survives restarts; the
+    in-memory index is rebuilt from the directory on first use.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: float = 0.0,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.json.gz"
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        if self._index is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            index: Dict[str, Tuple[int, float]] = {}
+            for path in self.directory.glob("*.json.gz"):
+                stat = path.stat()
+                index[path.name[: -len(".json.gz")]] = (stat.st_size, stat.st_mtime)
+            self._index = index
+            self._total = sum(size for size, _ in index.values())
+        return self._index
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        digest = self._digest(key)
+        path = self._path(digest)
+        with self._lock:
+            if digest not in self._load_index():
+                return None
+        # File I/O happens outside the lock; a concurrent put replaces the
+        # file atomically, so we read either the old or the new entry.
+        try:
+            data = json.loads(gzip.decompress(path.read_bytes()))
+            now = time.time()
+            os.utime(path, (now, now))
+        except (OSError, ValueError):
+            logger.warning("Dropping unreadable cache entry %s", path)
+            with self._lock:
+                victims = self._remove(digest)
+            self._unlink(victims)
+            return None
+        with self._lock:
+            if digest in self._index:
+                self._index[digest] = (self._index[digest][0], now)
+        return CacheEntry(**data)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        digest = self._digest(key)
+        path = self._path(digest)
+        payload = gzip.compress(
+            json.dumps(asdict(entry), ensure_ascii=False).encode("utf-8")
+        )
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            self._load_index()
+        tmp = path.with_name(f".{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Failed to write cache entry %s", path, exc_info=True)
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            previous = self._index.get(digest)
+            if previous:
+                self._total -= previous[0]
+            self._index[digest] = (len(payload), time.time())
+            self._total += len(payload)
+            victims = self._evict(keep=digest)
+        self._unlink(victims)
+
+    def _remove(self, digest: str) -> List[str]:
+        """Drop ``digest`` from the index; the caller unlinks outside the lock."""
+        if digest not in self._index:
+            return []
+        size, _ = self._index.pop(digest)
+        self._total -= size
+        return [digest]
+
+    def _evict(self, keep: Optional[str] = None) -> List[str]:
+        victims: List[str] = []
+        if self._total <= self.max_bytes:
+            return victims
+        for digest, _ in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if digest == keep:
+                continue
+            victims.extend(self._remove(digest))
+            if self._total <= self.max_bytes:
+                break
+        return victims
+
+    def _unlink(self, digests: List[str]) -> None:
+        for digest in digests:
+            self._path(digest).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            victims = [d for digest in list(self._load_index()) for d in self._remove(digest)]
+        self._unlink(victims)
+
+
+class CachingFetcher(FetchStrategy):
+    """
+    Conditional-request cache wrapped around another fetcher.
+
+    Entries younger than the TTL (``request.extras["cache_ttl"]`` or the
+    cache default) are served without touching the network; older ones are
+    revalidated with ``If-None-Match``/``If-Modified-Since`` and a 304 is
+    answered from the cache. Only GET requests are cached, and only when the
+    wrapped fetcher exposes ``fetch_response``/``afetch_response``; other
+    fetchers are passed through unchanged. The response-level methods go
+    through the cache too, so wrappers such as ``RecordingFetcher`` see cached
+    and revalidated responses as plain 200s.
+    """
+
+    def __init__(self, inner, cache: Optional[HttpCache] = None):
+        self.inner = inner
+        self.cache = cache or get_http_cache()
+
+    def __getattr__(self, name):
+        # Expose the wrapped fetcher's attributes (pool, limiter, ...).
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _lookup(self, request: FetchRequest) -> Tuple[Optional[CacheEntry], bool]:
+        entry = self.cache.get(request_key(request))
+        if entry is None:
+            return None, False
+        ttl = request.extras.get("cache_ttl", self.cache.default_ttl)
+        return entry, time.time() - entry.stored_at < float(ttl or 0)
+
+    @staticmethod
+    def _conditional(request: FetchRequest, entry: Optional[CacheEntry]) -> FetchRequest:
+        if entry is None or not (entry.etag or entry.last_modified):
+            return request
+        headers = dict(request.headers or {})
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return replace(request, headers=headers)
+
+    @staticmethod
+    def _cached_response(entry: CacheEntry) -> FetchResponse:
+        return FetchResponse(url=entry.url, status_code=200, text=entry.text, headers=dict(entry.headers))
+
+    def _store(
+        self,
+        request: FetchRequest,
+        entry: Optional[CacheEntry],
+        response: FetchResponse,
+    ) -> FetchResponse:
+        key = request_key(request)
+        if response.status_code == 304 and entry is not None:
+            self.cache.put(key, replace(entry, stored_at=time.time()))
+            return self._cached_response(entry)
+        if response.status_code != 200:
+            return response
+        headers = {k: response.headers[k] for k in _STORED_HEADERS if k in response.headers}
+        ttl = request.extras.get("cache_ttl", self.cache.default_ttl)
+        if "etag" in headers or "last-modified" in headers or ttl:
+            self.cache.put(
+                key,
+                CacheEntry(url=response.url, text=response.text, headers=headers, stored_at=time.time()),
+            )
+        return response
+
+    def fetch(self, request: FetchRequest) -> str:
+        if not hasattr(self.inner, "fetch_response"):
+            return self.inner.fetch(request)
+        return _ensure_ok(self.fetch_response(request))
+
+    def fetch_response(self, request: FetchRequest) -> FetchResponse:
+        if request.method.upper() != "GET":
+            return self.inner.fetch_response(request)
+        entry, fresh = self._lookup(request)
+        if fresh:
+            return self._cached_response(entry)
+        response = self.inner.fetch_response(self._conditional(request, entry))
+        return self._store(request, entry, response)
+
+    async def afetch(self, request: FetchRequest) -> str:
+        if not hasattr(self.inner, "afetch_response"):
+            return await self.inner.afetch(request)
+        return _ensure_ok(await self.afetch_response(request))
+
+    async def afetch_response(self, request: FetchRequest) -> FetchResponse:
+        if request.method.upper() != "GET":
+            return await self.inner.afetch_response(request)
+        entry, fresh = await asyncio.to_thread(self._lookup, request)
+        if fresh:
+            return self._cached_response(entry)
+        response = await self.inner.afetch_response(self._conditional(request, entry))
+        return await asyncio.to_thread(self._store, request, entry, response)
+
+
+_shared_cache: Optional[HttpCache] = None
+_caches_by_dir: Dict[Path, HttpCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_http_cache(directory: str | Path | None = None) -> HttpCache:
+    """
+    Return the process-wide HTTP cache, creating it on first use.
+
+    With ``directory`` the cache rooted there is returned instead, one
+    instance per directory so crawlers configured alike share its index.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if directory is None:
+            if _shared_cache is None:
+                _shared_cache = HttpCache()
+            return _shared_cache
+        path = Path(directory).resolve()
+        cache = _caches_by_dir.get(path)
+        if cache is None:
+            cache = _caches_by_dir[path] = HttpCache(path)
+        return cache
+
+
+def configure_http_cache(
+    directory: str | Path = DEFAULT_CACHE_DIR,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    default_ttl: float = 0.0,
+) -> HttpCache:
+    """Replace the process-wide HTTP cache with one using these settings."""
+    global _shared_cache
+    with _shared_lock:
+        _shared_cache = HttpCache(directory, max_bytes=max_bytes, default_ttl=default_ttl)
+        return _shared_cache
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from .base import BaseNewsCrawler
+from .models import NewsItem
+from .sinks import ItemSink, get_default_sink
+
+logger = logging.getLogger(__name__)
+
+
+def crawler_path(crawler: Union[str, Type[BaseNewsCrawler]]) -> str:
+    """Return the importable ``module:QualName`` path of a crawler class."""
+    if isinstance(crawler, str):
+        return crawler
+    return f"{crawler.__module__}:{crawler.__qualname__}"
+
+
+@lru_cache(maxsize=None)
+def load_crawler(path: str) -> Type[BaseNewsCrawler]:
+    """Import the crawler class named by :func:`crawler_path`."""
+    module_name, _, qualname = path.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        target = getattr(target, attr)
+    return target
+
+
+@dataclass
+class CrawlJob:
+    """One URL to crawl with the given crawler class (or its import path)."""
+
+    crawler: Union[str, Type[BaseNewsCrawler]]
+    url: str
+    options: Dict[str, Any] = field(default_factory=dict)  # extra constructor kwargs
+
+    @property
+    def crawler_cls(self) -> Type[BaseNewsCrawler]:
+        if isinstance(self.crawler, str):
+            return load_crawler(self.crawler)
+        return self.crawler
+
+
+@dataclass
+class CrawlResult:
+    """Outcome of a :class:`CrawlJob`; ``error`` is set when it failed."""
+
+    job: CrawlJob
+    item: Optional[NewsItem] = None
+    saved_path: Optional[str] = None
+    error: Optional[str] = None
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _parse(
+    crawler: BaseNewsCrawler, html: str, persist: Optional[bool]
+) -> Tuple[NewsItem, Optional[str], float]:
+    start = time.perf_counter()
+    news_item = crawler.parse_content(html)
+    crawler.validate_item(news_item)
+    should_persist = crawler.persist_by_default if persist is None else persist
+    saved_path = crawler.save_item(news_item) if should_persist else None
+    return news_item, saved_path, time.perf_counter() - start
+
+
+def parse_job(
+    path: str, url: str, options: Dict[str, Any], html: str, persist: Optional[bool]
+) -> Tuple[NewsItem, Optional[str], float]:
+    """
+    Parse-stage entry point executed in the worker processes.
+
+    The crawler is rebuilt from its class path, so construction must not do
+    network I/O; fetch-time state is not available here.
+    """
+    crawler = load_crawler(path)(url, **options)
+    return _parse(crawler, html, persist)
+
+
+def _error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+class CrawlPipeline:
+    """
+    Two-stage crawl runner: I/O-bound fetching, CPU-bound parsing.
+
+    Fetches run concurrently on threads (:meth:`run`) or on the event loop
+    (:meth:`arun`). Each fetched page is handed to a process pool that
+    rebuilds the crawler by class path and calls ``parse_content``, so parsing
+    uses every core instead of competing with the fetchers for the GIL. At
+    most ``queue_size`` fetched pages are queued or being parsed; beyond that
+    the fetchers block, which keeps memory bounded when parsing falls behind.
+
+    Crawlers that set ``parse_in_worker = False`` (their parsing depends on
+    state captured while fetching) are parsed in the fetching thread.
+
+    With a ``sink`` (or a process-wide default sink) workers only parse and
+    the items are written from this process, so a single rolling writer
+    receives every result.
+    """
+
+    def __init__(
+        self,
+        fetch_concurrency: int = 16,
+        parse_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        persist: Optional[bool] = None,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+        parse_executor: Optional[Executor] = None,
+        sink: Optional[ItemSink] = None,
+    ):
+        self.fetch_concurrency = fetch_concurrency
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.parse_workers * 2
+        self.persist = persist
+        self.sink = sink
+        # spawn: forking while fetch threads hold locks can deadlock the child
+        self._mp_context = mp_context or multiprocessing.get_context("spawn")
+        self._parse_executor = parse_executor
+        self._owns_executor = parse_executor is None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    @property
+    def parse_executor(self) -> Executor:
+        with self._lock:
+            if self._parse_executor is None:
+                self._parse_executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers, mp_context=self._mp_context
+                )
+            return self._parse_executor
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owns_executor and self._parse_executor is not None:
+                self._parse_executor.shutdown(wait=True, cancel_futures=True)
+                self._parse_executor = None
+
+    def __enter__(self) -> "CrawlPipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Persistence
+    # ------------------------------------------------------------------ #
+    def _resolve_sink(self) -> Tuple[Optional[ItemSink], Optional[bool]]:
+        """Return the sink to write from here and the ``persist`` flag for parsing."""
+        sink = self.sink or get_default_sink()
+        return sink, (False if sink is not None else self.persist)
+
+    def _store(self, sink: Optional[ItemSink], crawler: BaseNewsCrawler, result: CrawlResult) -> None:
+        if sink is None or result.item is None:
+            return
+        should_persist = crawler.persist_by_default if self.persist is None else self.persist
+        if should_persist:
+            result.saved_path = sink.write(result.item, crawler.get_article_id())
+
+    # ------------------------------------------------------------------ #
+    # Thread-based fetch stage
+    # ------------------------------------------------------------------ #
+    def run(self, jobs: Iterable[CrawlJob]) -> Iterator[CrawlResult]:
+        """Crawl ``jobs`` and yield results in completion order."""
+        jobs = list(jobs)
+        results: "queue.Queue[CrawlResult]" = queue.Queue()
+        slots = threading.BoundedSemaphore(self.queue_size)
+        sink, persist = self._resolve_sink()
+
+        def finish(crawler: BaseNewsCrawler, result: CrawlResult, future: Future) -> None:
+            slots.release()
+            try:
+                result.item, result.saved_path, result.parse_seconds = future.result()
+                self._store(sink, crawler, result)
+            except BaseException as exc:
+                result.error = _error(exc)
+            results.put(result)
+
+        def fetch(job: CrawlJob) -> None:
+            result = CrawlResult(job=job)
+            try:
+                crawler = job.crawler_cls(job.url, **job.options)
+                start = time.perf_counter()
+                html = crawler.fetch_content()
+                result.fetch_seconds = time.perf_counter() - start
+                if not crawler.parse_in_worker:
+                    result.item, result.saved_path, result.parse_seconds = _parse(
+                        crawler, html, persist
+                    )
+                    self._store(sink, crawler, result)
+                    results.put(result)
+                    return
+            except Exception as exc:
+                result.error = _error(exc)
+                results.put(result)
+                return
+            slots.acquire()
+            try:
+                future = self.parse_executor.submit(
+                    parse_job, crawler_path(job.crawler), job.url, job.options, html, persist
+                )
+            except Exception as exc:
+                slots.release()
+                result.error = _error(exc)
+                results.put(result)
+                return
+            future.add_done_callback(lambda f: finish(crawler, result, f))
+
+        with ThreadPoolExecutor(
+            max_workers=self.fetch_concurrency, thread_name_prefix="crawl-fetch"
+        ) as fetch_pool:
+            for job in jobs:
+                fetch_pool.submit(fetch, job)
+            for _ in range(len(jobs)):
+                yield results.get()
+
+    def run_all(self, jobs: Iterable[CrawlJob]) -> List[CrawlResult]:
+        """Like :meth:`run` but return results in input order."""
+        jobs = list(jobs)
+        order = {id(job): idx for idx, job in enumerate(jobs)}
+        return sorted(self.run(jobs), key=lambda result: order[id(result.job)])
+
+    # ------------------------------------------------------------------ #
+    # asyncio fetch stage
+    # ------------------------------------------------------------------ #
+    async def arun(self, jobs: Iterable[CrawlJob]) -> AsyncIterator[CrawlResult]:
+        """Async variant of :meth:`run` fetching with ``afetch_content``."""
+        loop = asyncio.get_running_loop()
+        fetch_slots = asyncio.Semaphore(self.fetch_concurrency)
+        parse_slots = asyncio.Semaphore(self.queue_size)
+        sink, persist = self._resolve_sink()
+
+        async def crawl(job: CrawlJob) -> CrawlResult:
+            result = CrawlResult(job=job)
+            try:
+                async with fetch_slots:
+                    crawler = job.crawler_cls(job.url, **job.options)
+                    start = time.perf_counter()
+                    html = await crawler.afetch_content()
+                    result.fetch_seconds = time.perf_counter() - start
+                    # keep the fetch slot until the page is queued for parsing
+                    await parse_slots.acquire()
+            except Exception as exc:
+                result.error = _error(exc)
+                return result
+            try:
+                if crawler.parse_in_worker:
+                    parsed = await loop.run_in_executor(
+                        self.parse_executor,
+                        parse_job,
+                        crawler_path(job.crawler),
+                        job.url,
+                        job.options,
+                        html,
+                        persist,
+                    )
+                else:
+                    parsed = await asyncio.to_thread(_parse, crawler, html, persist)
+                result.item, result.saved_path, result.parse_seconds = parsed
+                if sink is not None:
+                    await asyncio.to_thread(self._store, sink, crawler, result)
+            except Exception as exc:
+                result.error = _error(exc)
+            finally:
+                parse_slots.release()
+            return result
+
+        for next_result in asyncio.as_completed([crawl(job) for job in jobs]):
+            yield await next_result
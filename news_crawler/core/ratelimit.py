@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Politeness policy for one host."""
+
+    rate: float  # sustained requests per second
+    burst: int = 1  # requests allowed back-to-back after an idle period
+    jitter: float = 0.0  # extra random delay (seconds) added whenever we wait
+    adaptive: bool = True  # slow down on 429/503 and recover on success
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of polling.
+
+    ``reserve`` always consumes a token and returns how long the caller must
+    wait before using it, so concurrent callers queue up fairly without
+    spinning on a lock.
+    """
+
+    MIN_RATE_FACTOR = 1 / 32
+    RECOVERY_STEP = 1.1
+
+    def __init__(self, limit: RateLimit):
+        self.limit = limit
+        self.rate = limit.rate
+        self.tokens = float(limit.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(float(self.limit.burst), self.tokens + elapsed * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        wait = max(wait, self.blocked_until - now)
+        if wait > 0 and self.limit.jitter:
+            wait += random.uniform(0, self.limit.jitter)
+        return wait
+
+    def penalize(self, now: float, retry_after: Optional[float]) -> None:
+        if not self.limit.adaptive:
+            return
+        self.rate = max(self.limit.rate * self.MIN_RATE_FACTOR, self.rate / 2)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def recover(self) -> None:
+        if self.rate < self.limit.rate:
+            self.rate = min(self.limit.rate, self.rate * self.RECOVERY_STEP)
+
+
+def _host(url_or_host: str) -> str:
+    if "://" not in url_or_host:
+        return url_or_host.lower()
+    return (urlsplit(url_or_host).hostname or "").lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a ``Retry-After`` header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostRateLimiter:
+    """
+    Per-host rate limiter shared by every fetcher in the process.
+
+    Hosts without an explicit limit fall back to ``default_limit``; when that is
+    ``None`` they are not throttled at all.
+    """
+
+    def __init__(self, default_limit: Optional[RateLimit] = None):
+        self.default_limit = default_limit
+        self._limits: Dict[str, RateLimit] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, url_or_host: str, limit: Optional[RateLimit]) -> None:
+        """Set (or clear, with ``None``) the limit for a host."""
+        host = _host(url_or_host)
+        with self._lock:
+            if limit is None:
+                self._limits.pop(host, None)
+                self._buckets.pop(host, None)
+                return
+            if self._limits.get(host) == limit:
+                return  # keep any adaptive state already learned for the host
+            self._limits[host] = limit
+            self._buckets[host] = TokenBucket(limit)
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        bucket = self._buckets.get(host)
+        if bucket is None and self.default_limit is not None:
+            bucket = self._buckets[host] = TokenBucket(self.default_limit)
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Consume a token for ``url``'s host and return the delay to honour."""
+        host = _host(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            if bucket is None:
+                return 0.0
+            return bucket.reserve(time.monotonic())
+
+    def acquire(self, url: str) -> None:
+        """Block the calling thread until a request to ``url`` is allowed."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, url: str) -> None:
+        """Wait without blocking the event loop until ``url`` may be fetched."""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def feedback(
+        self,
+        url: str,
+        status_code: int,
+        retry_after: Optional[str] = None,
+    ) -> None:
+        """Adapt the host's rate to the response status."""
+        host = _host(url)
+        with self._lock:
+            bucket = self._bucket(host)
+            if bucket is None:
+                return
+            if status_code in THROTTLE_STATUS_CODES:
+                bucket.penalize(time.monotonic(), parse_retry_after(retry_after))
+                logger.warning(
+                    "Throttled by %s (HTTP %s), rate lowered to %.3f req/s",
+                    host,
+                    status_code,
+                    bucket.rate,
+                )
+            elif status_code < 400:
+                bucket.recover()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return the current per-host rates for monitoring."""
+        with self._lock:
+            return {
+                host: {
+                    "rate": bucket.rate,
+                    "configured_rate": bucket.limit.rate,
+                    "tokens": bucket.tokens,
+                }
+                for host, bucket in self._buckets.items()
+            }
+
+
+_shared_limiter = HostRateLimiter()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Return the process-wide limiter consulted by the default fetchers."""
+    return _shared_limiter
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from cssselect import HTMLTranslator
+from lxml import etree
+from parsel import Selector
+
+# parsel registers the EXSLT re/set namespaces on every selector; compiled
+# expressions need the same prefixes to behave identically.
+DEFAULT_NAMESPACES: Dict[str, str] = dict(Selector._default_namespaces)
+
+_translator = HTMLTranslator()
+_xpath_registry: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], etree.XPath] = {}
+_css_registry: Dict[str, etree.XPath] = {}
+_soup_registry: Dict[str, Any] = {}
+_registry_lock = threading.Lock()
+
+
+def compile_xpath(expr: str, namespaces: Optional[Mapping[str, str]] = None) -> etree.XPath:
+    """
+    Return the compiled form of an XPath expression, compiling it only once.
+
+    Compiled ``etree.XPath`` objects carry their own evaluation lock, so a
+    single instance can be shared by every thread in the process.
+    """
+    nsp = dict(DEFAULT_NAMESPACES)
+    if namespaces:
+        nsp.update(namespaces)
+    key = (expr, tuple(sorted(nsp.items())))
+    compiled = _xpath_registry.get(key)
+    if compiled is None:
+        try:
+            compiled = etree.XPath(expr, namespaces=nsp, smart_strings=False)
+        except etree.XPathError as exc:
+            raise ValueError(f"XPath error: {exc} in {expr}") from exc
+        with _registry_lock:
+            compiled = _xpath_registry.setdefault(key, compiled)
+    return compiled
+
+
+def css_to_xpath(expr: str) -> str:
+    """Translate a CSS selector into the XPath the HTML backends evaluate."""
+    return _translator.css_to_xpath(expr)
+
+
+def compile_css(expr: str) -> etree.XPath:
+    """Return a compiled XPath equivalent to the CSS selector ``expr``."""
+    compiled = _css_registry.get(expr)
+    if compiled is None:
+        compiled = compile_xpath(css_to_xpath(expr))
+        with _registry_lock:
+            compiled = _css_registry.setdefault(expr, compiled)
+    return compiled
+
+
+def compile_soup_css(expr: str):
+    """Return a precompiled soupsieve pattern for BeautifulSoup trees."""
+    compiled = _soup_registry.get(expr)
+    if compiled is None:
+        import soupsieve
+
+        compiled = soupsieve.compile(expr)
+        with _registry_lock:
+            compiled = _soup_registry.setdefault(expr, compiled)
+    return compiled
+
+
+def registry_size() -> Dict[str, int]:
+    """Number of compiled expressions per registry, for monitoring."""
+    return {
+        "xpath": len(_xpath_registry),
+        "css": len(_css_registry),
+        "soup": len(_soup_registry),
+    }
+
+
+class CompiledSelector(Selector):
+    """
+    parsel ``Selector`` whose ``xpath``/``css`` calls go through the registry.
+
+    Child selectors are instances of this class too, so relative queries on
+    nodes (``element.xpath('.//img/@src')``) are compiled once as well. Calls
+    with per-call ``namespaces`` fall back to parsel's uncompiled path; XPath
+    variables are supported.
+    """
+
+    __slots__ = ()
+
+    def xpath(self, query: str, namespaces: Optional[Mapping[str, str]] = None, **kwargs: Any):
+        if namespaces is not None or self.type not in ("html", "xml"):
+            return super().xpath(query, namespaces=namespaces, **kwargs)
+        if not isinstance(self.root, etree._Element):
+            return self.selectorlist_cls([])
+        compiled = compile_xpath(query, self.namespaces)
+        try:
+            result = compiled(self.root, **kwargs)
+        except etree.XPathError as exc:
+            raise ValueError(f"XPath error: {exc} in {query}") from exc
+        if type(result) is not list:
+            result = [result]
+        return self.selectorlist_cls(
+            [
+                self.__class__(
+                    root=x,
+                    _expr=query,
+                    namespaces=self.namespaces,
+                    type=self.type,
+                )
+                for x in result
+            ]
+        )
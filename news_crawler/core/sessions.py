@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionPoolConfig:
+    """Sizing and eviction settings for a :class:`SessionPool`."""
+
+    max_idle_per_host: int = 8
+    connections_per_session: int = 4
+    idle_timeout: float = 90.0
+    max_async_connections: int = 256
+
+
+def host_key(url: str) -> str:
+    """Return the ``scheme://host[:port]`` key used to bucket connections."""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+class SessionPool:
+    """
+    Per-host pool of keep-alive HTTP sessions.
+
+    Sessions are checked out for the duration of one request and returned
+    afterwards, so TCP/TLS connections are reused across requests (and crawler
+    instances) hitting the same host. Idle sessions are closed once they exceed
+    ``idle_timeout`` and at most ``max_idle_per_host`` are kept per host.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[SessionPoolConfig], Any],
+        config: Optional[SessionPoolConfig] = None,
+    ):
+        self.factory = factory
+        self.config = config or SessionPoolConfig()
+        self._idle: Dict[str, Deque[Tuple[Any, float]]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._created = 0
+        self._reused = 0
+
+    @contextmanager
+    def session(self, url: str) -> Iterator[Any]:
+        """Check out a session for ``url``'s host and return it when done."""
+        key = host_key(url)
+        session = self._checkout(key)
+        try:
+            yield session
+        except BaseException:
+            # The connection state is unknown after a failure; do not reuse it.
+            self._close(session)
+            raise
+        else:
+            self._checkin(key, session)
+
+    def _checkout(self, key: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                session, last_used = idle.pop()  # LIFO keeps the warmest session
+                if now - last_used <= self.config.idle_timeout:
+                    self._reused += 1
+                    return session
+                self._close(session)
+            self._created += 1
+        return self.factory(self.config)
+
+    def _checkin(self, key: str, session: Any) -> None:
+        cookies = getattr(session, "cookies", None)
+        if cookies is not None:
+            # Crawlers send cookies explicitly; never leak them between callers.
+            cookies.clear()
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.config.max_idle_per_host:
+                idle.append((session, now))
+                session = None
+            if now - self._last_sweep >= self.config.idle_timeout / 2:
+                self._sweep(now)
+        if session is not None:
+            self._close(session)
+
+    def _sweep(self, now: float) -> None:
+        """Close idle sessions past their timeout. Caller holds the lock."""
+        self._last_sweep = now
+        for key in list(self._idle):
+            idle = self._idle[key]
+            while idle and now - idle[0][1] > self.config.idle_timeout:
+                stale, _ = idle.popleft()
+                self._close(stale)
+            if not idle:
+                del self._idle[key]
+
+    @staticmethod
+    def _close(session: Any) -> None:
+        try:
+            session.close()
+        except Exception:  # pragma: no cover - best effort cleanup
+            logger.debug("Failed to close pooled session", exc_info=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters useful for monitoring connection reuse."""
+        with self._lock:
+            return {
+                "hosts": len(self._idle),
+                "idle_sessions": sum(len(idle) for idle in self._idle.values()),
+                "created": self._created,
+                "reused": self._reused,
+            }
+
+    def close(self) -> None:
+        """Close every idle session held by the pool."""
+        with self._lock:
+            idle_sessions = [s for idle in self._idle.values() for s, _ in idle]
+            self._idle.clear()
+        for session in idle_sessions:
+            self._close(session)
+
+
+def _requests_session(config: SessionPoolConfig) -> Any:
+    from requests import Session  # lazy import
+    from requests.adapters import HTTPAdapter
+
+    session = Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=config.connections_per_session,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _curl_cffi_session(config: SessionPoolConfig) -> Any:
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("curl_cffi is required for this fetcher") from exc
+    return curl_requests.Session()
+
+
+SESSION_FACTORIES: Dict[str, Callable[[SessionPoolConfig], Any]] = {
+    "requests": _requests_session,
+    "curl_cffi": _curl_cffi_session,
+}
+
+
+def _curl_cffi_async_session(config: SessionPoolConfig) -> Any:
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("curl_cffi is required for this fetcher") from exc
+    return curl_requests.AsyncSession(max_clients=config.max_async_connections)
+
+
+def _httpx_async_client(config: SessionPoolConfig) -> Any:
+    try:
+        import httpx
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("httpx is required for this fetcher") from exc
+    limits = httpx.Limits(
+        max_connections=config.max_async_connections,
+        max_keepalive_connections=config.max_idle_per_host
+        * config.connections_per_session,
+        keepalive_expiry=config.idle_timeout,
+    )
+    return httpx.AsyncClient(limits=limits)
+
+
+ASYNC_CLIENT_FACTORIES: Dict[str, Callable[[SessionPoolConfig], Any]] = {
+    "curl_cffi": _curl_cffi_async_session,
+    "httpx": _httpx_async_client,
+}
+
+# Async clients are bound to the event loop that created them.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_shared_pools: Dict[str, SessionPool] = {}
+_shared_config = SessionPoolConfig()
+_shared_lock = threading.Lock()
+
+
+def get_session_pool(kind: str) -> SessionPool:
+    """Return the process-wide pool for ``kind`` (``requests`` or ``curl_cffi``)."""
+    with _shared_lock:
+        pool = _shared_pools.get(kind)
+        if pool is None:
+            try:
+                factory = SESSION_FACTORIES[kind]
+            except KeyError as exc:
+                raise ValueError(f"Unknown session pool kind: {kind}") from exc
+            pool = _shared_pools[kind] = SessionPool(factory, _shared_config)
+        return pool
+
+
+def get_async_client(kind: str) -> Any:
+    """
+    Return the async client for ``kind`` shared by everything on the running loop.
+
+    The client multiplexes connections for all hosts, so one event loop can
+    keep many requests in flight over a bounded set of keep-alive connections.
+    """
+    loop = asyncio.get_running_loop()
+    with _shared_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(kind)
+        if client is None:
+            try:
+                factory = ASYNC_CLIENT_FACTORIES[kind]
+            except KeyError as exc:
+                raise ValueError(f"Unknown async client kind: {kind}") from exc
+            client = clients[kind] = factory(_shared_config)
+        return client
+
+
+async def aclose_async_clients() -> None:
+    """Close the async clients bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _shared_lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        closer = getattr(client, "aclose", None) or client.close
+        result = closer()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+def configure_session_pools(
+    *,
+    max_idle_per_host: Optional[int] = None,
+    connections_per_session: Optional[int] = None,
+    idle_timeout: Optional[float] = None,
+    max_async_connections: Optional[int] = None,
+) -> SessionPoolConfig:
+    """
+    Adjust the settings shared by all process-wide pools.
+
+    Existing idle sessions and async clients keep their connection limits; new
+    settings apply to sessions created afterwards.
+    """
+    with _shared_lock:
+        if max_idle_per_host is not None:
+            _shared_config.max_idle_per_host = max_idle_per_host
+        if connections_per_session is not None:
+            _shared_config.connections_per_session = connections_per_session
+        if idle_timeout is not None:
+            _shared_config.idle_timeout = idle_timeout
+        if max_async_connections is not None:
+            _shared_config.max_async_connections = max_async_connections
+        return _shared_config
+
+
+def close_session_pools() -> None:
+    """Close all idle sessions held by the process-wide pools."""
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+    for pool in pools:
+        pool.close()
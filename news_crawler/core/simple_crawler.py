@@ -86,6 +86,21 @@ class SimpleNewsCrawler(BaseNewsCrawler):
         unique_str = f"{self.name}_{url}_{timestamp}"
         return hashlib.md5(unique_str.encode()).hexdigest()[:16]
     
+    async def get_html(self, url: Optional[str] = None) -> Optional[str]:
+        """
+        异步获取页面HTML
+        url: 要获取的URL（可选，默认使用new_url）
+        失败时返回None
+        """
+        request = self.build_fetch_request()
+        if url:
+            request.url = url
+        try:
+            return await self.afetcher.afetch(request)
+        except Exception as e:
+            logger.warning(f"获取页面失败 {request.url}: {e}")
+            return None
+    
     async def fetch_content(self, url: str) -> Optional[NewsMetaInfo]:
         """
         抓取内容（兼容旧接口）
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import atexit
+import io
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .models import NewsItem
+
+logger = logging.getLogger(__name__)
+
+JSONL_SUFFIX = ".jsonl"
+ZSTD_SUFFIX = ".jsonl.zst"
+
+
+class ItemSink(ABC):
+    """Destination for crawled items; ``write`` returns where the item went."""
+
+    @abstractmethod
+    def write(self, news_item: NewsItem, key: str) -> str:
+        """Persist ``news_item`` under ``key``."""
+
+    def flush(self) -> None:
+        """Push buffered items to durable storage."""
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ItemSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonFileSink(ItemSink):
+    """One pretty-printed ``<key>.json`` file per item (the original layout)."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+
+    def write(self, news_item: NewsItem, key: str) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{key}.json"
+        path.write_text(
+            json.dumps(news_item.to_dict(), ensure_ascii=False, indent=4),
+            encoding="utf-8",
+        )
+        return str(path)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("zstandard is required for compressed JSONL sinks") from exc
+    return zstandard
+
+
+class _JsonlFile:
+    """
+    Open file handle and unwritten lines of a :class:`JsonlSink`.
+
+    Kept apart from the sink so the finalizer registered for an unclosed sink
+    can flush and close the file without holding a reference to the sink.
+    """
+
+    def __init__(self, compressor=None):
+        self.lock = threading.Lock()
+        self.buffer: List[bytes] = []
+        self.handle: Optional[io.BufferedWriter] = None
+        self.compressor = compressor
+        self.unsynced = 0
+
+    def write_buffer(self) -> None:
+        if not self.buffer or self.handle is None:
+            return
+        payload = b"".join(self.buffer)
+        self.buffer.clear()
+        if self.compressor is not None:
+            payload = self.compressor.compress(payload)
+        self.handle.write(payload)
+        self.handle.flush()
+        self.unsynced += len(payload)
+
+    def sync(self) -> None:
+        if self.handle is not None and self.unsynced:
+            os.fsync(self.handle.fileno())
+            self.unsynced = 0
+
+    def close(self) -> None:
+        if self.handle is None:
+            return
+        self.write_buffer()
+        self.sync()
+        self.handle.close()
+        self.handle = None
+
+    def finalize(self) -> None:
+        with self.lock:
+            if self.buffer:
+                logger.warning("JsonlSink was not closed; flushing %d buffered items", len(self.buffer))
+            self.close()
+
+
+class JsonlSink(ItemSink):
+    """
+    Rolling JSON-lines writer, one compact line per item.
+
+    Lines are buffered and written every ``batch_size`` items; the file is
+    fsynced once ``fsync_bytes`` have been written since the last sync or
+    ``fsync_interval`` seconds have passed, whichever comes first. A new file
+    is started when the current one reaches ``max_file_bytes``. With
+    ``compress=True`` files are zstd-compressed and every batch is a complete
+    frame, so a crash loses at most the unflushed batch.
+
+    A background thread flushes every ``fsync_interval`` seconds, so the tail
+    of a burst is not left in the buffer until the next write or ``close``.
+    A sink that is never closed is flushed and closed when it is garbage
+    collected or the interpreter exits; call ``close()`` (or use ``with``)
+    to control when that happens.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        prefix: str = "items",
+        compress: bool = False,
+        batch_size: int = 100,
+        max_file_bytes: int = 256 * 1024 * 1024,
+        fsync_bytes: int = 4 * 1024 * 1024,
+        fsync_interval: float = 5.0,
+    ):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.compress = compress
+        self.batch_size = batch_size
+        self.max_file_bytes = max_file_bytes
+        self.fsync_bytes = fsync_bytes
+        self.fsync_interval = fsync_interval
+        self._out = _JsonlFile(_zstandard().ZstdCompressor() if compress else None)
+        self._path: Optional[Path] = None
+        self._sequence = 0
+        self._last_sync = time.monotonic()
+        self._lock = self._out.lock
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flusher = threading.Event()
+        self._finalizer = weakref.finalize(self, self._out.finalize)
+
+    @property
+    def current_path(self) -> Optional[Path]:
+        return self._path
+
+    def _open(self) -> io.BufferedWriter:
+        if self._out.handle is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            suffix = ZSTD_SUFFIX if self.compress else JSONL_SUFFIX
+            while True:
+                self._sequence += 1
+                path = self.directory / f"{self.prefix}-{stamp}-{os.getpid()}-{self._sequence:04d}{suffix}"
+                if not path.exists():
+                    break
+            self._path = path
+            self._out.handle = open(path, "ab")
+        return self._out.handle
+
+    def write(self, news_item: NewsItem, key: str) -> str:
+        line = json.dumps(news_item.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._out.handle is not None and self._out.handle.tell() >= self.max_file_bytes:
+                self._flush_locked(force_sync=True)
+                self._out.close()
+            self._open()
+            self._start_flusher()
+            self._out.buffer.append(line.encode("utf-8") + b"\n")
+            if (
+                len(self._out.buffer) >= self.batch_size
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._flush_locked()
+            return str(self._path)
+
+    def _flush_locked(self, force_sync: bool = False) -> None:
+        if self._out.buffer:
+            self._open()
+            self._out.write_buffer()
+        now = time.monotonic()
+        due = self._out.unsynced >= self.fsync_bytes or now - self._last_sync >= self.fsync_interval
+        if self._out.unsynced and (force_sync or due):
+            self._out.sync()
+            self._last_sync = now
+
+    def _pending(self) -> bool:
+        return bool(self._out.buffer or self._out.unsynced)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked(force_sync=True)
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None or self.fsync_interval <= 0:
+            return
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(
+            target=_flush_periodically,
+            args=(weakref.ref(self), self._stop_flusher, self.fsync_interval),
+            name=f"jsonl-flush-{self.prefix}",
+            daemon=True,
+        )
+        self._flusher.start()
+
+    def _stop_flusher_thread(self) -> None:
+        with self._lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            self._stop_flusher.set()
+            if flusher is not threading.current_thread():
+                flusher.join()
+
+    def close(self) -> None:
+        self._stop_flusher_thread()
+        with self._lock:
+            self._flush_locked(force_sync=True)
+            self._out.close()
+
+
+def _flush_periodically(
+    ref: "weakref.ReferenceType[JsonlSink]", stop: threading.Event, interval: float
+) -> None:
+    # Holds only a weak reference so an unclosed sink can still be collected.
+    while not stop.wait(interval):
+        sink = ref()
+        if sink is None:
+            return
+        try:
+            with sink._lock:
+                if sink._pending():
+                    sink._flush_locked(force_sync=True)
+        except Exception:
+            logger.exception("Background flush of %s failed", sink.current_path)
+        del sink
+
+
+def _open_lines(path: Path) -> Iterator[bytes]:
+    if path.name.endswith(".zst"):
+        reader = _zstandard().ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+        with io.BufferedReader(reader) as stream:
+            yield from stream
+    else:
+        with open(path, "rb") as stream:
+            yield from stream
+
+
+def iter_jsonl(source: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSONL file or every JSONL file in a directory.
+
+    Files are read in name (i.e. creation) order; a truncated final line, as
+    left by a crash mid-write, is skipped with a warning.
+    """
+    source = Path(source)
+    if source.is_dir():
+        paths = sorted(
+            p for p in source.iterdir() if p.name.endswith((JSONL_SUFFIX, ZSTD_SUFFIX))
+        )
+    else:
+        paths = [source]
+    for path in paths:
+        for raw in _open_lines(path):
+            if not raw.strip():
+                continue
+            try:
+                yield json.loads(raw)
+            except ValueError:
+                logger.warning("Skipping malformed line in %s", path)
+
+
+def iter_news_items(source: Union[str, Path]) -> Iterator[NewsItem]:
+    """Stream :class:`NewsItem` objects back from a :class:`JsonlSink`."""
+    for record in iter_jsonl(source):
+        yield NewsItem.model_validate(record)
+
+
+_default_sink: Optional[ItemSink] = None
+_default_lock = threading.Lock()
+
+
+def get_default_sink() -> Optional[ItemSink]:
+    """Sink used by crawlers created without one; ``None`` keeps per-file JSON."""
+    return _default_sink
+
+
+def configure_default_sink(sink: Optional[ItemSink]) -> Optional[ItemSink]:
+    """Install ``sink`` process-wide, closing the one it replaces."""
+    global _default_sink
+    with _default_lock:
+        previous, _default_sink = _default_sink, sink
+    if previous is not None and previous is not sink:
+        previous.close()
+    return sink
+
+
+@atexit.register
+def _close_default_sink() -> None:
+    # Buffered items of the default sink would otherwise be lost at shutdown.
+    sink = _default_sink
+    if sink is not None:
+        sink.close()
@@ -7,13 +7,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from parsel import Selector
 from pydantic import Field
 
 from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
@@ -69,11 +69,11 @@ class DetikNewsCrawler(BaseNewsCrawler):
         except Exception as exc:  # pragma: no cover - defensive branch
             raise ValueError("解析文章ID失败，请检查URL是否正确") from exc
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -81,7 +81,7 @@ class DetikNewsCrawler(BaseNewsCrawler):
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         publish_time = sel.xpath("//article[@class='detail']//div[@class='detail__date']/text()").get() or ""
         author_name = sel.xpath("string(//article[@class='detail']//div[@class='detail__author'])").get() or ""
@@ -93,17 +93,17 @@ class DetikNewsCrawler(BaseNewsCrawler):
             author_url=author_url,
         )
 
-    def parse_html_to_news_media(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_media(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析封面媒体信息，detik中标题下面的第一个栏目通常是图片或者视频，解析它
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻媒体信息
         """
         res = []
-        selector = Selector(text=html_content)
+        selector = self.parse_document(html_content).selector
         poster_img = selector.xpath("//div[@class='detail__media']/figure[@class='detail__media-image']/img/@src").get()
         poster_video = selector.xpath("//div[@class='detail__media']/iframe/@src").get()
         poster_desc = selector.xpath(
@@ -114,11 +114,11 @@ class DetikNewsCrawler(BaseNewsCrawler):
             res.append(ContentItem(type=ContentType.VIDEO, content=poster_video, desc=poster_desc or poster_video))
         return res
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
@@ -130,7 +130,7 @@ class DetikNewsCrawler(BaseNewsCrawler):
         contents.extend(media_contents)
 
         # 再解析新闻正文
-        selector = Selector(text=html_content)
+        selector = self.parse_document(html_content).selector
         elements = selector.xpath('//div[@class="detail__body-text itp_bodycontent"]/*')
         for element in elements:
             if element.root.tag == 'p':
@@ -164,13 +164,14 @@ class DetikNewsCrawler(BaseNewsCrawler):
         return contents
 
     def parse_content(self, html: str) -> NewsItem:
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
         title = selector.xpath("//h1/text()").get("").strip()
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title,
@@ -14,9 +14,11 @@ from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
+    as_document,
 )
 
 FIXED_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36"
@@ -36,17 +38,17 @@ class LennysNewsletterContentParser:
         """初始化新闻详情页内容解析器"""
         self._contents: List[ContentItem] = []
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容，保持段落结构
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻详情页内容，每个段落作为独立的ContentItem
         """
         self._contents = []
-        selector = Selector(text=html_content)
+        selector = as_document(html_content).selector
 
         content_node = selector.xpath("//div[@class='available-content']")
         if not content_node:
@@ -59,7 +61,7 @@ class LennysNewsletterContentParser:
         contents = [item for item in self._contents if item.content.strip()]
         return self._remove_duplicate_contents(contents)
 
-    def parse(self, html_content: str) -> List[ContentItem]:
+    def parse(self, html_content: HtmlSource) -> List[ContentItem]:
         return self.parse_html_to_news_content(html_content)
 
     def _remove_duplicate_contents(
@@ -273,11 +275,11 @@ class LennysNewsletterCrawler(BaseNewsCrawler):
             raise ValueError("解析文章ID失败，请检查URL是否正确") from exc
 
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -285,7 +287,7 @@ class LennysNewsletterCrawler(BaseNewsCrawler):
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         author_xpath = "//div[@class='post-header']//div[contains(@class, 'profile-hover-card-target')]/a"
         publish_time = (
@@ -303,11 +305,11 @@ class LennysNewsletterCrawler(BaseNewsCrawler):
             author_url=author_url.strip(),
         )
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
@@ -323,7 +325,8 @@ class LennysNewsletterCrawler(BaseNewsCrawler):
         Returns:
             NewsItem: 新闻详情
         """
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
 
         title = selector.xpath("//h1/text()").get()
         if not title:
@@ -331,8 +334,8 @@ class LennysNewsletterCrawler(BaseNewsCrawler):
 
         subtitle = selector.xpath("//h3/text()").get() or ""
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title,
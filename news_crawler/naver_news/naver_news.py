@@ -16,9 +16,11 @@ from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
+    as_document,
 )
 from news_crawler.core.fetchers import FetchRequest
 
@@ -45,9 +47,9 @@ class NaverNewsContentParser:
     def __init__(self) -> None:
         self._contents: List[ContentItem] = []
 
-    def parse(self, html_content: str) -> List[ContentItem]:
+    def parse(self, html_content: HtmlSource) -> List[ContentItem]:
         self._contents = []
-        selector = Selector(text=html_content)
+        selector = as_document(html_content).selector
         content_node = selector.xpath("//div[@class='se-main-container']")
         if not content_node:
             return []
@@ -164,7 +166,14 @@ class NaverNewsCrawler(BaseNewsCrawler):
     ):
         super().__init__(new_url, save_path, headers=headers)
         self._content_parser = NaverNewsContentParser()
-        self.iframe_url = self.get_iframe_url_path()
+        self._iframe_url: Optional[str] = None
+
+    @property
+    def iframe_url(self) -> str:
+        """正文所在 iframe 的地址，首次抓取时才请求，解析进程重建爬虫时无需联网"""
+        if self._iframe_url is None:
+            self._iframe_url = self.get_iframe_url_path()
+        return self._iframe_url
 
     @property
     def get_base_url(self) -> str:
@@ -181,24 +190,38 @@ class NaverNewsCrawler(BaseNewsCrawler):
         request.url = self.iframe_url
         return request
 
+    async def afetch_content(self) -> str:
+        # 异步路径用 afetcher 解析 iframe 地址，避免阻塞的 requests 调用卡住事件循环
+        if self._iframe_url is None:
+            self._iframe_url = await self.aget_iframe_url_path()
+        return await super().afetch_content()
+
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     def get_iframe_url_path(self) -> str:
         response = requests.get(self.new_url, headers=self.headers)
         if response.status_code != 200:
             raise RuntimeError(f"Failed to fetch content: {response.status_code}")
         response.encoding = "utf-8"
-        selector = Selector(text=response.text)
+        return self._extract_iframe_url(response.text)
+
+    @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
+    async def aget_iframe_url_path(self) -> str:
+        request = FetchRequest(url=self.new_url, headers=self.headers, timeout=self.fetch_timeout)
+        return self._extract_iframe_url(await self.afetcher.afetch(request))
+
+    def _extract_iframe_url(self, html: str) -> str:
+        selector = Selector(text=html)
         iframe_url = selector.xpath("//iframe[@id='mainFrame']/@src").get("")
         if not iframe_url:
             raise RuntimeError("Failed to get iframe url")
         self.logger.info("Success to get iframe url: %s", iframe_url)
         return self.get_base_url + iframe_url
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         publish_time = (
             sel.xpath("//span[@class='se_publishDate pcol2']/text()").get() or ""
@@ -212,11 +235,12 @@ class NaverNewsCrawler(BaseNewsCrawler):
             author_url=author_url.strip(),
         )
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         return self._content_parser.parse(html_content)
 
     def parse_content(self, html: str) -> NewsItem:
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
         title = (
             selector.xpath(
                 "string(//div[@class='se-module se-module-text se-title-text']//span)"
@@ -226,8 +250,8 @@ class NaverNewsCrawler(BaseNewsCrawler):
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title,
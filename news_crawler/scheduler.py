@@ -2,143 +2,55 @@
 新闻爬虫调度器
 管理多个爬虫的定时任务
 """
+import heapq
+import itertools
 import logging
+import random
 import time
 import threading
-from typing import Dict, List, Optional, Any, Callable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, List, Optional, Any, Callable, Set, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from urllib.parse import urlsplit
 
-logger = logging.getLogger(__name__)
-
-
-@dataclass
-class CrawlerTask:
-    """爬虫任务"""
-    id: int
-    source_id: str
-    source_name: str
-    url: str
-    country: str
-    enabled: bool = True
-    interval_minutes: int = 60
-    last_crawl_time: Optional[datetime] = None
-    next_crawl_time: Optional[datetime] = None
-    created_at: datetime = None
-    updated_at: datetime = None
-    
-    def __post_init__(self):
-        if self.created_at is None:
-            self.created_at = datetime.now()
-        if self.updated_at is None:
-            self.updated_at = datetime.now()
-
-
-@dataclass
-class CrawlerHistory:
-    """爬取历史记录"""
-    id: int
-    task_id: int
-    source_id: str
-    url: str
-    status: str
-    articles_count: int
-    error_message: Optional[str]
-    crawl_time: datetime
-    duration_seconds: float
+from news_crawler.store import Article, CrawlerHistory, CrawlerTask, SQLiteStore
 
-
-@dataclass
-class Article:
-    """文章数据"""
-    id: int
-    source_id: str
-    article_id: str
-    title: str
-    url: str
-    author: Optional[str]
-    publish_time: Optional[datetime]
-    summary: Optional[str]
-    category: Optional[str]
-    created_at: datetime
-
-
-class SimpleDB:
-    """简化的内存数据库（用于测试）"""
-    
-    def __init__(self):
-        self.tasks: Dict[int, CrawlerTask] = {}
-        self.history: List[CrawlerHistory] = []
-        self.articles: List[Article] = []
-        self._next_task_id = 1
-        self._next_history_id = 1
-        self._next_article_id = 1
-    
-    def add_task(self, task: CrawlerTask) -> CrawlerTask:
-        """添加任务"""
-        task.id = self._next_task_id
-        self._next_task_id += 1
-        self.tasks[task.id] = task
-        return task
-    
-    def get_task_by_source_id(self, source_id: str) -> Optional[CrawlerTask]:
-        """根据source_id获取任务"""
-        for task in self.tasks.values():
-            if task.source_id == source_id:
-                return task
-        return None
-    
-    def get_all_tasks(self) -> List[CrawlerTask]:
-        """获取所有任务"""
-        return list(self.tasks.values())
-    
-    def update_task(self, task: CrawlerTask):
-        """更新任务"""
-        task.updated_at = datetime.now()
-        if task.id in self.tasks:
-            self.tasks[task.id] = task
-    
-    def add_history(self, history: CrawlerHistory) -> CrawlerHistory:
-        """添加历史记录"""
-        history.id = self._next_history_id
-        self._next_history_id += 1
-        self.history.append(history)
-        return history
-    
-    def get_history_by_task_id(self, task_id: int, limit: int = 50) -> List[CrawlerHistory]:
-        """获取任务的历史记录"""
-        result = [h for h in self.history if h.task_id == task_id]
-        result.sort(key=lambda x: x.crawl_time, reverse=True)
-        return result[:limit]
-    
-    def get_recent_history(self, limit: int = 50) -> List[CrawlerHistory]:
-        """获取最近的历史记录"""
-        result = sorted(self.history, key=lambda x: x.crawl_time, reverse=True)
-        return result[:limit]
-    
-    def add_article(self, article: Article) -> Article:
-        """添加文章"""
-        article.id = self._next_article_id
-        self._next_article_id += 1
-        self.articles.append(article)
-        return article
-    
-    def get_articles_by_source(self, source_id: str, limit: int = 50) -> List[Article]:
-        """获取指定源的文章"""
-        result = [a for a in self.articles if a.source_id == source_id]
-        result.sort(key=lambda x: x.created_at, reverse=True)
-        return result[:limit]
+logger = logging.getLogger(__name__)
 
 
 class NewsScheduler:
-    """新闻调度器"""
+    """
+    新闻调度器
+
+    到期任务保存在以 next_crawl_time 为键的小顶堆中，调度线程只睡到堆顶任务
+    到期（或被新任务唤醒）。到期任务和手动执行的任务进入就绪队列，在不超过
+    全局并发数 max_workers、每个主机并发数 max_per_host 的前提下按先后顺序
+    交给线程池执行；同一任务排队或执行期间不会再次入队，因此不会重叠执行。
+    任务执行结束后才重新入堆。
+    """
     
-    def __init__(self, db_path: str = ":memory:"):
+    def __init__(self, db_path: str = ":memory:", max_workers: int = 8,
+                 max_per_host: int = 2, jitter_ratio: float = 0.1):
         self.crawlers: Dict[str, Any] = {}
-        self.db = SimpleDB()
+        self.db = SQLiteStore(db_path)
         self.running = False
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        # 下次执行时间额外推迟 [0, 间隔 * jitter_ratio)，避免同间隔的源同时触发
+        self.jitter_ratio = jitter_ratio
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._due: Dict[str, datetime] = {}  # source_id -> 堆中有效条目的到期时间
+        self._ready: Deque[Tuple[str, bool]] = deque()  # (source_id, 是否手动执行)
+        self._queued: Set[str] = set()
+        self._running_sources: Set[str] = set()
+        self._hosts: Dict[str, str] = {}  # source_id -> 并发计数所用的主机名
+        self._host_in_flight: Dict[str, int] = {}
+        self._seq = itertools.count()
         logger.info(f"初始化调度器: {db_path}")
     
     def register_crawler(self, source_id: str, crawler_factory: Callable, 
@@ -160,42 +72,169 @@ class NewsScheduler:
         
         self.running = True
         self._stop_event.clear()
+        with self._cond:
+            self._heap.clear()
+            self._due.clear()
+        for task in self.db.get_all_tasks():
+            self.schedule(task)
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
         logger.info("调度器已启动")
     
     def stop(self):
-        """停止调度器"""
+        """停止调度器（正在执行和已排队的任务会继续完成）"""
         if not self.running:
             logger.warning("调度器未运行")
             return
         
         self.running = False
         self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
         if self._thread:
             self._thread.join(timeout=5)
         logger.info("调度器已停止")
     
-    def _run_loop(self):
-        """调度循环"""
-        while not self._stop_event.is_set():
-            try:
-                self._check_and_execute_tasks()
-            except Exception as e:
-                logger.error(f"调度循环错误: {e}")
-            
-            # 每分钟检查一次
-            self._stop_event.wait(60)
+    def next_run_time(self, task: CrawlerTask, base: Optional[datetime] = None) -> datetime:
+        """计算任务的下次执行时间（间隔可小于一分钟，并叠加抖动）"""
+        interval = task.interval_minutes * 60
+        delay = interval + random.uniform(0, interval * self.jitter_ratio)
+        return (base or datetime.now()) + timedelta(seconds=delay)
     
-    def _check_and_execute_tasks(self):
-        """检查并执行到期的任务"""
-        now = datetime.now()
-        for task in self.db.get_all_tasks():
+    @staticmethod
+    def _host_of(task: CrawlerTask) -> str:
+        # 没有 URL 的任务各自独立计数
+        return urlsplit(task.url).hostname or f"source:{task.source_id}"
+    
+    def schedule(self, task: CrawlerTask):
+        """把任务按 next_crawl_time 放入调度堆，重复调用以最后一次为准"""
+        if not self.running:
+            return
+        with self._cond:
             if not task.enabled:
+                self._due.pop(task.source_id, None)
+                return
+            if task.source_id in self._running_sources or task.source_id in self._queued:
+                return  # 执行结束后会按最新配置重新入堆
+            self._hosts[task.source_id] = self._host_of(task)
+            due = task.next_crawl_time or datetime.now()
+            self._due[task.source_id] = due
+            heapq.heappush(self._heap, (due, next(self._seq), task.source_id))
+            if self._heap[0][2] == task.source_id:
+                self._cond.notify()
+    
+    def update_task(self, task: CrawlerTask):
+        """保存任务配置并重新调度"""
+        self.db.update_task(task)
+        self.schedule(task)
+    
+    def run_now(self, task: CrawlerTask) -> bool:
+        """
+        手动执行任务（不论调度器是否运行），受同样的并发限制
+
+        任务已在排队或执行中时返回 False
+        """
+        with self._cond:
+            if task.source_id in self._running_sources or task.source_id in self._queued:
+                return False
+            self._due.pop(task.source_id, None)
+            self._hosts[task.source_id] = self._host_of(task)
+            self._enqueue_locked(task.source_id, manual=True)
+            self._dispatch_locked()
+        return True
+    
+    def is_busy(self, source_id: str) -> bool:
+        """任务是否正在排队或执行"""
+        with self._cond:
+            return source_id in self._running_sources or source_id in self._queued
+    
+    def pending_count(self) -> int:
+        """等待到期的任务数"""
+        with self._cond:
+            return len(self._due)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """调度器运行状态：等待、排队、执行中的任务数"""
+        with self._cond:
+            return {
+                'running': self.running,
+                'registered_crawlers': len(self.crawlers),
+                'scheduled': len(self._due),
+                'queue_depth': len(self._ready),
+                'in_flight': len(self._running_sources),
+                'in_flight_sources': sorted(self._running_sources),
+                'in_flight_by_host': {h: n for h, n in self._host_in_flight.items() if n},
+                'max_workers': self.max_workers,
+                'max_per_host': self.max_per_host,
+            }
+    
+    def _enqueue_locked(self, source_id: str, manual: bool = False):
+        self._queued.add(source_id)
+        self._ready.append((source_id, manual))
+    
+    def _dispatch_locked(self):
+        """在并发限制内按顺序启动就绪任务，受主机限制的任务留在队列中"""
+        if not self._ready or len(self._running_sources) >= self.max_workers:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="crawl-task")
+        waiting: Deque[Tuple[str, bool]] = deque()
+        while self._ready and len(self._running_sources) < self.max_workers:
+            source_id, manual = self._ready.popleft()
+            host = self._hosts.get(source_id, source_id)
+            if self._host_in_flight.get(host, 0) >= self.max_per_host:
+                waiting.append((source_id, manual))
                 continue
-            
-            if task.next_crawl_time and task.next_crawl_time <= now:
+            self._queued.discard(source_id)
+            self._running_sources.add(source_id)
+            self._host_in_flight[host] = self._host_in_flight.get(host, 0) + 1
+            self._executor.submit(self._run_task, source_id, host, manual)
+        waiting.extend(self._ready)
+        self._ready = waiting
+    
+    def _run_loop(self):
+        """调度循环：等待堆顶任务到期后放入就绪队列"""
+        with self._cond:
+            while not self._stop_event.is_set():
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _, source_id = self._heap[0]
+                if self._due.get(source_id) != due:
+                    heapq.heappop(self._heap)  # 已被重新调度或禁用的旧条目
+                    continue
+                delay = (due - datetime.now()).total_seconds()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                del self._due[source_id]
+                self._enqueue_locked(source_id)
+                try:
+                    self._dispatch_locked()
+                except Exception as e:
+                    logger.error(f"调度循环错误: {e}")
+    
+    def _run_task(self, source_id: str, host: str, manual: bool):
+        """在线程池中执行任务，结束后释放并发名额并重新入堆"""
+        task = None
+        try:
+            task = self.db.get_task_by_source_id(source_id)
+            # 手动执行等操作可能已推迟了下次执行时间
+            due = task and (manual or task.enabled and (
+                task.next_crawl_time is None or task.next_crawl_time <= datetime.now()))
+            if due:
                 self.execute_task(task)
+        except Exception as e:
+            logger.error(f"调度任务异常: {source_id}, 错误: {e}")
+        finally:
+            with self._cond:
+                self._running_sources.discard(source_id)
+                self._host_in_flight[host] -= 1
+                self._dispatch_locked()
+            if task is not None:
+                self.schedule(self.db.get_task_by_source_id(source_id) or task)
     
     def execute_task(self, task: CrawlerTask):
         """执行爬取任务"""
@@ -227,11 +266,6 @@ class NewsScheduler:
                 duration_seconds=duration
             ))
             
-            # 更新任务状态
-            task.last_crawl_time = datetime.now()
-            task.next_crawl_time = datetime.now() + timedelta(minutes=task.interval_minutes)
-            self.db.update_task(task)
-            
             logger.info(f"任务执行成功: {task.source_id}, 耗时: {duration:.2f}秒")
             
         except Exception as e:
@@ -250,19 +284,23 @@ class NewsScheduler:
                 crawl_time=datetime.now(),
                 duration_seconds=duration
             ))
+        
+        # 更新任务状态（失败同样按间隔推迟，避免立即重试）
+        # 重新读取任务：执行期间间隔等配置可能已通过 API 修改，只写回执行时间
+        current = self.db.get_task_by_source_id(task.source_id) or task
+        task.last_crawl_time = datetime.now()
+        task.next_crawl_time = self.next_run_time(current, task.last_crawl_time)
+        self.db.update_task_times(task.id, task.last_crawl_time, task.next_crawl_time)
     
     def get_task_statistics(self) -> Dict[str, int]:
         """获取任务统计"""
         tasks = self.db.get_all_tasks()
         enabled_tasks = [t for t in tasks if t.enabled]
         
-        # 获取最近的历史记录（24小时内）
-        recent_history = self.db.get_recent_history(limit=1000)
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        recent_history = [h for h in recent_history if h.crawl_time >= cutoff_time]
-        
-        success_count = sum(1 for h in recent_history if h.status == 'success')
-        failed_count = sum(1 for h in recent_history if h.status == 'failed')
+        # 统计最近24小时的历史记录
+        recent_counts = self.db.count_history_by_status(datetime.now() - timedelta(hours=24))
+        success_count = recent_counts.get('success', 0)
+        failed_count = recent_counts.get('failed', 0)
         
         # 统计国家数
         countries = set(t.country for t in tasks)
@@ -288,7 +326,7 @@ class NewsScheduler:
         """获取指定国家的任务"""
         return [t for t in self.db.get_all_tasks() if t.country == country]
     
-    def init_tasks_from_config(self, interval_minutes: int = 60):
+    def init_tasks_from_config(self, interval_minutes: float = 60):
         """从配置初始化任务"""
         logger.info(f"从已注册爬虫初始化任务，默认间隔: {interval_minutes}分钟")
         
@@ -308,10 +346,11 @@ class NewsScheduler:
                 country=crawler_info.get('country', '未知'),
                 enabled=True,
                 interval_minutes=interval_minutes,
-                next_crawl_time=datetime.now() + timedelta(minutes=interval_minutes)
             )
+            task.next_crawl_time = self.next_run_time(task)
             
             self.db.add_task(task)
+            self.schedule(task)
             logger.info(f"已创建任务: {source_id}")
         
         logger.info(f"任务初始化完成，共 {len(self.db.get_all_tasks())} 个任务")
@@ -7,13 +7,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from parsel import Selector
 from pydantic import Field
 
 from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
@@ -96,11 +96,11 @@ class SohuNewsCrawler(BaseNewsCrawler):
             return '.' in url or '/' in url
         return False
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -108,7 +108,7 @@ class SohuNewsCrawler(BaseNewsCrawler):
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         # Extract publish time from .article-info .time or #news-time
         publish_time = sel.xpath('//span[@id="news-time"]/text()').get() or \
@@ -159,20 +159,21 @@ class SohuNewsCrawler(BaseNewsCrawler):
 
         return []
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
         """
         contents = []
-        selector = Selector(text=html_content)
+        document = self.parse_document(html_content)
+        selector = document.selector
 
         # 从JavaScript JSON数据中提取真实图片URL
-        image_urls = self._extract_images_from_json(html_content)
+        image_urls = self._extract_images_from_json(document.html)
         image_index = 0
 
         # Sohu news content is in article#mp-editor
@@ -228,15 +229,16 @@ class SohuNewsCrawler(BaseNewsCrawler):
         Returns:
             NewsItem: 新闻详情
         """
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
 
         # Get title from h1 tag
         title = selector.xpath('//h1/text()').get("")
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title.strip(),
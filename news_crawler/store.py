@@ -0,0 +1,523 @@
+"""
+SQLite 持久化存储
+保存调度器的任务、爬取历史、文章，以及爬虫产出的 NewsItem
+"""
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from news_crawler.core.models import NewsItem
+from news_crawler.core.sinks import ItemSink
+from news_crawler.core.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class CrawlerTask:
+    """爬虫任务"""
+    id: int
+    source_id: str
+    source_name: str
+    url: str
+    country: str
+    enabled: bool = True
+    interval_minutes: float = 60
+    last_crawl_time: Optional[datetime] = None
+    next_crawl_time: Optional[datetime] = None
+    created_at: datetime = None
+    updated_at: datetime = None
+
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.now()
+        if self.updated_at is None:
+            self.updated_at = datetime.now()
+
+
+@dataclass
+class CrawlerHistory:
+    """爬取历史记录"""
+    id: int
+    task_id: int
+    source_id: str
+    url: str
+    status: str
+    articles_count: int
+    error_message: Optional[str]
+    crawl_time: datetime
+    duration_seconds: float
+
+
+@dataclass
+class Article:
+    """文章数据"""
+    id: int
+    source_id: str
+    article_id: str
+    title: str
+    url: str
+    author: Optional[str]
+    publish_time: Optional[datetime]
+    summary: Optional[str]
+    category: Optional[str]
+    created_at: datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id TEXT NOT NULL UNIQUE,
+    source_name TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL DEFAULT '',
+    enabled INTEGER NOT NULL DEFAULT 1,
+    interval_minutes REAL NOT NULL DEFAULT 60,
+    last_crawl_time TEXT,
+    next_crawl_time TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS crawl_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL,
+    source_id TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    articles_count INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    crawl_time TEXT NOT NULL,
+    duration_seconds REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_history_time ON crawl_history (crawl_time, id);
+CREATE INDEX IF NOT EXISTS idx_history_task ON crawl_history (task_id, crawl_time, id);
+CREATE INDEX IF NOT EXISTS idx_history_source ON crawl_history (source_id, crawl_time, id);
+
+CREATE TABLE IF NOT EXISTS crawl_articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    canonical_url TEXT,
+    author TEXT,
+    publish_time TEXT,
+    summary TEXT,
+    category TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_created ON crawl_articles (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON crawl_articles (source_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_article_id ON crawl_articles (article_id);
+CREATE INDEX IF NOT EXISTS idx_articles_canonical_url ON crawl_articles (canonical_url);
+
+CREATE TABLE IF NOT EXISTS news_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id TEXT NOT NULL DEFAULT '',
+    news_id TEXT NOT NULL DEFAULT '',
+    news_url TEXT NOT NULL DEFAULT '',
+    canonical_url TEXT UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    publish_time TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_news_items_created ON news_items (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_news_items_source ON news_items (source_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_news_items_news_id ON news_items (news_id);
+"""
+
+
+@dataclass
+class Page(Generic[T]):
+    """键集分页结果，next_cursor 为 None 表示没有更多数据"""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _ts(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _dt(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _canonical(url: str) -> Optional[str]:
+    return canonicalize_url(url) if url else None
+
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    """把排序键编码为游标"""
+    return f"{timestamp}|{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """解析游标，格式错误时抛出 ValueError"""
+    timestamp, sep, row_id = cursor.rpartition("|")
+    if not sep or not timestamp:
+        raise ValueError(f"无效的游标: {cursor}")
+    datetime.fromisoformat(timestamp)
+    return timestamp, int(row_id)
+
+
+class SQLiteStore:
+    """
+    基于 SQLite 的存储
+
+    文件数据库启用 WAL 模式：写入共用一个连接并加锁，读取使用线程本地连接，
+    读写互不阻塞。db_path 为 ":memory:" 时所有操作共用同一个连接（用于测试）。
+    列表接口按 (时间, id) 倒序做键集分页，翻页成本与偏移量无关。
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self.in_memory = db_path == ":memory:"
+        if not self.in_memory:
+            directory = os.path.dirname(os.path.abspath(db_path))
+            os.makedirs(directory, exist_ok=True)
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._conn = self._connect()
+        if not self.in_memory:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._write_lock:
+            self._conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        if self.in_memory:
+            with self._write_lock:
+                return self._conn.execute(sql, tuple(params)).fetchall()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn.execute(sql, tuple(params)).fetchall()
+
+    def close(self):
+        """关闭写连接（线程本地的读连接随线程回收）"""
+        with self._write_lock:
+            self._conn.close()
+
+    # ===== 任务 =====
+
+    def add_task(self, task: CrawlerTask) -> CrawlerTask:
+        """添加任务"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO crawl_tasks (source_id, source_name, url, country, enabled, "
+                "interval_minutes, last_crawl_time, next_crawl_time, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task.source_id, task.source_name, task.url, task.country, int(task.enabled),
+                    task.interval_minutes, _ts(task.last_crawl_time), _ts(task.next_crawl_time),
+                    _ts(task.created_at), _ts(task.updated_at),
+                ),
+            )
+        task.id = cursor.lastrowid
+        return task
+
+    def _task(self, row: sqlite3.Row) -> CrawlerTask:
+        return CrawlerTask(
+            id=row["id"],
+            source_id=row["source_id"],
+            source_name=row["source_name"],
+            url=row["url"],
+            country=row["country"],
+            enabled=bool(row["enabled"]),
+            interval_minutes=row["interval_minutes"],
+            last_crawl_time=_dt(row["last_crawl_time"]),
+            next_crawl_time=_dt(row["next_crawl_time"]),
+            created_at=_dt(row["created_at"]),
+            updated_at=_dt(row["updated_at"]),
+        )
+
+    def get_task_by_source_id(self, source_id: str) -> Optional[CrawlerTask]:
+        """根据source_id获取任务"""
+        rows = self._query("SELECT * FROM crawl_tasks WHERE source_id = ?", (source_id,))
+        return self._task(rows[0]) if rows else None
+
+    def get_all_tasks(self) -> List[CrawlerTask]:
+        """获取所有任务"""
+        return [self._task(row) for row in self._query("SELECT * FROM crawl_tasks ORDER BY id")]
+
+    def update_task(self, task: CrawlerTask):
+        """更新任务"""
+        task.updated_at = datetime.now()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE crawl_tasks SET source_name = ?, url = ?, country = ?, enabled = ?, "
+                "interval_minutes = ?, last_crawl_time = ?, next_crawl_time = ?, updated_at = ? "
+                "WHERE id = ?",
+                (
+                    task.source_name, task.url, task.country, int(task.enabled),
+                    task.interval_minutes, _ts(task.last_crawl_time), _ts(task.next_crawl_time),
+                    _ts(task.updated_at), task.id,
+                ),
+            )
+
+    def update_task_times(self, task_id: int, last_crawl_time: Optional[datetime],
+                          next_crawl_time: Optional[datetime]):
+        """只更新执行时间，不覆盖执行期间通过 API 修改的其他字段"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE crawl_tasks SET last_crawl_time = ?, next_crawl_time = ?, updated_at = ? WHERE id = ?",
+                (_ts(last_crawl_time), _ts(next_crawl_time), _ts(datetime.now()), task_id),
+            )
+
+    # ===== 爬取历史 =====
+
+    def add_history(self, history: CrawlerHistory) -> CrawlerHistory:
+        """添加历史记录"""
+        return self.add_history_batch([history])[0]
+
+    def add_history_batch(self, records: List[CrawlerHistory]) -> List[CrawlerHistory]:
+        """在一个事务中批量添加历史记录"""
+        with self._transaction() as conn:
+            for history in records:
+                cursor = conn.execute(
+                    "INSERT INTO crawl_history (task_id, source_id, url, status, articles_count, "
+                    "error_message, crawl_time, duration_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        history.task_id, history.source_id, history.url, history.status,
+                        history.articles_count, history.error_message, _ts(history.crawl_time),
+                        history.duration_seconds,
+                    ),
+                )
+                history.id = cursor.lastrowid
+        return records
+
+    def _history(self, row: sqlite3.Row) -> CrawlerHistory:
+        return CrawlerHistory(
+            id=row["id"],
+            task_id=row["task_id"],
+            source_id=row["source_id"],
+            url=row["url"],
+            status=row["status"],
+            articles_count=row["articles_count"],
+            error_message=row["error_message"],
+            crawl_time=_dt(row["crawl_time"]),
+            duration_seconds=row["duration_seconds"],
+        )
+
+    def list_history(
+        self,
+        task_id: Optional[int] = None,
+        source_id: Optional[str] = None,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        """按爬取时间倒序分页获取历史记录"""
+        where, params = [], []
+        if task_id is not None:
+            where.append("task_id = ?")
+            params.append(task_id)
+        if source_id is not None:
+            where.append("source_id = ?")
+            params.append(source_id)
+        if status is not None:
+            where.append("status = ?")
+            params.append(status)
+        return self._page("crawl_history", "crawl_time", where, params, cursor, limit, self._history)
+
+    def get_history_by_task_id(self, task_id: int, limit: int = 50) -> List[CrawlerHistory]:
+        """获取任务的历史记录"""
+        return self.list_history(task_id=task_id, limit=limit).items
+
+    def get_recent_history(self, limit: int = 50) -> List[CrawlerHistory]:
+        """获取最近的历史记录"""
+        return self.list_history(limit=limit).items
+
+    def count_history_by_status(self, since: datetime) -> Dict[str, int]:
+        """统计某时间之后各状态的历史记录数"""
+        rows = self._query(
+            "SELECT status, COUNT(*) AS total FROM crawl_history WHERE crawl_time >= ? GROUP BY status",
+            (_ts(since),),
+        )
+        return {row["status"]: row["total"] for row in rows}
+
+    # ===== 文章 =====
+
+    def add_article(self, article: Article) -> Article:
+        """添加文章"""
+        return self.add_articles([article])[0]
+
+    def add_articles(self, articles: List[Article]) -> List[Article]:
+        """在一个事务中批量添加文章"""
+        with self._transaction() as conn:
+            for article in articles:
+                cursor = conn.execute(
+                    "INSERT INTO crawl_articles (source_id, article_id, title, url, canonical_url, "
+                    "author, publish_time, summary, category, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        article.source_id, article.article_id, article.title, article.url,
+                        _canonical(article.url), article.author, _ts(article.publish_time),
+                        article.summary, article.category, _ts(article.created_at),
+                    ),
+                )
+                article.id = cursor.lastrowid
+        return articles
+
+    def _article(self, row: sqlite3.Row) -> Article:
+        return Article(
+            id=row["id"],
+            source_id=row["source_id"],
+            article_id=row["article_id"],
+            title=row["title"],
+            url=row["url"],
+            author=row["author"],
+            publish_time=_dt(row["publish_time"]),
+            summary=row["summary"],
+            category=row["category"],
+            created_at=_dt(row["created_at"]),
+        )
+
+    def list_articles(
+        self,
+        source_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        """按入库时间倒序分页获取文章"""
+        where, params = [], []
+        if source_id is not None:
+            where.append("source_id = ?")
+            params.append(source_id)
+        return self._page("crawl_articles", "created_at", where, params, cursor, limit, self._article)
+
+    def get_articles_by_source(self, source_id: str, limit: int = 50) -> List[Article]:
+        """获取指定源的文章"""
+        return self.list_articles(source_id=source_id, limit=limit).items
+
+    def find_articles_by_url(self, url: str) -> List[Article]:
+        """按规范化 URL 查找文章（用于去重）"""
+        rows = self._query(
+            "SELECT * FROM crawl_articles WHERE canonical_url = ? ORDER BY id", (_canonical(url),)
+        )
+        return [self._article(row) for row in rows]
+
+    # ===== NewsItem =====
+
+    def add_news_items(self, items: List[NewsItem], source_id: str = "") -> int:
+        """
+        批量写入 NewsItem，按规范化 URL 去重（重复时覆盖为最新内容）
+
+        返回写入的条数
+        """
+        now = _ts(datetime.now())
+        rows = [
+            (
+                source_id, item.news_id, item.news_url, _canonical(item.news_url), item.title,
+                item.meta_info.publish_time, item.model_dump_json(exclude_none=True), now,
+            )
+            for item in items
+        ]
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO news_items (source_id, news_id, news_url, canonical_url, title, "
+                "publish_time, data, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(canonical_url) DO UPDATE SET source_id = excluded.source_id, "
+                "news_id = excluded.news_id, news_url = excluded.news_url, title = excluded.title, "
+                "publish_time = excluded.publish_time, data = excluded.data",
+                rows,
+            )
+        return len(rows)
+
+    def get_news_item_by_url(self, url: str) -> Optional[NewsItem]:
+        """按规范化 URL 获取 NewsItem"""
+        rows = self._query("SELECT data FROM news_items WHERE canonical_url = ?", (_canonical(url),))
+        return NewsItem.model_validate_json(rows[0]["data"]) if rows else None
+
+    def get_news_items_by_news_id(self, news_id: str) -> List[NewsItem]:
+        """按 news_id 获取 NewsItem"""
+        rows = self._query("SELECT data FROM news_items WHERE news_id = ? ORDER BY id", (news_id,))
+        return [NewsItem.model_validate_json(row["data"]) for row in rows]
+
+    def list_news_items(
+        self,
+        source_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        """按入库时间倒序分页获取 NewsItem"""
+        where, params = [], []
+        if source_id is not None:
+            where.append("source_id = ?")
+            params.append(source_id)
+        return self._page(
+            "news_items", "created_at", where, params, cursor, limit,
+            lambda row: NewsItem.model_validate_json(row["data"]),
+        )
+
+    # ===== 分页 =====
+
+    def _page(self, table, time_column, where, params, cursor, limit, build) -> Page:
+        where, params = list(where), list(params)
+        if cursor:
+            timestamp, row_id = decode_cursor(cursor)
+            where.append(f"({time_column}, id) < (?, ?)")
+            params.extend([timestamp, row_id])
+        sql = f"SELECT * FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {time_column} DESC, id DESC LIMIT ?"
+        rows = self._query(sql, params + [limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last[time_column], last["id"])
+        return Page(items=[build(row) for row in rows[:limit]], next_cursor=next_cursor)
+
+
+class SQLiteSink(ItemSink):
+    """把 NewsItem 批量写入 SQLiteStore 的 sink"""
+
+    def __init__(self, store: SQLiteStore, source_id: str = "", batch_size: int = 100):
+        self.store = store
+        self.source_id = source_id
+        self.batch_size = batch_size
+        self._buffer: List[NewsItem] = []
+        self._lock = threading.Lock()
+
+    def write(self, news_item: NewsItem, key: str) -> str:
+        with self._lock:
+            self._buffer.append(news_item)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+        return f"sqlite:{self.store.db_path}#{key}"
+
+    def _flush_locked(self) -> None:
+        if self._buffer:
+            items, self._buffer = self._buffer, []
+            self.store.add_news_items(items, source_id=self.source_id)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
@@ -9,13 +9,13 @@ import json
 import re
 from typing import List, Optional
 
-from parsel import Selector
 from pydantic import Field
 
 from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
@@ -103,11 +103,11 @@ class TencentNewsCrawler(BaseNewsCrawler):
 
         return {}
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -117,7 +117,9 @@ class TencentNewsCrawler(BaseNewsCrawler):
         )
 
         # 从window.DATA中提取元信息
-        window_data = self._extract_window_data(html_content)
+        window_data = self.parse_document(html_content).memo(
+            "window_data", self._extract_window_data
+        )
 
         author_name = window_data.get("media", "")
         publish_time = window_data.get("pubtime", "")
@@ -128,17 +130,17 @@ class TencentNewsCrawler(BaseNewsCrawler):
             author_url="",
         )
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
         """
         contents = []
-        selector = Selector(text=html_content)
+        selector = self.parse_document(html_content).selector
 
         # Tencent news content is in div.rich_media_content
         elements = selector.xpath('//div[@class="rich_media_content"]/*')
@@ -182,15 +184,16 @@ class TencentNewsCrawler(BaseNewsCrawler):
         Returns:
             NewsItem: 新闻详情
         """
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
 
         # Get title from h1
         title = selector.xpath('//h1/text()').get("")
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title.strip(),
@@ -7,13 +7,13 @@ from __future__ import annotations
 
 from typing import List, Optional
 
-from parsel import Selector
 from pydantic import Field
 
 from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
@@ -68,11 +68,11 @@ class ToutiaoNewsCrawler(BaseNewsCrawler):
         except Exception as exc:  # pragma: no cover - defensive branch
             raise ValueError("解析文章ID失败，请检查URL是否正确") from exc
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         """解析新闻详情页元信息
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             NewsMetaInfo: 新闻元信息
@@ -80,7 +80,7 @@ class ToutiaoNewsCrawler(BaseNewsCrawler):
         self.logger.info(
             "Start to parse html to news meta, news_url: %s", self.new_url
         )
-        sel = Selector(text=html_content)
+        sel = self.parse_document(html_content).selector
 
         publish_time = sel.xpath("//div[@class='article-meta']/span[1]/text()").get() or ""
         author_name = sel.xpath("//div[@class='article-meta']/span[@class='name']/a/text()").get() or ""
@@ -92,17 +92,17 @@ class ToutiaoNewsCrawler(BaseNewsCrawler):
             author_url=(self.get_base_url + author_url.strip()) if author_url else "",
         )
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析新闻详情页内容
 
         Args:
-            html_content (str): 新闻详情页内容
+            html_content (HtmlSource): 新闻详情页内容
 
         Returns:
             List[ContentItem]: 新闻内容
         """
         contents = []
-        selector = Selector(text=html_content)
+        selector = self.parse_document(html_content).selector
 
         elements = selector.xpath('//article/*')
         for element in elements:
@@ -131,13 +131,14 @@ class ToutiaoNewsCrawler(BaseNewsCrawler):
         return contents
 
     def parse_content(self, html: str) -> NewsItem:
-        selector = Selector(text=html)
+        document = self.parse_document(html)
+        selector = document.selector
         title = selector.xpath("//h1/text()").get("") or ""
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = self.parse_html_to_news_content(html)
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = self.parse_html_to_news_content(document)
 
         return self.compose_news_item(
             title=title.strip(),
@@ -68,6 +68,8 @@ class TwitterNewsCrawler(BaseNewsCrawler):
     headers_model = TwitterRequestHeaders
     fetch_strategy = TwitterApiFetcher
     persist_by_default = True
+    # 解析依赖 fetch_content 缓存的推文数据，不能交给解析子进程
+    parse_in_worker = False
 
     def __init__(
         self,
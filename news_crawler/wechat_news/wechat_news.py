@@ -17,9 +17,11 @@ from news_crawler.core import (
     BaseNewsCrawler,
     ContentItem,
     ContentType,
+    HtmlSource,
     NewsItem,
     NewsMetaInfo,
     RequestHeaders as BaseRequestHeaders,
+    as_document,
 )
 from news_crawler.core.fetchers import CurlCffiFetcher, FetchRequest
 
@@ -204,23 +206,23 @@ class WechatContentParser:
         """初始化微信公众号文章正文内容解析器"""
         self._contents: List[ContentItem] = []
 
-    def parse_html_to_news_content(self, html_content: str) -> List[ContentItem]:
+    def parse_html_to_news_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析公众号文章详情页内容，保持段落结构
            微信公众号的由于出在多编辑器的情况，所以解析比较复杂
 
         Args:
-            html_content (str): 公众号文章内容
+            html_content (HtmlSource): 公众号文章内容或已解析的文档
 
         Returns:
             List[ContentItem]: 公众号章内容，每个段落作为独立的ContentItem
         """
         self._contents = []
-        selector = Selector(text=html_content)     
-        content_node = selector.xpath('//div[@id="js_content"]')
+        document = as_document(html_content)
+        content_node = document.selector.xpath('//div[@id="js_content"]')
         
         # 检查是否是SSR渲染的页面, 如果通过xpath没有找到js_content节点, 则认为不是SSR渲染的页面, 则调用parse_ssr_content方法
         if not content_node: 
-            return self.parse_ssr_content(html_content)
+            return self.parse_ssr_content(document)
            
         # 处理所有直接子节点
         for node in content_node.xpath("./*"):
@@ -229,7 +231,7 @@ class WechatContentParser:
         contents = [item for item in self._contents if item.content.strip()]
         return self._remove_duplicate_contents(contents)
 
-    def parse(self, html_content: str) -> List[ContentItem]:
+    def parse(self, html_content: HtmlSource) -> List[ContentItem]:
         """兼容 ContentParser 协议。"""
         return self.parse_html_to_news_content(html_content)
 
@@ -426,18 +428,19 @@ class WechatContentParser:
                 self._contents.append(ContentItem(type=ContentType.TEXT, content=text))
             return
 
-    def parse_ssr_content(self, html_content: str) -> List[ContentItem]:
+    def parse_ssr_content(self, html_content: HtmlSource) -> List[ContentItem]:
         """解析SSR渲染的页面内容
 
         Args:
-            html_content (str): 页面HTML内容
+            html_content (HtmlSource): 页面HTML内容或已解析的文档
 
         Returns:
             List[ContentItem]: 解析后的内容列表
         """
         # 提取SSR数据
         contents = []
-        ssr_data_dict = _parse_ssr_data(html_content)
+        document = as_document(html_content)
+        ssr_data_dict = document.memo("ssr_data", _parse_ssr_data)
 
         if ssr_data_dict:
             try:
@@ -453,7 +456,7 @@ class WechatContentParser:
 
                 # 方案2：从HTML中提取图片列表（旧版window.picture_page_info_list格式）
                 if not picture_list:
-                    contents.extend(_parse_ssr_image_list(html_content))
+                    contents.extend(_parse_ssr_image_list(document.html))
 
                 # 提取文本内容
                 # 有的xhs风格的公众号页面，没有desc，只有title，要兼容一下。
@@ -514,10 +517,11 @@ class WeChatNewsCrawler(BaseNewsCrawler):
         match = re.search(pattern, html_content)
         return match.group(1) if match else ""
 
-    def parse_html_to_news_meta(self, html_content: str) -> NewsMetaInfo:
+    def parse_html_to_news_meta(self, html_content: HtmlSource) -> NewsMetaInfo:
         self.logger.info("Start to parse html to news meta, news_url: %s", self.new_url)
 
-        ssr_data = _parse_ssr_data(html_content)
+        document = self.parse_document(html_content)
+        ssr_data = document.memo("ssr_data", _parse_ssr_data)
         if ssr_data:
             author_name = ssr_data.get("nick_name", "")
 
@@ -540,8 +544,8 @@ class WeChatNewsCrawler(BaseNewsCrawler):
                 author_url="",
             )
 
-        sel = Selector(text=html_content)
-        publish_time = self._parse_publish_time(html_content)
+        sel = document.selector
+        publish_time = self._parse_publish_time(document.html)
         wechat_name = sel.xpath("string(//span[@id='profileBt'])").get("").strip() or ""
         wechat_author_url = (
             sel.xpath(
@@ -560,20 +564,20 @@ class WeChatNewsCrawler(BaseNewsCrawler):
         )
 
     def parse_content(self, html: str) -> NewsItem:
-        ssr_data = _parse_ssr_data(html)
+        document = self.parse_document(html)
+        ssr_data = document.memo("ssr_data", _parse_ssr_data)
         if ssr_data:            
             title = (ssr_data.get("title") or "").strip()
         else:
-            selector = Selector(text=html)
             title = (
-                selector.xpath('//h1[@id="activity-name"]/text()').get("") or ""
+                document.selector.xpath('//h1[@id="activity-name"]/text()').get("") or ""
             ).strip()
 
         if not title:
             raise ValueError("Failed to get title")
 
-        meta_info = self.parse_html_to_news_meta(html)
-        contents = list[ContentItem](self._content_parser.parse(html))
+        meta_info = self.parse_html_to_news_meta(document)
+        contents = list[ContentItem](self._content_parser.parse(document))
 
         return self.compose_news_item(
             title=title,
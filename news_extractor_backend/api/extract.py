@@ -2,19 +2,48 @@
 """
 提取 API
 """
+import hashlib
+import json
 import os
-from fastapi import APIRouter, HTTPException
+import threading
+import uuid
+from collections import OrderedDict
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, List, Literal, Optional, Dict, Any, Tuple
 from datetime import datetime
 
-from news_extractor_core.services import ExtractorService, to_markdown, get_supported_platforms
+from news_extractor_core.services import (
+    BatchResult,
+    ExtractorService,
+    ResultCache,
+    TranscodeOptions,
+    cache_key,
+    get_result_cache,
+    get_supported_platforms,
+    iter_batch,
+    to_markdown,
+)
+
+from ..executor import BoundedExecutor, ExecutorBusy, get_extract_executor
 
 router = APIRouter()
 
 # 图片保存根目录
 IMAGES_BASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "images")
 
+# 提取结果保留时长（秒），期间可通过 /extract/{id}/markdown 按需生成 Markdown
+STORED_RESULT_TTL = float(os.getenv("NEWS_EXTRACT_RESULT_TTL", "3600"))
+STORED_RESULT_SIZE = int(os.getenv("NEWS_EXTRACT_RESULT_SIZE", "256"))
+# 已生成的 Markdown 缓存条数（嵌入图片时单条可能很大）
+MARKDOWN_CACHE_SIZE = int(os.getenv("NEWS_MARKDOWN_CACHE_SIZE", "64"))
+
+# 按提取 ID 保存的 NewsItem，只在内存中，与提取缓存的开关无关
+_stored_results = ResultCache(ttl=STORED_RESULT_TTL, max_entries=STORED_RESULT_SIZE, disk_dir=None)
+_markdown_cache: "OrderedDict[Tuple[str, bool, bool, Optional[TranscodeOptions]], Tuple[str, Optional[str]]]" = OrderedDict()
+_markdown_lock = threading.Lock()
+
 
 class ExtractRequest(BaseModel):
     """提取请求"""
@@ -22,6 +51,10 @@ class ExtractRequest(BaseModel):
     output_format: str = Field(default="json", description="输出格式: json 或 markdown")
     platform: Optional[str] = Field(default=None, description="平台名称（可选，自动检测）")
     embed_images: bool = Field(default=False, description="是否将图片转为 Base64 嵌入 Markdown")
+    transcode_images: bool = Field(default=False, description="嵌入前是否缩放并重新编码图片（需要 Pillow）")
+    image_max_dimension: Optional[int] = Field(default=1280, ge=16, description="转码后图片长边上限（像素）")
+    image_format: Literal["webp", "jpeg"] = Field(default="webp", description="转码格式")
+    image_quality: int = Field(default=80, ge=1, le=100, description="转码质量")
     save_images_locally: bool = Field(default=False, description="是否将图片保存到本地")
     cookie: Optional[str] = Field(default=None, description="Cookie 字符串，用于需要认证的平台（如 Twitter）")
 
@@ -29,6 +62,7 @@ class ExtractRequest(BaseModel):
 class ExtractResponse(BaseModel):
     """提取响应"""
     status: str
+    id: Optional[str] = None
     data: Optional[Dict[str, Any]] = None
     markdown: Optional[str] = None
     platform: Optional[str] = None
@@ -37,41 +71,137 @@ class ExtractResponse(BaseModel):
     error: Optional[Dict[str, str]] = None
 
 
+class BatchExtractRequest(BaseModel):
+    """批量提取请求"""
+    urls: List[str] = Field(..., min_length=1, max_length=500, description="新闻链接列表")
+    include_markdown: bool = Field(default=False, description="每条结果是否附带 Markdown（不下载图片）")
+    concurrency: int = Field(default=8, ge=1, le=16, description="最大并发数")
+    timeout_seconds: Optional[float] = Field(default=120, gt=0, description="整体截止时间（秒）")
+    stream_format: Optional[Literal["ndjson", "sse"]] = Field(
+        default=None, description="流格式；不指定时按 Accept 头判断，默认 ndjson")
+
+
+def _extract_id(request: ExtractRequest, platform: str) -> str:
+    """提取 ID：无 Cookie 时由平台 + 规范化 URL 派生，带 Cookie 的结果只能通过随机 ID 取回"""
+    if request.cookie:
+        return uuid.uuid4().hex
+    return hashlib.sha256(cache_key(request.url, platform).encode("utf-8")).hexdigest()[:32]
+
+
+def _store_result(extract_id: str, news_item, platform: str):
+    _stored_results.put(extract_id, news_item, platform)
+    with _markdown_lock:
+        for key in [key for key in _markdown_cache if key[0] == extract_id]:
+            del _markdown_cache[key]
+
+
+def _transcode_options(transcode_images: bool, max_dimension: Optional[int], image_format: str,
+                       quality: int) -> Optional[TranscodeOptions]:
+    if not transcode_images:
+        return None
+    return TranscodeOptions(max_dimension=max_dimension, format=image_format, quality=quality)
+
+
+def _render_markdown(news_item, platform: str, embed_images: bool, save_images_locally: bool,
+                     transcode: Optional[TranscodeOptions] = None) -> Tuple[str, Optional[str]]:
+    """生成 Markdown，返回 (markdown, 图片保存目录)"""
+    images_dir = ""
+    if save_images_locally and news_item.news_id:
+        images_dir = os.path.join(IMAGES_BASE_DIR, news_item.news_id)
+    markdown = to_markdown(
+        news_item,
+        embed_images=embed_images,
+        save_images_locally=save_images_locally,
+        images_dir=images_dir,
+        platform=platform,
+        transcode=transcode
+    )
+    return markdown, images_dir if save_images_locally else None
+
+
+def _extract(request: ExtractRequest) -> Dict[str, Any]:
+    """在执行器线程中完成抓取、解析（以及请求了 Markdown 时的生成），均为阻塞操作"""
+    # 提取新闻
+    news_item, platform = ExtractorService.extract_news(
+        url=request.url,
+        platform=request.platform,
+        cookie=request.cookie
+    )
+    extract_id = _extract_id(request, platform)
+    _store_result(extract_id, news_item, platform)
+
+    # 准备响应数据
+    response = {
+        "status": "success",
+        "id": extract_id,
+        "data": news_item.to_dict(),
+        "platform": platform,
+        "extracted_at": datetime.now().isoformat(),
+        "images_dir": None,
+        "markdown": None,
+    }
+    # JSON 输出不生成 Markdown，也就不会下载或编码图片；需要时再调用 /extract/{id}/markdown
+    if request.output_format == "markdown":
+        transcode = _transcode_options(request.transcode_images, request.image_max_dimension,
+                                       request.image_format, request.image_quality)
+        markdown, images_dir = _markdown_for(extract_id, news_item, platform, request.embed_images,
+                                             request.save_images_locally, transcode)
+        response["markdown"] = markdown
+        response["images_dir"] = images_dir
+    return response
+
+
+def _markdown_for(extract_id: str, news_item, platform: str, embed_images: bool, save_images_locally: bool,
+                  transcode: Optional[TranscodeOptions] = None) -> Tuple[str, Optional[str]]:
+    """按 (提取 ID, 图片选项) 缓存生成的 Markdown"""
+    if not embed_images or save_images_locally:
+        transcode = None  # 只有 Base64 嵌入会转码
+    key = (extract_id, embed_images, save_images_locally, transcode)
+    with _markdown_lock:
+        cached = _markdown_cache.get(key)
+        if cached is not None:
+            _markdown_cache.move_to_end(key)
+            return cached
+    rendered = _render_markdown(news_item, platform, embed_images, save_images_locally, transcode)
+    with _markdown_lock:
+        _markdown_cache[key] = rendered
+        while len(_markdown_cache) > MARKDOWN_CACHE_SIZE:
+            _markdown_cache.popitem(last=False)
+    return rendered
+
+
+def _stored_markdown(extract_id: str, embed_images: bool, save_images_locally: bool,
+                     transcode: Optional[TranscodeOptions] = None) -> Optional[Dict[str, Any]]:
+    stored = _stored_results.get(extract_id)
+    if stored is None:
+        return None
+    news_item, platform = stored
+    markdown, images_dir = _markdown_for(extract_id, news_item, platform, embed_images,
+                                         save_images_locally, transcode)
+    return {
+        "status": "success",
+        "id": extract_id,
+        "markdown": markdown,
+        "platform": platform,
+        "images_dir": images_dir,
+    }
+
+
 @router.post("/extract", response_model=ExtractResponse)
 async def extract_news(request: ExtractRequest):
     """提取新闻内容"""
     try:
-        # 提取新闻
-        news_item, platform = ExtractorService.extract_news(
-            url=request.url,
-            platform=request.platform,
-            cookie=request.cookie
-        )
-
-        # 构建图片保存目录
-        images_dir = ""
-        if request.save_images_locally and news_item.news_id:
-            images_dir = os.path.join(IMAGES_BASE_DIR, news_item.news_id)
-
-        # 准备响应数据
-        response_data = {
-            "status": "success",
-            "data": news_item.to_dict(),
-            "platform": platform,
-            "extracted_at": datetime.now().isoformat(),
-            "images_dir": images_dir if request.save_images_locally else None,
-            # 总是生成 markdown，方便前端切换格式
-            "markdown": to_markdown(
-                news_item,
-                embed_images=request.embed_images,
-                save_images_locally=request.save_images_locally,
-                images_dir=images_dir,
-                platform=platform
-            )
-        }
-
-        return response_data
+        # 阻塞的提取工作交给有界执行器，事件循环保持响应
+        return await get_extract_executor().run(_extract, request)
 
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, headers={"Retry-After": str(e.retry_after)}, detail={
+            "status": "error",
+            "error": {
+                "code": "SERVER_BUSY",
+                "message": str(e)
+            }
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail={
             "status": "error",
@@ -90,6 +220,117 @@ async def extract_news(request: ExtractRequest):
         })
 
 
+@router.get("/extract/{extract_id}/markdown")
+async def extract_markdown(
+    extract_id: str,
+    embed_images: bool = False,
+    save_images_locally: bool = False,
+    transcode_images: bool = False,
+    image_max_dimension: Optional[int] = Query(default=1280, ge=16),
+    image_format: Literal["webp", "jpeg"] = "webp",
+    image_quality: int = Query(default=80, ge=1, le=100),
+):
+    """按提取 ID 生成（或从缓存返回）Markdown，无需重新抓取"""
+    transcode = _transcode_options(transcode_images, image_max_dimension, image_format, image_quality)
+    try:
+        result = await get_extract_executor().run(_stored_markdown, extract_id, embed_images,
+                                                  save_images_locally, transcode)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, headers={"Retry-After": str(e.retry_after)}, detail={
+            "status": "error",
+            "error": {
+                "code": "SERVER_BUSY",
+                "message": str(e)
+            }
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={
+            "status": "error",
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": f"服务器内部错误: {str(e)}"
+            }
+        })
+    if result is None:
+        raise HTTPException(status_code=404, detail={
+            "status": "error",
+            "error": {
+                "code": "RESULT_NOT_FOUND",
+                "message": "提取结果不存在或已过期，请重新提取"
+            }
+        })
+    return result
+
+
+async def _batch_events(request: BatchExtractRequest) -> AsyncIterator[Dict[str, Any]]:
+    """按完成顺序产出每个 URL 的结果，最后产出汇总"""
+    executor = get_extract_executor()
+
+    async def extract(url: str):
+        # 批量任务在子名额内排队等待，不会因执行器繁忙而整批失败
+        return await executor.run_batch(ExtractorService.extract_news, url)
+
+    counts = {"success": 0, "error": 0, "timeout": 0}
+    async for result in iter_batch(request.urls, extract=extract, concurrency=request.concurrency,
+                                   deadline=request.timeout_seconds):
+        counts[result.status] += 1
+        yield await _batch_event(result, request.include_markdown, executor)
+    yield {
+        "type": "summary",
+        "total": len(request.urls),
+        "successful": counts["success"],
+        "failed": counts["error"] + counts["timeout"],
+        "timed_out": counts["timeout"],
+    }
+
+
+async def _batch_event(result: BatchResult, include_markdown: bool,
+                       executor: BoundedExecutor) -> Dict[str, Any]:
+    event: Dict[str, Any] = {
+        "type": "result",
+        "index": result.index,
+        "url": result.url,
+        "status": result.status,
+        "elapsed": round(result.elapsed, 3),
+    }
+    if result.ok:
+        event["platform"] = result.platform
+        event["data"] = result.news.to_dict()
+        if include_markdown:
+            event["markdown"] = await executor.run_batch(to_markdown, result.news, platform=result.platform)
+    else:
+        event["error"] = result.error
+    return event
+
+
+@router.post("/extract/batch")
+async def extract_batch(request: BatchExtractRequest, http_request: Request):
+    """
+    批量提取，结果按完成顺序流式返回
+
+    ndjson: 每行一个 JSON；sse: 每条结果一个 result 事件，最后一个 summary 事件。
+    每条结果带 index 字段标明其在输入中的位置。
+    """
+    stream_format = request.stream_format
+    if stream_format is None:
+        accept = http_request.headers.get("accept", "")
+        stream_format = "sse" if "text/event-stream" in accept else "ndjson"
+
+    async def body():
+        async for event in _batch_events(request):
+            payload = json.dumps(event, ensure_ascii=False)
+            if stream_format == "sse":
+                yield f"event: {event['type']}\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type, headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # 关闭反向代理缓冲，保证逐条推送
+    })
+
+
 @router.get("/platforms")
 async def list_platforms():
     """获取支持的平台列表"""
@@ -104,5 +345,7 @@ async def health_check():
     """健康检查"""
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now().isoformat(),
+        "extract_executor": get_extract_executor().stats(),
+        "result_cache": get_result_cache().stats()
     }
@@ -2,54 +2,233 @@
 """
 图片代理 API - 解决微信公众号图片防盗链问题
 """
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
-import requests
-from typing import Optional
+import asyncio
+import os
+import re
+from typing import Optional, Set, Tuple
+
+import httpx
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from news_crawler.core.sessions import get_async_client
+from news_extractor_core.services import StoredImage, get_image_downloader, get_image_store
 
 router = APIRouter()
 
+# 单张图片的大小上限，超过则拒绝（不缓存、不继续转发）
+PROXY_MAX_BYTES = int(os.getenv("NEWS_PROXY_MAX_BYTES", str(20 * 1024 * 1024)))
+PROXY_TIMEOUT = float(os.getenv("NEWS_PROXY_TIMEOUT", "10"))
+CHUNK_SIZE = 64 * 1024
+
+# 设置请求头，伪装成微信公众号平台的请求
+UPSTREAM_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Referer': 'https://mp.weixin.qq.com/',
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+}
+
+CACHE_HEADERS = {
+    'Cache-Control': 'public, max-age=86400',  # 缓存1天
+    'Access-Control-Allow-Origin': '*',
+}
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# 正在读取上游的任务；事件循环只保留任务的弱引用，这里持有强引用直到任务结束
+_pump_tasks: Set[asyncio.Task] = set()
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class UpstreamTooLarge(Exception):
+    """未声明长度的上游响应超过大小上限，响应头已发出，只能中止传输"""
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """解析单段 Range 头，返回闭区间 (start, end)；多段或无法解析时返回 None（回退为完整响应）"""
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N 表示最后 N 个字节
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _read_range(path: str, start: int, end: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start + 1)
+
+
+async def _serve_cached(image: StoredImage, request: Request) -> Response:
+    """从本地缓存返回图片，支持 If-None-Match 和单段 Range"""
+    headers = {**CACHE_HEADERS, "ETag": image.strong_etag, "Accept-Ranges": "bytes",
+               "X-Proxy-Cache": "HIT"}
+    if _etag_matches(request.headers.get("if-none-match"), image.strong_etag):
+        return Response(status_code=304, headers=headers)
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = None
+        if if_range is None or if_range == image.strong_etag:
+            byte_range = _parse_range(request.headers.get("range"), image.size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{image.size}"})
+    if byte_range is None:
+        return FileResponse(image.path, media_type=image.content_type, headers=headers)
+    start, end = byte_range
+    body = await asyncio.to_thread(_read_range, image.path, start, end)
+    headers["Content-Range"] = f"bytes {start}-{end}/{image.size}"
+    return Response(body, status_code=206, media_type=image.content_type, headers=headers)
+
 
 @router.get("/image")
-async def proxy_image(url: str = Query(..., description="图片URL")):
+async def proxy_image(request: Request, url: str = Query(..., description="图片URL")):
     """
     代理获取图片，解决防盗链问题
 
+    上游请求走共享的异步连接池并流式转发，完整下载的图片写入内容寻址的磁盘缓存，
+    之后的请求直接从缓存返回（支持 ETag 和 Range）。
+
     Args:
         url: 图片的原始URL
 
     Returns:
         图片的二进制流
     """
+    if not url.startswith(("http://", "https://")):
+        raise HTTPException(status_code=400, detail="仅支持 http/https 图片地址")
+
+    store = get_image_store()
+    cached = await asyncio.to_thread(store.get, url)
+    if cached is not None:
+        return await _serve_cached(cached, request)
+
+    # 缓存未命中：Range 和条件请求转发给上游，只有完整的 200 响应才写入缓存
+    headers = dict(UPSTREAM_HEADERS)
+    for name in ("range", "if-range", "if-none-match"):
+        if name in request.headers:
+            headers[name.title()] = request.headers[name]
+
+    # 与 ImageService 共用下载引擎的全局/每主机名额，上游响应读完即归还，不等待客户端接收完
+    downloader = get_image_downloader()
+    await downloader.acquire(url)
+    streaming = False
     try:
-        # 设置请求头，伪装成微信公众号平台的请求
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Referer': 'https://mp.weixin.qq.com/',
-            'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        }
-
-        # 请求图片
-        response = requests.get(url, headers=headers, timeout=10, stream=True)
-
-        if response.status_code != 200:
+        client = get_async_client("httpx")
+        try:
+            upstream = await client.send(
+                client.build_request("GET", url, headers=headers, timeout=PROXY_TIMEOUT),
+                stream=True, follow_redirects=True,
+            )
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=500, detail=f"请求图片失败: {str(e)}")
+
+        if upstream.status_code == 304:
+            await upstream.aclose()
+            return Response(status_code=304, headers=CACHE_HEADERS)
+        if upstream.status_code not in (200, 206):
+            await upstream.aclose()
             raise HTTPException(status_code=404, detail="图片获取失败")
 
+        length = upstream.headers.get("content-length")
+        if length and length.isdigit() and int(length) > PROXY_MAX_BYTES:
+            await upstream.aclose()
+            raise HTTPException(status_code=413, detail=f"图片超过大小上限 {PROXY_MAX_BYTES} 字节")
+
         # 获取内容类型
-        content_type = response.headers.get('content-type', 'image/jpeg')
+        content_type = upstream.headers.get('content-type', 'image/jpeg')
+        response_headers = {**CACHE_HEADERS, "X-Proxy-Cache": "MISS"}
+        for name in ("etag", "content-range", "accept-ranges", "last-modified"):
+            if name in upstream.headers:
+                response_headers[name.title()] = upstream.headers[name]
+        if length and "content-encoding" not in upstream.headers:
+            response_headers["Content-Length"] = length
+
+        # 磁盘读写放到线程池，不阻塞事件循环
+        writer = await asyncio.to_thread(store.writer, url) if upstream.status_code == 200 else None
+        # 上游数据先进入队列（最多 PROXY_MAX_BYTES），客户端接收慢时不拖住上游连接和下载名额
+        chunks: asyncio.Queue = asyncio.Queue()
+        finished = False
+
+        async def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            downloader.release(url)
+            try:
+                if writer is not None:
+                    await asyncio.to_thread(writer.abort)
+            finally:
+                await upstream.aclose()
+
+        async def pump():
+            received = 0
+            try:
+                async for chunk in upstream.aiter_bytes(CHUNK_SIZE):
+                    received += len(chunk)
+                    if received > PROXY_MAX_BYTES:
+                        # 未声明长度的超大响应：中止传输（客户端收到不完整的响应而不是截断的 200），放弃缓存
+                        raise UpstreamTooLarge(f"图片超过大小上限 {PROXY_MAX_BYTES} 字节: {url}")
+                    if writer is not None:
+                        await asyncio.to_thread(writer.write, chunk)
+                    chunks.put_nowait(chunk)
+                if writer is not None:
+                    await asyncio.to_thread(writer.commit, content_type, upstream.headers.get("etag"))
+            except Exception as e:
+                chunks.put_nowait(e)
+            finally:
+                chunks.put_nowait(None)
+                await finish()
+
+        # 在返回响应之前就开始读取上游：即使客户端在响应头发出前断开、body() 从未执行，
+        # 上游读完后也会归还名额、关闭连接并清理临时文件
+        task = asyncio.create_task(pump())
+        _pump_tasks.add(task)
+        task.add_done_callback(_pump_tasks.discard)
+
+        async def body():
+            try:
+                while True:
+                    chunk = await chunks.get()
+                    if chunk is None:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield chunk
+            finally:
+                # 客户端提前断开时停止读取上游
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                # 任务在开始运行前就被取消时，由这里归还名额
+                await finish()
 
         # 返回图片流
-        return StreamingResponse(
-            response.iter_content(chunk_size=8192),
-            media_type=content_type,
-            headers={
-                'Cache-Control': 'public, max-age=86400',  # 缓存1天
-                'Access-Control-Allow-Origin': '*',
-            }
-        )
-
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"请求图片失败: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"代理图片失败: {str(e)}")
+        streaming = True
+        return StreamingResponse(body(), status_code=upstream.status_code, media_type=content_type,
+                                 headers=response_headers)
+    finally:
+        if not streaming:
+            downloader.release(url)
@@ -1,9 +1,10 @@
 """
 调度器管理 API
 """
+import os
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 from news_crawler.scheduler import NewsScheduler
@@ -15,12 +16,18 @@ router = APIRouter()
 # 全局调度器实例
 _scheduler: Optional[NewsScheduler] = None
 
+# 调度器数据库路径（任务、历史、文章重启后保留）
+SCHEDULER_DB_PATH = os.getenv("NEWS_SCHEDULER_DB", "data/scheduler.db")
+
+# 分页游标通过响应头返回，响应体保持为列表
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 def get_scheduler() -> NewsScheduler:
     """获取调度器实例"""
     global _scheduler
     if _scheduler is None:
-        _scheduler = NewsScheduler()
+        _scheduler = NewsScheduler(db_path=SCHEDULER_DB_PATH)
         register_all_crawlers(_scheduler)
     return _scheduler
 
@@ -35,7 +42,7 @@ class TaskResponse(BaseModel):
     url: str
     country: str
     enabled: bool
-    interval_minutes: int
+    interval_minutes: float
     last_crawl_time: Optional[datetime]
     next_crawl_time: Optional[datetime]
     created_at: datetime
@@ -91,7 +98,7 @@ class StatsResponse(BaseModel):
 class TaskUpdateRequest(BaseModel):
     """任务更新请求"""
     enabled: Optional[bool] = None
-    interval_minutes: Optional[int] = None
+    interval_minutes: Optional[float] = Field(None, gt=0, description="爬取间隔（分钟），支持小于1分钟")
 
 
 # ===== API 路由 =====
@@ -100,10 +107,7 @@ class TaskUpdateRequest(BaseModel):
 async def get_scheduler_status():
     """获取调度器状态"""
     scheduler = get_scheduler()
-    return {
-        "running": scheduler.running,
-        "registered_crawlers": len(scheduler.crawlers)
-    }
+    return scheduler.get_status()
 
 
 @router.post("/scheduler/start")
@@ -234,8 +238,9 @@ async def update_task(source_id: str, update: TaskUpdateRequest):
         task.enabled = update.enabled
     if update.interval_minutes is not None:
         task.interval_minutes = update.interval_minutes
+        task.next_crawl_time = scheduler.next_run_time(task, task.last_crawl_time)
     
-    scheduler.db.update_task(task)
+    scheduler.update_task(task)
     
     return {"message": "任务已更新", "source_id": source_id}
 
@@ -249,15 +254,11 @@ async def run_task(source_id: str):
     if not task:
         raise HTTPException(status_code=404, detail=f"任务不存在: {source_id}")
     
-    # 在后台线程执行（避免阻塞）
-    import threading
-    def execute():
-        scheduler.execute_task(task)
-    
-    thread = threading.Thread(target=execute, daemon=True)
-    thread.start()
+    # 交给调度器线程池执行，受全局/主机并发限制，同一任务不会重叠执行
+    if not scheduler.run_now(task):
+        raise HTTPException(status_code=409, detail=f"任务正在排队或执行: {source_id}")
     
-    return {"message": "任务已开始执行", "source_id": source_id}
+    return {"message": "任务已加入执行队列", "source_id": source_id}
 
 
 @router.get("/countries")
@@ -283,24 +284,29 @@ async def get_countries():
 
 @router.get("/history", response_model=List[HistoryResponse])
 async def get_history(
+    response: Response,
     source_id: Optional[str] = Query(None, description="按新闻源筛选"),
     status: Optional[str] = Query(None, description="按状态筛选: success, failed"),
-    limit: int = Query(50, ge=1, le=200, description="返回数量")
+    limit: int = Query(50, ge=1, le=200, description="返回数量"),
+    cursor: Optional[str] = Query(None, description=f"翻页游标，取自上一页响应头 {NEXT_CURSOR_HEADER}")
 ):
     """获取爬取历史"""
     scheduler = get_scheduler()
     
+    task_id = None
     if source_id:
         task = scheduler.db.get_task_by_source_id(source_id)
         if not task:
             raise HTTPException(status_code=404, detail=f"任务不存在: {source_id}")
-        history_list = scheduler.db.get_history_by_task_id(task.id, limit=limit)
-    else:
-        history_list = scheduler.db.get_recent_history(limit=limit)
+        task_id = task.id
     
-    # 按状态筛选
-    if status:
-        history_list = [h for h in history_list if h.status == status]
+    try:
+        page = scheduler.db.list_history(task_id=task_id, status=status, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    history_list = page.items
     
     return [HistoryResponse(
         id=h.id,
@@ -317,17 +323,21 @@ async def get_history(
 
 @router.get("/articles", response_model=List[ArticleResponse])
 async def get_articles(
+    response: Response,
     source_id: Optional[str] = Query(None, description="按新闻源筛选"),
-    limit: int = Query(50, ge=1, le=200, description="返回数量")
+    limit: int = Query(50, ge=1, le=200, description="返回数量"),
+    cursor: Optional[str] = Query(None, description=f"翻页游标，取自上一页响应头 {NEXT_CURSOR_HEADER}")
 ):
-    """获取爬取的文章"""
+    """获取爬取的文章（按入库时间倒序）"""
     scheduler = get_scheduler()
     
-    if source_id:
-        articles = scheduler.db.get_articles_by_source(source_id, limit=limit)
-    else:
-        # 获取所有文章（需要实现这个方法）
-        raise HTTPException(status_code=400, detail="请指定source_id")
+    try:
+        page = scheduler.db.list_articles(source_id=source_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    articles = page.items
     
     return [ArticleResponse(
         id=a.id,
@@ -344,7 +354,7 @@ async def get_articles(
 
 
 @router.post("/init")
-async def init_tasks(interval_minutes: int = Query(60, description="默认间隔（分钟）")):
+async def init_tasks(interval_minutes: float = Query(60, gt=0, description="默认间隔（分钟）")):
     """初始化任务"""
     scheduler = get_scheduler()
     scheduler.init_tasks_from_config(interval_minutes=interval_minutes)
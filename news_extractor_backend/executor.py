@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+有界执行器 - 把阻塞的提取工作移出事件循环
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+# 同时执行的提取任务数
+EXTRACT_WORKERS = int(os.getenv("NEWS_EXTRACT_WORKERS", "8"))
+# 除执行中的任务外，最多还能排队的任务数
+EXTRACT_QUEUE_SIZE = int(os.getenv("NEWS_EXTRACT_QUEUE_SIZE", "32"))
+# 队列已满时建议客户端重试的等待秒数
+EXTRACT_RETRY_AFTER = int(os.getenv("NEWS_EXTRACT_RETRY_AFTER", "5"))
+# 批量提取最多同时占用的名额，0 表示执行槽数的一半
+EXTRACT_BATCH_WORKERS = int(os.getenv("NEWS_EXTRACT_BATCH_WORKERS", "0"))
+
+
+class ExecutorBusy(Exception):
+    """执行器的执行槽和队列都已占满"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"服务繁忙，请 {retry_after} 秒后重试")
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """
+    固定线程数 + 有界队列的执行器
+
+    ThreadPoolExecutor 的内部队列是无界的；这里用信号量限制
+    "执行中 + 排队中" 的总数，超出时立即抛出 ExecutorBusy 而不是继续堆积。
+
+    批量提取通过 run_batch() 提交：最多占用 batch_workers 个名额，没有空位时
+    排队等待而不是失败，也不会挤占单条请求的全部名额。
+    """
+
+    def __init__(self, max_workers: int = EXTRACT_WORKERS, queue_size: int = EXTRACT_QUEUE_SIZE,
+                 retry_after: int = EXTRACT_RETRY_AFTER, name: str = "extract",
+                 batch_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        batch_workers = batch_workers or EXTRACT_BATCH_WORKERS or max_workers // 2
+        self.batch_workers = max(1, min(batch_workers, max_workers + queue_size))
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._rejected = 0
+        self._batch_running = 0
+        self._batch_waiters: Deque[Future] = deque()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """提交任务；没有空位时抛出 ExecutorBusy"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorBusy(self.retry_after)
+        return self._submit_reserved(fn, args, kwargs, batch=False)
+
+    def _submit_reserved(self, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any],
+                         batch: bool) -> Future:
+        """提交已经占到名额的任务，任务结束时归还名额"""
+        with self._lock:
+            self._pending += 1
+
+        def call():
+            with self._lock:
+                self._active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._pending -= 1
+                self._release(batch)
+
+        def cancelled_in_queue(future: Future):
+            # 等待方被取消时 wrap_future 会取消仍在排队的任务，call() 不会执行，由这里归还名额
+            if future.cancelled():
+                with self._lock:
+                    self._pending -= 1
+                self._release(batch)
+
+        try:
+            future = self._executor.submit(call)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            self._release(batch)
+            raise
+        future.add_done_callback(cancelled_in_queue)
+        return future
+
+    def _release(self, batch: bool):
+        with self._lock:
+            if batch:
+                self._batch_running -= 1
+            self._slots.release()
+        self._dispatch_batch()
+
+    def _dispatch_batch(self):
+        """把空出来的名额交给等待中的批量任务"""
+        while True:
+            with self._lock:
+                if not self._batch_waiters or self._batch_running >= self.batch_workers:
+                    return
+                if not self._slots.acquire(blocking=False):
+                    return
+                waiter = self._batch_waiters.popleft()
+                self._batch_running += 1
+            if waiter.set_running_or_notify_cancel():
+                waiter.set_result(None)
+            else:
+                # 等待方已经取消，名额留给下一个
+                with self._lock:
+                    self._batch_running -= 1
+                    self._slots.release()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """在执行器中运行 fn 并等待结果，不阻塞事件循环；排队中被取消（如客户端断开）时归还名额"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    async def run_batch(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """批量任务：在批量名额内运行 fn，没有空位时等待而不是抛出 ExecutorBusy"""
+        waiter: Future = Future()
+        with self._lock:
+            self._batch_waiters.append(waiter)
+        self._dispatch_batch()
+        try:
+            await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            # 已经分配到名额时 cancel() 返回 False，需要归还
+            if not waiter.cancel():
+                self._release(batch=True)
+            raise
+        return await asyncio.wrap_future(self._submit_reserved(fn, args, kwargs, batch=True))
+
+    def stats(self) -> Dict[str, int]:
+        """执行中、排队中的任务数及累计拒绝次数"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_size": self.queue_size,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "rejected": self._rejected,
+                "batch_workers": self.batch_workers,
+                "batch_running": self._batch_running,
+                "batch_waiting": sum(1 for waiter in self._batch_waiters if not waiter.cancelled()),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_extract_executor: Optional[BoundedExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_extract_executor() -> BoundedExecutor:
+    """获取进程内共享的提取执行器"""
+    global _extract_executor
+    if _extract_executor is None:
+        with _executor_lock:
+            if _extract_executor is None:
+                _extract_executor = BoundedExecutor()
+    return _extract_executor
+
+
+def configure_extract_executor(executor: Optional[BoundedExecutor]) -> Optional[BoundedExecutor]:
+    """替换共享执行器（用于调整容量或测试），旧执行器会在任务完成后关闭"""
+    global _extract_executor
+    with _executor_lock:
+        previous, _extract_executor = _extract_executor, executor
+    if previous is not None and previous is not executor:
+        previous.shutdown(wait=False)
+    return executor
@@ -2,17 +2,48 @@
 """
 核心服务模块
 """
-from .detector import detect_platform, get_supported_platforms
+from .batch import BatchResult, extract_batch, iter_batch
+from .cache import ResultCache, cache_key, configure_result_cache, get_result_cache
+from .detector import detect_platform, detect_platforms, get_supported_platforms
 from .extractor import ExtractorService
 from .formatter import to_markdown
+from .image_downloader import ImageDownloader, configure_image_downloader, get_image_downloader
 from .image_service import ImageService, ImageResult, ImageFetchError
+from .image_store import ImageStore, StoredImage, configure_image_store, get_image_store
+from .image_transcode import (
+    ImageTranscoder,
+    TranscodeOptions,
+    configure_image_transcoder,
+    get_image_transcoder,
+    transcoding_available,
+)
 
 __all__ = [
     "detect_platform",
+    "detect_platforms",
     "get_supported_platforms",
     "ExtractorService",
     "to_markdown",
     "ImageService",
     "ImageResult",
     "ImageFetchError",
+    "ImageDownloader",
+    "get_image_downloader",
+    "configure_image_downloader",
+    "ImageStore",
+    "StoredImage",
+    "get_image_store",
+    "configure_image_store",
+    "ImageTranscoder",
+    "TranscodeOptions",
+    "get_image_transcoder",
+    "configure_image_transcoder",
+    "transcoding_available",
+    "ResultCache",
+    "cache_key",
+    "get_result_cache",
+    "configure_result_cache",
+    "BatchResult",
+    "extract_batch",
+    "iter_batch",
 ]
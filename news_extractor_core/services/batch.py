@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+批量提取服务
+并发抓取多个 URL：全局并发上限、每个主机并发上限、整体截止时间
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from ..models import NewsItem
+from .extractor import ExtractorService
+
+# 批量提取的默认并发数
+BATCH_CONCURRENCY = int(os.getenv("NEWS_BATCH_CONCURRENCY", "8"))
+# 同一主机同时进行的请求数
+BATCH_PER_HOST = int(os.getenv("NEWS_BATCH_PER_HOST", "2"))
+
+ExtractFunc = Callable[[str], Awaitable[Tuple[NewsItem, str]]]
+
+
+@dataclass
+class BatchResult:
+    """单个 URL 的提取结果，index 为其在输入中的位置"""
+    index: int
+    url: str
+    status: str  # success / error / timeout
+    news: Optional[NewsItem] = None
+    platform: Optional[str] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "success"
+
+
+async def _extract_in_thread(url: str) -> Tuple[NewsItem, str]:
+    return await asyncio.to_thread(ExtractorService.extract_news, url)
+
+
+def _host_of(url: str) -> str:
+    try:
+        return urlsplit(str(url)).hostname or ""
+    except ValueError:
+        return ""
+
+
+async def iter_batch(
+    urls: Sequence[str],
+    extract: ExtractFunc = _extract_in_thread,
+    concurrency: int = BATCH_CONCURRENCY,
+    per_host: int = BATCH_PER_HOST,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    并发提取并按完成顺序逐个产出结果
+
+    deadline 为整体超时秒数；到期后取消尚未完成的 URL，并为它们产出
+    status="timeout" 的结果，因此每个输入恰好对应一个结果。
+    """
+    global_slots = asyncio.Semaphore(max(1, concurrency))
+    host_slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def run(index: int, url: str) -> BatchResult:
+        host = _host_of(url)
+        slots = host_slots.setdefault(host, asyncio.Semaphore(max(1, per_host)))
+        # 先占主机名额再占全局名额，避免被同一主机的请求占满全局并发
+        async with slots, global_slots:
+            start = time.perf_counter()
+            try:
+                news, platform = await extract(url)
+                return BatchResult(index, url, "success", news=news, platform=platform,
+                                   elapsed=time.perf_counter() - start)
+            except Exception as exc:
+                return BatchResult(index, url, "error", error=str(exc),
+                                   elapsed=time.perf_counter() - start)
+
+    tasks = {asyncio.ensure_future(run(index, url)): index for index, url in enumerate(urls)}
+    end = None if deadline is None else asyncio.get_running_loop().time() + deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = None if end is None else max(0.0, end - asyncio.get_running_loop().time())
+            done, pending = await asyncio.wait(pending, timeout=timeout,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                yield task.result()
+        for task in pending:
+            task.cancel()
+        for task in sorted(pending, key=tasks.get):
+            index = tasks[task]
+            yield BatchResult(index, str(urls[index]), "timeout",
+                              error=f"超过批量截止时间 {deadline} 秒")
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def extract_batch(
+    urls: Sequence[str],
+    extract: ExtractFunc = _extract_in_thread,
+    concurrency: int = BATCH_CONCURRENCY,
+    per_host: int = BATCH_PER_HOST,
+    deadline: Optional[float] = None,
+) -> List[BatchResult]:
+    """并发提取，结果按输入顺序返回；超过截止时间的 URL 标记为 timeout"""
+    results = [
+        result
+        async for result in iter_batch(urls, extract, concurrency=concurrency,
+                                       per_host=per_host, deadline=deadline)
+    ]
+    results.sort(key=lambda result: result.index)
+    return results
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+提取结果缓存
+内存 TTL+LRU 缓存，可选磁盘二级缓存，并对同一 URL 的并发请求做合并（single-flight）
+"""
+import copy
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+from news_crawler.core.http_cache import CacheEntry, HttpCache
+from news_crawler.core.urls import canonicalize_url
+
+from ..models import NewsItem
+
+# 缓存有效期（秒），0 表示关闭缓存
+RESULT_CACHE_TTL = float(os.getenv("NEWS_EXTRACT_CACHE_TTL", "600"))
+# 内存中最多缓存的文章数
+RESULT_CACHE_SIZE = int(os.getenv("NEWS_EXTRACT_CACHE_SIZE", "512"))
+# 磁盘缓存目录，不设置则只使用内存缓存
+RESULT_CACHE_DIR = os.getenv("NEWS_EXTRACT_CACHE_DIR") or None
+RESULT_CACHE_MAX_BYTES = int(os.getenv("NEWS_EXTRACT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def cache_key(url: str, platform: str) -> str:
+    """缓存键：平台 + 规范化 URL"""
+    return f"{platform}:{canonicalize_url(url)}"
+
+
+class ResultCache:
+    """
+    提取结果缓存
+
+    内存层是按最近访问排序的 OrderedDict，超过 max_entries 时淘汰最久未用的条目；
+    磁盘层复用 HttpCache 的按大小淘汰的文件存储，进程重启后仍可命中。
+    缓存中保存的是字典，每次读取都返回新的 NewsItem，调用方修改结果不会污染缓存。
+    """
+
+    def __init__(self, ttl: float = RESULT_CACHE_TTL, max_entries: int = RESULT_CACHE_SIZE,
+                 disk_dir: Optional[str] = RESULT_CACHE_DIR,
+                 disk_max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk = HttpCache(disk_dir, max_bytes=disk_max_bytes) if disk_dir else None
+        self._entries: "OrderedDict[str, Tuple[float, dict, str]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> Optional[Tuple[NewsItem, str]]:
+        """读取未过期的缓存，依次查内存和磁盘"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, data, platform = entry
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    return NewsItem(copy.deepcopy(data)), platform
+                del self._entries[key]
+        if self.disk is None:
+            return None
+        cached = self.disk.get(key)
+        if cached is None or now - cached.stored_at >= self.ttl:
+            return None
+        data = json.loads(cached.text)
+        platform = cached.headers.get("platform", "")
+        self._remember(key, data, platform, cached.stored_at)
+        return NewsItem(copy.deepcopy(data)), platform
+
+    def put(self, key: str, news_item: NewsItem, platform: str) -> dict:
+        """写入缓存（内存，以及配置了的磁盘层），返回缓存的数据副本"""
+        data = copy.deepcopy(news_item.to_dict())
+        stored_at = time.time()
+        self._remember(key, data, platform, stored_at)
+        if self.disk is not None:
+            self.disk.put(key, CacheEntry(
+                url=news_item.news_url or key,
+                text=json.dumps(data, ensure_ascii=False),
+                headers={"platform": platform},
+                stored_at=stored_at,
+            ))
+        return data
+
+    def _remember(self, key: str, data: dict, platform: str, stored_at: float):
+        with self._lock:
+            self._entries[key] = (stored_at, data, platform)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_extract(self, key: str, extract: Callable[[], Tuple[NewsItem, str]]) -> Tuple[NewsItem, str]:
+        """
+        命中缓存直接返回；否则同一 key 只有一个调用方执行 extract，
+        其他并发调用方等待并共享它的结果（或异常）
+        """
+        cached = self.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            data, platform = future.result()
+            return NewsItem(copy.deepcopy(data)), platform
+        try:
+            news_item, platform = extract()
+            future.set_result((self.put(key, news_item, platform), platform))
+            return news_item, platform
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+
+_result_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """获取进程内共享的提取结果缓存"""
+    global _result_cache
+    if _result_cache is None:
+        with _cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
+
+
+def configure_result_cache(cache: Optional[ResultCache]) -> Optional[ResultCache]:
+    """替换共享的提取结果缓存（None 表示下次使用时按环境变量重新创建）"""
+    global _result_cache
+    with _cache_lock:
+        _result_cache = cache
+    return cache
@@ -3,39 +3,104 @@
 平台检测服务
 """
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
 
 
 PLATFORM_PATTERNS = {
     "toutiao": r"https?://www\.toutiao\.com/article/",
     "wechat": r"https?://mp\.weixin\.qq\.com/s/",
-    "netease": r"https?://www\.163\.com/(news|dy)/article/",  # 支持news和dy两种路径
+    "netease": r"https?://www\.163\.com/(?:news|dy)/article/",  # 支持news和dy两种路径
     "sohu": r"https?://www\.sohu\.com/a/",
     "tencent": r"https?://news\.qq\.com/rain/a/",
     "detik": r"https?://news\.detik\.com/",
-    "naver": r"https?://.*\.naver\.com/",
+    "naver": r"https?://[^/?#]+\.naver\.com/",
     "lenny": r"https?://www\.lennysnewsletter\.com/",
-    "quora": r"https?://.*\.quora\.com/",
+    "quora": r"https?://[^/?#]+\.quora\.com/",
     "bbc": r"https?://www\.bbc\.com/news/articles/",
-    "cnn": r"https?://(edition\.|www\.)?cnn\.com/\d{4}/\d{2}/\d{2}/",
+    "cnn": r"https?://(?:edition\.|www\.)?cnn\.com/\d{4}/\d{2}/\d{2}/",
     "twitter": r"https?://(?:www\.)?(?:twitter|x)\.com/\w+/status/\d+",
 }
 
+# 主机名 -> 平台；绝大多数链接只需一次字典查找就能排除
+PLATFORM_HOSTS: Dict[str, str] = {
+    "www.toutiao.com": "toutiao",
+    "mp.weixin.qq.com": "wechat",
+    "www.163.com": "netease",
+    "www.sohu.com": "sohu",
+    "news.qq.com": "tencent",
+    "news.detik.com": "detik",
+    "www.lennysnewsletter.com": "lenny",
+    "www.bbc.com": "bbc",
+    "cnn.com": "cnn",
+    "edition.cnn.com": "cnn",
+    "www.cnn.com": "cnn",
+    "twitter.com": "twitter",
+    "www.twitter.com": "twitter",
+    "x.com": "twitter",
+    "www.x.com": "twitter",
+}
+# 任意子域名都属于该平台的域名后缀
+PLATFORM_HOST_SUFFIXES: Dict[str, str] = {
+    "naver.com": "naver",
+    "quora.com": "quora",
+}
+
+
+def _combine(names: Iterable[str]) -> Optional[re.Pattern]:
+    """把多个平台合并成一个带命名分组的正则，match.lastgroup 即平台名"""
+    parts = [f"(?P<{name}>{PLATFORM_PATTERNS[name]})" for name in names]
+    return re.compile("|".join(parts)) if parts else None
+
+
+_PLATFORM_RE = _combine(PLATFORM_PATTERNS)
+# 没有登记主机名的平台（只加在 PLATFORM_PATTERNS 中）不经预筛选，直接按正则匹配
+_INDEXED_PLATFORMS = set(PLATFORM_HOSTS.values()) | set(PLATFORM_HOST_SUFFIXES.values())
+_UNINDEXED_RE = _combine(name for name in PLATFORM_PATTERNS if name not in _INDEXED_PLATFORMS)
+_AUTHORITY_RE = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*)://([^/?#]*)")
+
+
+@lru_cache(maxsize=4096)
+def _host_platform(host: str) -> Optional[str]:
+    """按主机名查找候选平台：先精确匹配，再逐级去掉子域名匹配后缀"""
+    platform = PLATFORM_HOSTS.get(host)
+    if platform is not None:
+        return platform
+    dot = host.find(".")
+    while dot != -1:
+        platform = PLATFORM_HOST_SUFFIXES.get(host[dot + 1:])
+        if platform is not None:
+            return platform
+        dot = host.find(".", dot + 1)
+    return None
+
 
 def detect_platform(url: str) -> Optional[str]:
     """
     根据 URL 检测平台类型
 
+    主机名不区分大小写；路径仍按各平台的规则精确匹配。
+
     Args:
         url: 新闻链接
 
     Returns:
         平台名称，如果无法识别则返回 None
     """
-    for platform, pattern in PLATFORM_PATTERNS.items():
-        if re.match(pattern, url):
-            return platform
-    return None
+    authority = _AUTHORITY_RE.match(url)
+    if authority is None:
+        return None
+    scheme, host = authority.group(1).lower(), authority.group(2).lower()
+    pattern = _PLATFORM_RE if _host_platform(host) is not None else _UNINDEXED_RE
+    if pattern is None:
+        return None
+    match = pattern.match(f"{scheme}://{host}{url[authority.end():]}")
+    return match.lastgroup if match else None
+
+
+def detect_platforms(urls: Iterable[str]) -> List[Optional[str]]:
+    """批量检测平台，结果与输入一一对应"""
+    return [detect_platform(url) for url in urls]
 
 
 def get_supported_platforms() -> list[dict]:
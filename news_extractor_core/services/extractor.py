@@ -17,6 +17,7 @@ from ..adapters.quora import QuoraAdapter
 from ..adapters.bbc import BBCAdapter
 from ..adapters.cnn import CNNAdapter
 from ..adapters.twitter import TwitterAdapter
+from .cache import cache_key, get_result_cache
 from .detector import detect_platform
 
 
@@ -45,14 +46,19 @@ class ExtractorService:
         url: str,
         platform: Optional[str] = None,
         cookie: Optional[str] = None,
+        use_cache: bool = True,
     ) -> tuple[NewsItem, str]:
         """
         提取新闻内容
 
+        结果按 (平台, 规范化 URL) 缓存，同一 URL 的并发请求只抓取一次。
+        带 Cookie 的请求结果因人而异，不走缓存。
+
         Args:
             url: 新闻链接
             platform: 指定平台（可选，如果不指定则自动检测）
             cookie: 可选的 Cookie 字符串，用于需要认证的平台（如 Twitter）
+            use_cache: 是否使用结果缓存
 
         Returns:
             (NewsItem, platform_name): 提取的新闻数据和平台名称
@@ -72,7 +78,22 @@ class ExtractorService:
         if adapter is None:
             raise ValueError(f"平台 '{platform}' 暂不支持")
 
-        # 提取数据
+        cache = get_result_cache()
+        if use_cache and cookie is None and cache.enabled:
+            return cache.get_or_extract(
+                cache_key(url, platform),
+                lambda: ExtractorService._extract(adapter, url, platform, cookie),
+            )
+        return ExtractorService._extract(adapter, url, platform, cookie)
+
+    @staticmethod
+    def _extract(
+        adapter: CrawlerAdapter,
+        url: str,
+        platform: str,
+        cookie: Optional[str],
+    ) -> tuple[NewsItem, str]:
+        """调用适配器抓取并解析"""
         try:
             # 对于支持 cookie 参数的适配器，传递 cookie
             if platform == "twitter":
@@ -6,6 +6,7 @@ from typing import Dict, Optional
 
 from ..models import NewsItem
 from .image_service import ImageService, ImageResult
+from .image_transcode import TranscodeOptions
 
 
 def to_markdown(
@@ -16,6 +17,7 @@ def to_markdown(
     platform: str = "default",
     image_results: Optional[Dict[str, ImageResult]] = None,
     local_image_paths: Optional[Dict[str, Optional[str]]] = None,
+    transcode: Optional[TranscodeOptions] = None,
 ) -> str:
     """
     将 NewsItem 转换为 Markdown 格式
@@ -28,6 +30,7 @@ def to_markdown(
         platform: 平台名称（用于选择图片下载策略）
         image_results: 预先下载的图片结果（用于 embed_images）
         local_image_paths: 预先下载的本地路径映射（用于 save_images_locally）
+        transcode: 嵌入前的图片转码参数（缩放、重新编码），None 表示嵌入原图
 
     Returns:
         Markdown 格式的字符串
@@ -43,7 +46,7 @@ def to_markdown(
     if embed_images and not save_images_locally and image_results is None:
         image_urls = news_item.images
         if image_urls:
-            service = ImageService(platform=platform)
+            service = ImageService(platform=platform, transcode=transcode)
             image_results = service.download_images(image_urls)
 
     md_lines = []
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+图片下载引擎
+进程内共享：全局并发上限、每个主机并发上限、主机之间轮流调度，连接通过 SessionPool 复用
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from news_crawler.core.sessions import SessionPool, get_session_pool, host_key
+
+# 同时进行的图片下载数（包括图片代理的上游请求）
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("NEWS_IMAGE_CONCURRENCY", "16"))
+# 同一主机同时进行的下载数
+IMAGE_DOWNLOAD_PER_HOST = int(os.getenv("NEWS_IMAGE_PER_HOST", "4"))
+
+# (future, 要在工作线程中执行的函数, 参数)；函数为 None 表示只占用名额（异步调用方自己发请求）
+_Job = Tuple[Future, Optional[Callable[..., Any]], tuple]
+
+
+class ImageDownloader:
+    """
+    图片下载调度器
+
+    每个主机一个等待队列。有空闲名额时，从未达到主机上限的队列中挑选最久没被服务的主机，
+    因此一篇文章的几十张图片不会让其他请求的图片一直排队。
+    同步任务在共享线程池中执行；异步调用方用 acquire()/release() 占用同样的名额。
+    """
+
+    def __init__(self, max_concurrency: int = IMAGE_DOWNLOAD_CONCURRENCY,
+                 per_host: int = IMAGE_DOWNLOAD_PER_HOST, pool: Optional[SessionPool] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host = max(1, per_host)
+        self._pool = pool
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="image")
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._last_served: Dict[str, int] = {}
+        self._served = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> SessionPool:
+        """按主机复用连接的 curl_cffi 会话池"""
+        if self._pool is None:
+            self._pool = get_session_pool("curl_cffi")
+        return self._pool
+
+    def submit(self, url: str, fn: Callable[..., Any], *args: Any) -> Future:
+        """排队执行 fn(*args)，占用 url 所属主机的一个名额"""
+        return self._enqueue(url, fn, args)
+
+    def map(self, fn: Callable[[str], Any], urls: List[str]) -> List[Any]:
+        """对每个 URL 执行 fn，按输入顺序返回结果（异常会原样抛出）"""
+        futures = [self.submit(url, fn, url) for url in urls]
+        return [future.result() for future in futures]
+
+    async def acquire(self, url: str):
+        """异步等待 url 所属主机的名额，用完后必须调用 release(url)"""
+        future = self._enqueue(url, None, ())
+        try:
+            await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # 已经分配到名额时 cancel() 返回 False，需要归还
+            if not future.cancel():
+                self.release(url)
+            raise
+
+    def release(self, url: str):
+        self._finish(host_key(url))
+
+    def _enqueue(self, url: str, fn: Optional[Callable[..., Any]], args: tuple) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._queues.setdefault(host_key(url), deque()).append((future, fn, args))
+            ready = self._dispatch_locked()
+        self._start(ready)
+        return future
+
+    def _dispatch_locked(self) -> List[Tuple[str, _Job]]:
+        ready = []
+        while self._running < self.max_concurrency:
+            eligible = [host for host in self._queues if self._in_flight.get(host, 0) < self.per_host]
+            if not eligible:
+                break
+            host = min(eligible, key=lambda h: self._last_served.get(h, -1))
+            queue = self._queues[host]
+            job = queue.popleft()
+            if not queue:
+                del self._queues[host]
+            self._served += 1
+            self._last_served[host] = self._served
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            self._running += 1
+            ready.append((host, job))
+        return ready
+
+    def _start(self, ready: List[Tuple[str, _Job]]):
+        for host, (future, fn, args) in ready:
+            if fn is None:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(None)
+                else:
+                    self._finish(host)
+            else:
+                self._executor.submit(self._run, host, future, fn, args)
+
+    def _run(self, host: str, future: Future, fn: Callable[..., Any], args: tuple):
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+        finally:
+            self._finish(host)
+
+    def _finish(self, host: str):
+        with self._lock:
+            self._running -= 1
+            remaining = self._in_flight.get(host, 0) - 1
+            if remaining > 0:
+                self._in_flight[host] = remaining
+            else:
+                self._in_flight.pop(host, None)
+                if host not in self._queues:
+                    self._last_served.pop(host, None)
+            ready = self._dispatch_locked()
+        self._start(ready)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "per_host": self.per_host,
+                "running": self._running,
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "in_flight_by_host": dict(self._in_flight),
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_image_downloader: Optional[ImageDownloader] = None
+_downloader_lock = threading.Lock()
+
+
+def get_image_downloader() -> ImageDownloader:
+    """获取进程内共享的图片下载引擎"""
+    global _image_downloader
+    if _image_downloader is None:
+        with _downloader_lock:
+            if _image_downloader is None:
+                _image_downloader = ImageDownloader()
+    return _image_downloader
+
+
+def configure_image_downloader(downloader: Optional[ImageDownloader]) -> Optional[ImageDownloader]:
+    """替换共享的下载引擎（None 表示下次使用时按环境变量重新创建），旧引擎在任务完成后关闭"""
+    global _image_downloader
+    with _downloader_lock:
+        previous, _image_downloader = _image_downloader, downloader
+    if previous is not None and previous is not downloader:
+        previous.shutdown(wait=False)
+    return downloader
@@ -1,14 +1,18 @@
 # -*- coding: utf-8 -*-
 """
 图片服务 - 下载图片并转换为 Base64 或保存到本地
+下载的图片写入共享的内容寻址存储，同一 URL 再次使用时不访问网络
 """
 import base64
 import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from .image_downloader import ImageDownloader, get_image_downloader
+from .image_store import ImageStore, StoredImage, get_image_store
+from .image_transcode import ImageTranscoder, TranscodeOptions, get_image_transcoder
 
 logger = logging.getLogger(__name__)
 
@@ -53,14 +57,30 @@ class ImageService:
 
     MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB
     TIMEOUT = 10  # 秒
-    MAX_WORKERS = 5  # 并发下载数
+    CHUNK_SIZE = 64 * 1024  # 流式下载的分块大小
+    SNIFF_BYTES = 16  # 检测 MIME 类型所需的文件头长度
 
-    def __init__(self, platform: str = "default"):
+    def __init__(self, platform: str = "default", store: Optional[ImageStore] = None,
+                 downloader: Optional[ImageDownloader] = None,
+                 transcode: Optional[TranscodeOptions] = None,
+                 transcoder: Optional[ImageTranscoder] = None):
         self.platform = platform
         self.headers = PLATFORM_IMAGE_HEADERS.get(
             platform,
             PLATFORM_IMAGE_HEADERS["default"]
         )
+        self.store = store or get_image_store()
+        # 并发和连接复用由进程内共享的下载引擎负责
+        self.downloader = downloader or get_image_downloader()
+        # 设置后，Base64 嵌入前先缩放/重新编码（需要 Pillow）
+        self.transcode = transcode
+        self._transcoder = transcoder
+
+    @property
+    def transcoder(self) -> ImageTranscoder:
+        if self._transcoder is None:
+            self._transcoder = get_image_transcoder()
+        return self._transcoder
 
     def _detect_mime_type(self, content: bytes, url: str) -> str:
         """根据文件头检测图片 MIME 类型"""
@@ -93,50 +113,88 @@ class ImageService:
         # 默认 JPEG
         return "image/jpeg"
 
-    def _download_single(self, url: str) -> ImageResult:
-        """下载单张图片（同步）"""
-        try:
-            from curl_cffi import requests as curl_requests
+    def _fetch_remote(self, url: str) -> StoredImage:
+        """
+        流式下载图片并写入图片存储，失败时抛出 ImageFetchError
 
-            response = curl_requests.get(
+        先按 Content-Length 拒绝过大的图片；未声明长度时一旦超过 MAX_IMAGE_SIZE 立即中止，
+        内存中只保留当前分块。MIME 类型根据开头的字节判断。
+        """
+        # 同一主机的会话（及其连接）从会话池中复用；中途失败的会话不会放回池中
+        with self.downloader.pool.session(url) as session:
+            response = session.get(
                 url,
                 headers=self.headers,
                 timeout=self.TIMEOUT,
                 impersonate="chrome",
+                stream=True,
             )
+            try:
+                if response.status_code != 200:
+                    raise ImageFetchError(f"HTTP {response.status_code}")
+
+                # 检查声明的大小
+                length = response.headers.get("content-length")
+                if length and length.isdigit() and int(length) > self.MAX_IMAGE_SIZE:
+                    raise ImageFetchError(f"图片过大: {int(length) / 1024 / 1024:.1f}MB > 5MB")
+
+                head = b""
+                with self.store.writer(url) as writer:
+                    for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                        if not chunk:
+                            continue
+                        if len(head) < self.SNIFF_BYTES:
+                            head += chunk[:self.SNIFF_BYTES - len(head)]
+                        writer.write(chunk)
+                        if writer.size > self.MAX_IMAGE_SIZE:
+                            raise ImageFetchError(f"图片过大: 超过 {self.MAX_IMAGE_SIZE / 1024 / 1024:.0f}MB")
+                    return writer.commit(self._detect_mime_type(head, url))
+            finally:
+                response.close()
+
+    def _fetch(self, url: str) -> StoredImage:
+        """优先从图片存储读取，未命中时下载并写入存储"""
+        cached = self.store.get(url)
+        if cached is not None:
+            # 图片代理缓存的图片上限更高
+            if cached.size > self.MAX_IMAGE_SIZE:
+                raise ImageFetchError(f"图片过大: {cached.size / 1024 / 1024:.1f}MB > 5MB")
+            return cached
+        return self._fetch_remote(url)
+
+    def _sniff_file(self, path: str, url: str) -> str:
+        """根据文件开头的字节检测 MIME 类型"""
+        with open(path, "rb") as f:
+            return self._detect_mime_type(f.read(self.SNIFF_BYTES), url)
+
+    def _encode_file(self, path: str) -> str:
+        """分块做 Base64 编码，每块长度是 3 的倍数，拼接结果与整体编码相同"""
+        parts = []
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(3 * self.CHUNK_SIZE), b""):
+                parts.append(base64.b64encode(chunk).decode("ascii"))
+        return "".join(parts)
+
+    def _download_single(self, url: str) -> Union[StoredImage, ImageResult]:
+        """下载单张图片（同步，在下载引擎的名额内执行），失败时返回 ImageResult"""
+        try:
+            return self._fetch(url)
+        except ImageFetchError as e:
+            return ImageResult(url=url, success=False, error=str(e))
+        except Exception as e:
+            logger.warning(f"下载图片失败 {url}: {e}")
+            return ImageResult(url=url, success=False, error=str(e))
 
-            if response.status_code != 200:
-                return ImageResult(
-                    url=url,
-                    success=False,
-                    error=f"HTTP {response.status_code}"
-                )
-
-            content = response.content
-
-            # 检查大小
-            if len(content) > self.MAX_IMAGE_SIZE:
-                return ImageResult(
-                    url=url,
-                    success=False,
-                    error=f"图片过大: {len(content) / 1024 / 1024:.1f}MB > 5MB"
-                )
-
-            # 检测 MIME 类型
-            mime_type = self._detect_mime_type(content, url)
-
-            # 转换为 base64
-            base64_data = base64.b64encode(content).decode("utf-8")
-
+    def _encode_image(self, url: str, image: StoredImage) -> ImageResult:
+        try:
             return ImageResult(
                 url=url,
                 success=True,
-                base64_data=base64_data,
-                mime_type=mime_type,
+                base64_data=self._encode_file(image.path),
+                mime_type=self._sniff_file(image.path, url),
             )
-
         except Exception as e:
-            logger.warning(f"下载图片失败 {url}: {e}")
+            logger.warning(f"读取图片失败 {url}: {e}")
             return ImageResult(url=url, success=False, error=str(e))
 
     def download_images(self, urls: List[str]) -> Dict[str, ImageResult]:
@@ -152,24 +210,27 @@ class ImageService:
         if not urls:
             return {}
 
-        results = {}
-
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            future_to_url = {
-                executor.submit(self._download_single, url): url
-                for url in urls
-            }
-
-            for future in future_to_url:
-                url = future_to_url[future]
-                try:
-                    results[url] = future.result()
-                except Exception as e:
-                    results[url] = ImageResult(
-                        url=url,
-                        success=False,
-                        error=str(e)
-                    )
+        results: Dict[str, ImageResult] = {}
+        images: Dict[str, StoredImage] = {}
+        for url, fetched in zip(urls, self.downloader.map(self._download_single, urls)):
+            if isinstance(fetched, ImageResult):
+                results[url] = fetched
+            else:
+                images[url] = fetched
+
+        # 下载名额已经归还，转码在进程池中进行，不占用下载并发
+        if self.transcode is not None and images:
+            try:
+                transcoded = self.transcoder.transcode_many(list(images.values()), self.transcode)
+                images = dict(zip(images, transcoded))
+            except Exception as e:
+                logger.warning(f"图片转码失败: {e}")
+                results.update({url: ImageResult(url=url, success=False, error=str(e)) for url in images})
+                images = {}
+
+        for url, image in images.items():
+            results[url] = self._encode_image(url, image)
+        results = {url: results[url] for url in urls}
 
         # 日志统计
         success_count = sum(1 for r in results.values() if r.success)
@@ -189,39 +250,21 @@ class ImageService:
         return mime_to_ext.get(mime_type, ".jpg")
 
     def _download_and_save(self, url: str, save_path: str) -> Tuple[bool, str]:
-        """下载单张图片并保存到本地"""
+        """下载单张图片并链接到本地路径（内容只在图片存储中保存一份）"""
         try:
-            from curl_cffi import requests as curl_requests
-
-            response = curl_requests.get(
-                url,
-                headers=self.headers,
-                timeout=self.TIMEOUT,
-                impersonate="chrome",
-            )
-
-            if response.status_code != 200:
-                return False, f"HTTP {response.status_code}"
-
-            content = response.content
-
-            if len(content) > self.MAX_IMAGE_SIZE:
-                return False, f"图片过大: {len(content) / 1024 / 1024:.1f}MB"
+            image = self._fetch(url)
 
             # 检测类型并确定扩展名
-            mime_type = self._detect_mime_type(content, url)
-            ext = self._get_extension(mime_type)
+            ext = self._get_extension(self._sniff_file(image.path, url))
 
             # 确保路径有正确的扩展名
             if not save_path.endswith(ext):
                 save_path = save_path.rsplit(".", 1)[0] + ext if "." in os.path.basename(save_path) else save_path + ext
 
-            # 写入文件
-            with open(save_path, "wb") as f:
-                f.write(content)
-
-            return True, save_path
+            return True, self.store.link(image, save_path)
 
+        except ImageFetchError as e:
+            return False, str(e)
         except Exception as e:
             logger.warning(f"下载图片失败 {url}: {e}")
             return False, str(e)
@@ -260,10 +303,10 @@ class ImageService:
                 logger.warning(f"图片 {idx + 1} 下载失败: {result}")
                 return url, None
 
-        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
-            tasks = list(enumerate(urls))
-            for url, local_path in executor.map(download_task, tasks):
-                results[url] = local_path
+        futures = [self.downloader.submit(url, download_task, (idx, url)) for idx, url in enumerate(urls)]
+        for future in futures:
+            url, local_path = future.result()
+            results[url] = local_path
 
         # 日志统计
         success_count = sum(1 for v in results.values() if v is not None)
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+图片内容寻址存储
+图片按内容 sha256 保存为 blob，URL 索引指向 blob；同一图片只存一份，按总大小做 LRU 淘汰。
+ImageService、图片代理和 Markdown 导出共用同一个存储，文章目录中的图片是指向 blob 的链接。
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..config import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 图片存储目录
+IMAGE_STORE_DIR = os.getenv("NEWS_IMAGE_STORE_DIR") or str(DATA_DIR / "image_store")
+# 所有 blob 的总大小上限，超过后淘汰最久未访问的图片
+IMAGE_STORE_MAX_BYTES = int(os.getenv("NEWS_IMAGE_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+
+def url_digest(url: str) -> str:
+    """URL 索引键"""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class StoredImage:
+    """存储中的一张图片"""
+    url: str
+    sha256: str
+    path: str
+    size: int
+    content_type: str = "image/jpeg"
+    etag: Optional[str] = None  # 上游返回的 ETag
+    stored_at: float = 0.0
+
+    @property
+    def strong_etag(self) -> str:
+        """对外使用的 ETag：优先沿用上游的，否则用内容哈希"""
+        return self.etag or f'"{self.sha256}"'
+
+
+class BlobWriter:
+    """
+    边下载边写入临时文件并计算 sha256
+
+    commit() 把临时文件移入存储（内容已存在时直接复用已有 blob），
+    abort() 丢弃临时文件；两者都可以安全地重复调用。
+    """
+
+    def __init__(self, store: "ImageStore", url: str):
+        self.store = store
+        self.url = url
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._path = store.tmp_dir / f"{uuid.uuid4().hex}.part"
+        self._file = open(self._path, "wb")
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self, content_type: str = "image/jpeg", etag: Optional[str] = None) -> StoredImage:
+        self._file.close()
+        return self.store._commit(self.url, self._path, self._hash.hexdigest(), self.size,
+                                  content_type, etag)
+
+    def abort(self):
+        self._file.close()
+        try:
+            self._path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+
+
+class ImageStore:
+    """
+    按内容寻址的图片存储
+
+    blobs/<sha 前两位>/<sha> 保存图片内容，urls/<url 哈希>.json 记录 URL 对应的 blob
+    和响应元数据。blob 的 mtime 记录最近访问时间，重启后 LRU 顺序仍然有效；
+    被淘汰 blob 的 URL 索引在下次读取时才清理。锁只保护内存中的索引和 LRU 记账，
+    文件读写都在锁外，通过临时文件 + os.replace 保证读到的总是完整文件。
+    """
+
+    def __init__(self, directory: str = IMAGE_STORE_DIR, max_bytes: int = IMAGE_STORE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.blob_dir = self.directory / "blobs"
+        self.url_dir = self.directory / "urls"
+        self.tmp_dir = self.directory / "tmp"
+        for path in (self.blob_dir, self.url_dir, self.tmp_dir):
+            path.mkdir(parents=True, exist_ok=True)
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256
+
+    def _url_path(self, url: str) -> Path:
+        return self.url_dir / f"{url_digest(url)}.json"
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        if self._index is None:
+            index: Dict[str, Tuple[int, float]] = {}
+            for path in self.blob_dir.glob("*/*"):
+                stat = path.stat()
+                index[path.name] = (stat.st_size, stat.st_mtime)
+            self._index = index
+            self._total = sum(size for size, _ in index.values())
+        return self._index
+
+    def get(self, url: str) -> Optional[StoredImage]:
+        """按 URL 查找图片，命中时刷新其访问时间"""
+        meta_path = self._url_path(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            meta = None
+        sha256 = (meta or {}).get("sha256", "")
+        with self._lock:
+            known = sha256 in self._load_index()
+            if not known:
+                self.misses += 1
+        if not known:
+            if meta is not None:
+                # blob 已被淘汰，URL 索引随之失效
+                meta_path.unlink(missing_ok=True)
+            return None
+        now = time.time()
+        blob = self.blob_path(sha256)
+        try:
+            os.utime(blob, (now, now))
+        except FileNotFoundError:
+            # blob 被外部删除或刚被淘汰
+            with self._lock:
+                if sha256 in self._index:
+                    self._total -= self._index.pop(sha256)[0]
+                self.misses += 1
+            meta_path.unlink(missing_ok=True)
+            return None
+        with self._lock:
+            if sha256 in self._index:
+                self._index[sha256] = (self._index[sha256][0], now)
+            self.hits += 1
+        return StoredImage(**{**meta, "path": str(blob)})
+
+    def writer(self, url: str) -> BlobWriter:
+        """为 URL 创建流式写入器"""
+        return BlobWriter(self, url)
+
+    def put_bytes(self, url: str, data: bytes, content_type: str = "image/jpeg",
+                  etag: Optional[str] = None) -> StoredImage:
+        """保存一张已在内存中的图片"""
+        with self.writer(url) as writer:
+            writer.write(data)
+            return writer.commit(content_type, etag)
+
+    def link(self, image: StoredImage, dest: str) -> str:
+        """
+        把 blob 放到 dest：优先硬链接，跨文件系统时退回符号链接，都不支持时复制
+
+        blob 被淘汰后硬链接和副本仍然可用；符号链接会失效，再次导出时重新下载并链接。
+        """
+        dest_path = Path(dest)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        blob = Path(image.path)
+        if not blob.exists():
+            raise FileNotFoundError(f"图片已被淘汰: {image.url}")
+        try:
+            if dest_path.exists() and os.path.samefile(dest_path, blob):
+                return str(dest_path)
+        except OSError:
+            pass
+        tmp = dest_path.with_name(f".{dest_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            try:
+                os.symlink(os.path.abspath(blob), tmp)
+            except OSError:
+                shutil.copyfile(blob, tmp)
+        os.replace(tmp, dest_path)
+        return str(dest_path)
+
+    def _commit(self, url: str, tmp_path: Path, sha256: str, size: int,
+                content_type: str, etag: Optional[str]) -> StoredImage:
+        blob = self.blob_path(sha256)
+        now = time.time()
+        image = StoredImage(url=url, sha256=sha256, path=str(blob), size=size,
+                            content_type=content_type, etag=etag, stored_at=now)
+        meta = {key: value for key, value in asdict(image).items() if key != "path"}
+        # 锁内只登记索引，文件的移动、写入和删除都在锁外进行
+        with self._lock:
+            index = self._load_index()
+            exists = sha256 in index
+            if exists:
+                self.deduplicated += 1
+            else:
+                self._total += size
+            index[sha256] = (size, now)
+        if exists:
+            # 相同内容已存在（不同 URL 或重复下载），只更新 URL 索引
+            try:
+                os.utime(blob, (now, now))
+                tmp_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                # 已有的 blob 刚被淘汰，用这次下载的内容补上
+                blob.parent.mkdir(exist_ok=True)
+                os.replace(tmp_path, blob)
+        else:
+            blob.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, blob)
+        url_path = self._url_path(url)
+        meta_tmp = url_path.with_name(f".{url_path.name}.{uuid.uuid4().hex}.tmp")
+        meta_tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(meta_tmp, url_path)
+        with self._lock:
+            victims = self._evict(keep=sha256)
+        for victim in victims:
+            self.blob_path(victim).unlink(missing_ok=True)
+        return image
+
+    def _evict(self, keep: str) -> List[str]:
+        """从索引中移除最久未访问的 blob，返回需要删除的 sha256（调用方在锁外删除文件）"""
+        victims: List[str] = []
+        if self._total <= self.max_bytes:
+            return victims
+        for sha256, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if sha256 == keep:
+                continue
+            del self._index[sha256]
+            self._total -= size
+            victims.append(sha256)
+            if self._total <= self.max_bytes:
+                break
+        return victims
+
+    def clear(self):
+        with self._lock:
+            victims = list(self._load_index())
+            self._index.clear()
+            self._total = 0
+        for sha256 in victims:
+            self.blob_path(sha256).unlink(missing_ok=True)
+        for path in self.url_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            index = self._load_index()
+            return {
+                "blobs": len(index),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "deduplicated": self.deduplicated,
+            }
+
+
+_image_store: Optional[ImageStore] = None
+_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """获取进程内共享的图片存储"""
+    global _image_store
+    if _image_store is None:
+        with _store_lock:
+            if _image_store is None:
+                _image_store = ImageStore()
+    return _image_store
+
+
+def configure_image_store(store: Optional[ImageStore]) -> Optional[ImageStore]:
+    """替换共享的图片存储（None 表示下次使用时按环境变量重新创建）"""
+    global _image_store
+    with _store_lock:
+        _image_store = store
+    return store
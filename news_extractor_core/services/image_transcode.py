@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+图片转码服务
+缩小尺寸、重新编码为 WebP/JPEG 并去掉元数据；在进程池中执行，结果按 (内容哈希, 参数) 缓存在图片存储中
+"""
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .image_store import ImageStore, StoredImage, get_image_store
+
+logger = logging.getLogger(__name__)
+
+# 转码进程数
+TRANSCODE_WORKERS = int(os.getenv("NEWS_TRANSCODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+
+@dataclass(frozen=True)
+class TranscodeOptions:
+    """转码参数：max_dimension 为长边上限（None 表示不缩放）"""
+    max_dimension: Optional[int] = 1280
+    format: str = "webp"  # webp / jpeg
+    quality: int = 80
+    strip_metadata: bool = True
+
+    def __post_init__(self):
+        if self.format not in _FORMATS:
+            raise ValueError(f"不支持的转码格式: {self.format}")
+        if not 1 <= self.quality <= 100:
+            raise ValueError("quality 需在 1-100 之间")
+
+    @property
+    def key(self) -> str:
+        return f"{self.max_dimension or 0}-{self.format}-q{self.quality}-{'s' if self.strip_metadata else 'k'}"
+
+
+def transcoding_available() -> bool:
+    """是否安装了 Pillow"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def transcode_bytes(data: bytes, options: TranscodeOptions) -> Optional[Tuple[bytes, str]]:
+    """
+    转码图片，返回 (新内容, MIME 类型)；动图或转码后反而更大时返回 None（保留原图）
+
+    在进程池中执行，只依赖参数，不访问任何全局状态。
+    """
+    try:
+        from PIL import Image
+    except ImportError as e:  # pragma: no cover - optional dependency
+        raise RuntimeError("Pillow is required for image transcoding") from e
+
+    pil_format, mime_type = _FORMATS[options.format]
+    with Image.open(io.BytesIO(data)) as img:
+        if getattr(img, "is_animated", False):
+            return None
+        if options.max_dimension and max(img.size) > options.max_dimension:
+            img.thumbnail((options.max_dimension, options.max_dimension), Image.LANCZOS)
+        if pil_format == "JPEG":
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in img.mode or "transparency" in img.info
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        save_kwargs = {"quality": options.quality}
+        if not options.strip_metadata:
+            for name in ("exif", "icc_profile"):
+                if img.info.get(name):
+                    save_kwargs[name] = img.info[name]
+        out = io.BytesIO()
+        # 不传 exif/icc_profile 时 Pillow 不会写入元数据
+        img.save(out, format=pil_format, **save_kwargs)
+    result = out.getvalue()
+    if len(result) >= len(data):
+        return None
+    return result, mime_type
+
+
+class ImageTranscoder:
+    """
+    图片转码器
+
+    结果以 "transcode:<sha256>:<参数>" 为键写入图片存储，同一张图片（无论来自哪个 URL）
+    用同样的参数只转码一次。
+    """
+
+    def __init__(self, store: Optional[ImageStore] = None, max_workers: int = TRANSCODE_WORKERS):
+        self._store = store
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> ImageStore:
+        if self._store is None:
+            self._store = get_image_store()
+        return self._store
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 调用方是多线程的服务进程，fork 会把其他线程持有的锁一起复制到子进程
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def transcode(self, image: StoredImage, options: TranscodeOptions) -> StoredImage:
+        """返回转码后的图片；无法或不值得转码时返回原图"""
+        return self.transcode_many([image], options)[0]
+
+    def transcode_many(self, images: List[StoredImage], options: TranscodeOptions) -> List[StoredImage]:
+        """批量转码，未命中缓存的图片分批提交到进程池，按输入顺序返回"""
+        results: List[Optional[StoredImage]] = []
+        pending = []
+        for idx, image in enumerate(images):
+            cached = self.store.get(self._key(image, options))
+            results.append(cached)
+            if cached is None:
+                pending.append(idx)
+        if not pending:
+            return results
+        if not transcoding_available():
+            raise RuntimeError("Pillow is required for image transcoding")
+        from PIL import Image, UnidentifiedImageError
+
+        # 无法识别（如 SVG）或超过像素上限的图片每次都会失败，可以记为"保留原图"
+        deterministic = (UnidentifiedImageError, Image.DecompressionBombError)
+        # 每批最多读入 2 倍进程数的图片，避免一次把所有原图都读进内存
+        chunk_size = 2 * self.max_workers
+        for start in range(0, len(pending), chunk_size):
+            jobs = []
+            for idx in pending[start:start + chunk_size]:
+                with open(images[idx].path, "rb") as f:
+                    data = f.read()
+                jobs.append((idx, data) + self._submit(data, options))
+            for idx, data, pool, future in jobs:
+                image = images[idx]
+                try:
+                    result = future.result()
+                except deterministic as e:
+                    logger.debug(f"图片无法转码，保留原图 {image.url}: {e}")
+                    result = None
+                except Exception as e:
+                    # 进程崩溃、内存不足等偶发错误：本次返回原图，不写缓存，下次重试
+                    logger.warning(f"图片转码失败 {image.url}: {e!r}")
+                    if isinstance(e, BrokenProcessPool):
+                        self._reset_pool(pool)
+                    results[idx] = image
+                    continue
+                if result is None:
+                    content, content_type = data, image.content_type
+                else:
+                    content, content_type = result
+                # 原图也按同一个键记录，下次直接命中；内容相同的 blob 只存一份
+                results[idx] = self.store.put_bytes(self._key(image, options), content, content_type)
+        return results
+
+    def _submit(self, data: bytes, options: TranscodeOptions) -> Tuple[ProcessPoolExecutor, Future]:
+        pool = self._pool()
+        try:
+            return pool, pool.submit(transcode_bytes, data, options)
+        except BrokenProcessPool:
+            # 有工作进程崩溃后进程池不再可用，换一个新的
+            self._reset_pool(pool)
+            pool = self._pool()
+            return pool, pool.submit(transcode_bytes, data, options)
+
+    def _reset_pool(self, broken: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is not broken:
+                # 其他线程已经换过了
+                return
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _key(image: StoredImage, options: TranscodeOptions) -> str:
+        return f"transcode:{image.sha256}:{options.key}"
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_image_transcoder: Optional[ImageTranscoder] = None
+_transcoder_lock = threading.Lock()
+
+
+def get_image_transcoder() -> ImageTranscoder:
+    """获取进程内共享的图片转码器"""
+    global _image_transcoder
+    if _image_transcoder is None:
+        with _transcoder_lock:
+            if _image_transcoder is None:
+                _image_transcoder = ImageTranscoder()
+    return _image_transcoder
+
+
+def configure_image_transcoder(transcoder: Optional[ImageTranscoder]) -> Optional[ImageTranscoder]:
+    """替换共享的转码器（None 表示下次使用时重新创建），旧转码器的进程池会被关闭"""
+    global _image_transcoder
+    with _transcoder_lock:
+        previous, _image_transcoder = _image_transcoder, transcoder
+    if previous is not None and previous is not transcoder:
+        previous.shutdown(wait=False)
+    return transcoder
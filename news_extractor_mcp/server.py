@@ -3,13 +3,14 @@
 Streamable HTTP entry-point for the News Extractor MCP server.
 """
 
+import json
 from pathlib import Path
 from typing import Any, Literal, Sequence
 from urllib.parse import urlparse
 
 import click
 from anyio import to_thread
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 import uvicorn
@@ -17,10 +18,14 @@ import uvicorn
 try:
     from news_extractor_core.models import NewsItem
     from news_extractor_core.services import (
+        BatchResult,
         ExtractorService,
+        TranscodeOptions,
         detect_platform,
         get_supported_platforms,
+        iter_batch,
         to_markdown,
+        transcoding_available,
     )
 except ModuleNotFoundError:  # pragma: no cover - fallback for local runs
     import sys
@@ -28,15 +33,24 @@ except ModuleNotFoundError:  # pragma: no cover - fallback for local runs
     sys.path.append(str(Path(__file__).resolve().parents[1]))
     from news_extractor_core.models import NewsItem
     from news_extractor_core.services import (
+        BatchResult,
         ExtractorService,
+        TranscodeOptions,
         detect_platform,
         get_supported_platforms,
+        iter_batch,
         to_markdown,
+        transcoding_available,
     )
 
 SERVER_NAME = "news-extractor"
 DEFAULT_PATH = "/mcp"
 SUPPORTED_FORMATS: set[str] = {"json", "markdown"}
+BATCH_MAX_CONCURRENCY = 16
+BATCH_PER_HOST = 2
+BATCH_TIMEOUT_SECONDS = 120.0
+# 内嵌图片先缩小并转为 WebP，显著减少返回给模型的 Base64 体积（未安装 Pillow 时嵌入原图）
+EMBED_TRANSCODE = TranscodeOptions(max_dimension=1024, format="webp", quality=75)
 
 mcp = FastMCP(
     name=SERVER_NAME,
@@ -96,15 +110,22 @@ def _build_news_payload(
         "抓取单篇新闻并返回结构化数据或 Markdown 文本。\n"
         "参数：\n"
         "- url: 新闻链接\n"
-        "- output_format: 输出格式，'json'（返回结构化JSON数据）或 'markdown'（返回纯Markdown文本），默认为 'json'"
+        "- output_format: 输出格式，'json'（返回结构化JSON数据）或 'markdown'（返回纯Markdown文本），默认为 'json'\n"
+        "- embed_images: 仅对 markdown 有效，是否把图片以 Base64 内嵌到 Markdown 中（缩放为长边 1024 的 WebP），默认为 false"
     ),
 )
-async def extract_news(url: str, output_format: str = "json") -> str | dict[str, Any]:
+async def extract_news(url: str, output_format: str = "json", embed_images: bool = False) -> str | dict[str, Any]:
     normalized_url = _normalize_url(url)
     normalized_format = _normalize_output_format(output_format)
     news, platform = await _extract(normalized_url)
 
     if normalized_format == "markdown":
+        if embed_images:
+            # 图片经共享的下载引擎获取并写入图片存储，下载在线程中进行
+            transcode = EMBED_TRANSCODE if transcoding_available() else None
+            return await to_thread.run_sync(
+                lambda: to_markdown(news, embed_images=True, platform=platform, transcode=transcode)
+            )
         # 直接返回 markdown 文本
         return to_markdown(news)
     else:
@@ -117,68 +138,93 @@ async def extract_news(url: str, output_format: str = "json") -> str | dict[str,
         )
 
 
+async def _extract_normalized(url: str) -> tuple[NewsItem, str]:
+    return await _extract(_normalize_url(url))
+
+
+def _batch_item_payload(result: BatchResult) -> dict[str, Any]:
+    if result.ok:
+        return _build_news_payload(
+            news=result.news,
+            platform=result.platform,
+            url=result.url.strip(),
+            include_markdown=False,
+        )
+    return {
+        "status": result.status,
+        "url": result.url,
+        "message": result.error,
+    }
+
+
+def _batch_item_markdown(result: BatchResult) -> str:
+    if result.ok:
+        return (
+            f"## {result.news.title}\n\n**来源**: {result.url.strip()}\n**平台**: {result.platform}\n\n"
+            f"{to_markdown(result.news)}\n\n---\n"
+        )
+    label = "超时" if result.status == "timeout" else "提取失败"
+    return f"## ❌ {label}\n\n**URL**: {result.url}\n**错误**: {result.error}\n\n---\n"
+
+
 @mcp.tool(
     name="batch_extract_news",
     title="批量提取新闻",
     description=(
-        "依次抓取多个新闻链接，返回成功/失败统计。\n"
+        "并发抓取多个新闻链接，按输入顺序返回结果和成功/失败统计。\n"
         "参数：\n"
         "- urls: 新闻链接列表\n"
-        "- output_format: 输出格式，'json'（返回结构化JSON数据）或 'markdown'（返回合并的Markdown文本），默认为 'json'"
+        "- output_format: 输出格式，'json'（返回结构化JSON数据）或 'markdown'（返回合并的Markdown文本），默认为 'json'\n"
+        f"- max_concurrency: 最大并发数，默认 {BATCH_MAX_CONCURRENCY}（同一站点最多 {BATCH_PER_HOST} 个）\n"
+        f"- timeout_seconds: 整体截止时间（秒），默认 {BATCH_TIMEOUT_SECONDS:g}；到期未完成的链接标记为 timeout，其余结果照常返回\n"
+        "客户端请求携带 progressToken 时，每完成一个链接就发送一条进度通知，message 为该链接结果的 JSON"
     ),
 )
-async def batch_extract_news(urls: list, output_format: str = "json") -> str | dict[str, Any]:
+async def batch_extract_news(
+    urls: list,
+    output_format: str = "json",
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    timeout_seconds: float = BATCH_TIMEOUT_SECONDS,
+    ctx: Context | None = None,
+) -> str | dict[str, Any]:
     if not urls:
         raise ValueError("请提供至少一个 URL")
 
     normalized_format = _normalize_output_format(output_format)
 
-    results: list[dict[str, Any]] = []
-    markdown_parts: list[str] = []
-    success = 0
-
-    for raw in urls:
-        try:
-            normalized_url = _normalize_url(raw)
-            news, platform = await _extract(normalized_url)
-
-            if normalized_format == "markdown":
-                # 收集 markdown 内容
-                markdown_parts.append(f"## {news.title}\n\n**来源**: {normalized_url}\n**平台**: {platform}\n\n{to_markdown(news)}\n\n---\n")
-            else:
-                # 收集 JSON 数据
-                payload = _build_news_payload(
-                    news=news,
-                    platform=platform,
-                    url=normalized_url,
-                    include_markdown=False,
-                )
-                results.append(payload)
-            success += 1
-        except Exception as exc:
-            if normalized_format == "markdown":
-                markdown_parts.append(f"## ❌ 提取失败\n\n**URL**: {raw}\n**错误**: {str(exc)}\n\n---\n")
-            else:
-                results.append(
-                    {
-                        "status": "error",
-                        "url": str(raw),
-                        "message": str(exc),
-                    }
-                )
+    batch: list[BatchResult] = []
+    async for result in iter_batch(
+        [str(raw) for raw in urls],
+        extract=_extract_normalized,
+        concurrency=max(1, min(max_concurrency, BATCH_MAX_CONCURRENCY)),
+        per_host=BATCH_PER_HOST,
+        deadline=timeout_seconds if timeout_seconds and timeout_seconds > 0 else None,
+    ):
+        batch.append(result)
+        if ctx is not None:
+            # 按完成顺序推送单条结果，首条结果不必等待最慢的链接
+            message = json.dumps({"index": result.index, **_batch_item_payload(result)}, ensure_ascii=False)
+            await ctx.report_progress(len(batch), len(urls), message=message)
+    batch.sort(key=lambda result: result.index)
+    success = sum(1 for result in batch if result.ok)
+    timed_out = sum(1 for result in batch if result.status == "timeout")
 
     if normalized_format == "markdown":
         # 返回合并的 markdown 文本
-        header = f"# 批量提取结果\n\n总计: {len(urls)} | 成功: {success} | 失败: {len(urls) - success}\n\n---\n\n"
-        return header + "\n".join(markdown_parts)
+        header = f"# 批量提取结果\n\n总计: {len(urls)} | 成功: {success} | 失败: {len(urls) - success}"
+        if timed_out:
+            header += f" | 超时: {timed_out}"
+        header += "\n\n---\n\n"
+        return header + "\n".join(_batch_item_markdown(result) for result in batch)
     else:
         # 返回 JSON 结构
         return {
             "status": "success",
-            "total": len(results),
+            "total": len(batch),
             "successful": success,
-            "failed": len(results) - success,
-            "results": results,
+            "failed": len(batch) - success,
+            "timed_out": timed_out,
+            "results": [_batch_item_payload(result) for result in batch],
         }
 
 
@@ -0,0 +1,89 @@
+"""
+批量提取测试：并发上限、每主机上限、截止时间与部分结果（离线）
+"""
+import asyncio
+
+import pytest
+
+from news_extractor_core.models import NewsItem
+from news_extractor_core.services import extract_batch
+
+
+def _fake_extractor(delays, active_hosts, peak):
+    async def extract(url):
+        host = url.split("/")[2]
+        active_hosts[host] = active_hosts.get(host, 0) + 1
+        peak["total"] = max(peak["total"], sum(active_hosts.values()))
+        peak[host] = max(peak.get(host, 0), active_hosts[host])
+        try:
+            await asyncio.sleep(delays.get(url, 0.05))
+            if "bad" in url:
+                raise ValueError("解析失败")
+            return NewsItem({"title": url}), "bbc"
+        finally:
+            active_hosts[host] -= 1
+    return extract
+
+
+def test_batch_keeps_order_and_respects_caps():
+    urls = [f"https://a.com/{idx}" for idx in range(6)] + [f"https://b.com/{idx}" for idx in range(4)]
+    urls.append("https://c.com/bad")
+    peak = {"total": 0}
+    extract = _fake_extractor({"https://a.com/0": 0.2}, {}, peak)
+
+    results = asyncio.run(extract_batch(urls, extract=extract, concurrency=3, per_host=2))
+    assert [r.url for r in results] == urls
+    assert [r.status for r in results] == ["success"] * 10 + ["error"]
+    assert results[-1].error == "解析失败"
+    assert peak["total"] <= 3 and peak["a.com"] <= 2 and peak["b.com"] <= 2
+
+
+def test_batch_deadline_returns_partial_results():
+    urls = ["https://a.com/fast", "https://b.com/slow", "https://c.com/fast"]
+    extract = _fake_extractor({"https://b.com/slow": 5}, {}, {"total": 0})
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await extract_batch(urls, extract=extract, deadline=0.3)
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(main())
+    assert elapsed < 1
+    assert [r.status for r in results] == ["success", "timeout", "success"]
+
+
+def test_mcp_batch_tool_reports_timeouts(monkeypatch):
+    pytest.importorskip("mcp")
+    from news_extractor_mcp import server
+
+    extract = _fake_extractor({"https://b.com/slow": 5}, {}, {"total": 0})
+    monkeypatch.setattr(server, "_extract", extract)
+    payload = asyncio.run(server.batch_extract_news(
+        ["https://a.com/1", "https://b.com/slow", "not a url"], timeout_seconds=0.3,
+    ))
+    assert [r["status"] for r in payload["results"]] == ["success", "timeout", "error"]
+    assert (payload["successful"], payload["failed"], payload["timed_out"]) == (1, 2, 1)
+    markdown = asyncio.run(server.batch_extract_news(["https://a.com/1"], output_format="markdown"))
+    assert markdown.startswith("# 批量提取结果")
+
+
+def test_mcp_batch_tool_reports_progress_per_result(monkeypatch):
+    pytest.importorskip("mcp")
+    import json
+
+    from news_extractor_mcp import server
+
+    class _Context:
+        def __init__(self):
+            self.progress = []
+
+        async def report_progress(self, progress, total=None, message=None):
+            self.progress.append((progress, total, json.loads(message)))
+
+    extract = _fake_extractor({"https://a.com/slow": 0.3}, {}, {"total": 0})
+    monkeypatch.setattr(server, "_extract", extract)
+    ctx = _Context()
+    payload = asyncio.run(server.batch_extract_news(["https://a.com/slow", "https://b.com/fast"], ctx=ctx))
+    assert [(p, t, m["index"]) for p, t, m in ctx.progress] == [(1, 2, 1), (2, 2, 0)]
+    assert [r["url"] for r in payload["results"]] == ["https://a.com/slow", "https://b.com/fast"]
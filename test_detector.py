@@ -0,0 +1,63 @@
+"""
+平台检测测试：主机名查找 + 合并正则、大小写、批量接口（离线）
+"""
+import pytest
+
+from news_extractor_core.services import detect_platform, detect_platforms
+
+
+@pytest.mark.parametrize("url, platform", [
+    ("https://www.toutiao.com/article/7434425099895210546/", "toutiao"),
+    ("http://mp.weixin.qq.com/s/abc", "wechat"),
+    ("https://www.163.com/dy/article/JG1.html", "netease"),
+    ("https://www.163.com/sports/article/JG1.html", None),
+    ("https://n.news.naver.com/article/001/0001", "naver"),
+    ("https://naver.com/", None),
+    ("https://www.quora.com/What-is", "quora"),
+    ("https://edition.cnn.com/2024/01/02/world/x", "cnn"),
+    ("https://www.cnn.com/world", None),
+    ("https://x.com/jack/status/20", "twitter"),
+    ("https://example.com/?next=https://www.bbc.com/news/articles/c1", None),
+    ("https://evil.com/?u=a.naver.com/", None),
+    ("ftp://www.bbc.com/news/articles/c1", None),
+    ("not a url", None),
+])
+def test_detect_platform(url, platform):
+    assert detect_platform(url) == platform
+
+
+def test_host_is_case_insensitive_but_path_is_not():
+    assert detect_platform("HTTPS://WWW.BBC.COM/news/articles/c1") == "bbc"
+    assert detect_platform("https://Mp.Weixin.QQ.com/s/abc") == "wechat"
+    assert detect_platform("https://www.toutiao.com/ARTICLE/1") is None
+
+
+def test_detect_platforms_keeps_input_order():
+    urls = ["https://www.sohu.com/a/1", "https://example.com/", "https://news.qq.com/rain/a/2"]
+    assert detect_platforms(urls) == ["sohu", None, "tencent"]
+    assert detect_platforms(iter([])) == []
+
+
+def test_every_platform_is_reachable_through_host_tables():
+    from news_extractor_core.services.detector import (
+        PLATFORM_HOST_SUFFIXES,
+        PLATFORM_HOSTS,
+        PLATFORM_PATTERNS,
+    )
+
+    # 新平台需要同时登记主机名，否则只能走没有预筛选的慢路径
+    indexed = set(PLATFORM_HOSTS.values()) | set(PLATFORM_HOST_SUFFIXES.values())
+    assert indexed == set(PLATFORM_PATTERNS)
+
+
+def test_unindexed_platform_is_still_detected(monkeypatch):
+    from news_extractor_core.services import detector
+
+    monkeypatch.delitem(detector.PLATFORM_HOSTS, "www.bbc.com")
+    monkeypatch.setattr(detector, "_UNINDEXED_RE", detector._combine(["bbc"]))
+    detector._host_platform.cache_clear()
+    try:
+        assert detect_platform("https://www.bbc.com/news/articles/c1") == "bbc"
+        assert detect_platform("https://www.bbc.com/sport/1") is None
+    finally:
+        detector._host_platform.cache_clear()
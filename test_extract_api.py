@@ -0,0 +1,227 @@
+"""
+提取 API 测试：有界执行器、队列满时返回 503、按需生成 Markdown、批量流式返回（离线）
+"""
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from news_crawler.core import NewsItem
+from news_extractor_backend.api import extract as extract_api
+from news_extractor_backend.executor import BoundedExecutor, configure_extract_executor
+
+
+@pytest.fixture
+def client_app(monkeypatch):
+    release = threading.Event()
+
+    def fake_extract(url, platform=None, cookie=None):
+        release.wait(5)
+        return NewsItem(title=url, news_url=url), "bbc"
+
+    monkeypatch.setattr(extract_api.ExtractorService, "extract_news", staticmethod(fake_extract))
+    monkeypatch.setattr(extract_api, "to_markdown", lambda item, **kwargs: f"# {item.title}")
+    configure_extract_executor(BoundedExecutor(max_workers=1, queue_size=1, retry_after=7))
+    app = FastAPI()
+    app.include_router(extract_api.router, prefix="/api")
+    yield app, release
+    release.set()
+    configure_extract_executor(None)
+
+
+def test_extract_runs_off_loop_and_sheds_load(client_app):
+    app, release = client_app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            accepted = [
+                asyncio.ensure_future(client.post("/api/extract", json={"url": f"https://bbc.com/{idx}",
+                                                         "output_format": "markdown"}))
+                for idx in range(2)
+            ]
+            await asyncio.sleep(0.1)
+            # 执行槽与队列已满：立即返回 503，事件循环仍可响应其他请求
+            busy = await client.post("/api/extract", json={"url": "https://bbc.com/2"})
+            health = await client.get("/api/health")
+            release.set()
+            return busy, health, await asyncio.gather(*accepted)
+
+    busy, health, accepted = asyncio.run(main())
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "7"
+    assert busy.json()["detail"]["error"]["code"] == "SERVER_BUSY"
+    assert health.json()["extract_executor"]["active"] == 1
+    assert health.json()["extract_executor"]["queued"] == 1
+    assert [r.json()["markdown"] for r in accepted] == ["# https://bbc.com/0", "# https://bbc.com/1"]
+
+
+def test_json_output_skips_markdown_until_requested(monkeypatch):
+    rendered = []
+
+    def fake_markdown(item, **kwargs):
+        rendered.append(kwargs)
+        return f"# {item.title}"
+
+    monkeypatch.setattr(extract_api.ExtractorService, "extract_news",
+                        staticmethod(lambda url, platform=None, cookie=None: (NewsItem(title=url, news_url=url), "bbc")))
+    monkeypatch.setattr(extract_api, "to_markdown", fake_markdown)
+    configure_extract_executor(BoundedExecutor(max_workers=2, queue_size=2))
+    app = FastAPI()
+    app.include_router(extract_api.router, prefix="/api")
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            extracted = await client.post("/api/extract", json={"url": "https://bbc.com/lazy", "embed_images": True})
+            extract_id = extracted.json()["id"]
+            first = await client.get(f"/api/extract/{extract_id}/markdown", params={"embed_images": "true"})
+            second = await client.get(f"/api/extract/{extract_id}/markdown", params={"embed_images": "true"})
+            missing = await client.get("/api/extract/unknown/markdown")
+            return extracted, first, second, missing
+
+    try:
+        extracted, first, second, missing = asyncio.run(main())
+    finally:
+        configure_extract_executor(None)
+    # JSON 输出不生成 Markdown（也就不下载图片）
+    assert extracted.json()["markdown"] is None
+    assert extracted.json()["data"]["title"] == "https://bbc.com/lazy"
+    # 按需生成一次，之后命中缓存
+    assert first.json()["markdown"] == second.json()["markdown"] == "# https://bbc.com/lazy"
+    assert len(rendered) == 1 and rendered[0]["embed_images"] is True
+    assert missing.status_code == 404
+    assert missing.json()["detail"]["error"]["code"] == "RESULT_NOT_FOUND"
+
+
+@pytest.mark.parametrize("stream_format", ["ndjson", "sse"])
+def test_batch_endpoint_streams_results_as_they_finish(monkeypatch, stream_format):
+    def fake_extract(url, platform=None, cookie=None):
+        time.sleep({"slow": 0.4, "fast": 0.01, "bad": 0.1}[url.rsplit("/", 1)[-1]])
+        if url.endswith("bad"):
+            raise ValueError("提取失败: boom")
+        return NewsItem(title=url, news_url=url), "bbc"
+
+    monkeypatch.setattr(extract_api.ExtractorService, "extract_news", staticmethod(fake_extract))
+    monkeypatch.setattr(extract_api, "to_markdown", lambda item, **kwargs: f"# {item.title}")
+    configure_extract_executor(BoundedExecutor(max_workers=4, queue_size=4))
+    app = FastAPI()
+    app.include_router(extract_api.router, prefix="/api")
+    urls = ["https://a.com/slow", "https://b.com/fast", "https://c.com/bad"]
+    headers = {"Accept": "text/event-stream"} if stream_format == "sse" else {}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {"urls": urls, "include_markdown": True}
+            async with client.stream("POST", "/api/extract/batch", json=body, headers=headers) as response:
+                assert response.headers["content-type"].startswith(
+                    "text/event-stream" if stream_format == "sse" else "application/x-ndjson")
+                return [line async for line in response.aiter_lines() if line.strip()]
+
+    try:
+        lines = asyncio.run(main())
+    finally:
+        configure_extract_executor(None)
+    if stream_format == "sse":
+        assert lines[0] == "event: result" and lines[-2] == "event: summary"
+        lines = [line[len("data: "):] for line in lines if line.startswith("data: ")]
+    events = [json.loads(line) for line in lines]
+    # 慢的 URL 最后完成，但不影响其他结果先返回
+    assert [e.get("index") for e in events] == [1, 2, 0, None]
+    assert events[0]["markdown"] == "# https://b.com/fast"
+    assert events[1]["status"] == "error"
+    assert events[-1] == {"type": "summary", "total": 3, "successful": 2, "failed": 1, "timed_out": 0}
+
+
+def test_batch_waits_for_its_share_instead_of_failing():
+    executor = BoundedExecutor(max_workers=2, queue_size=0, batch_workers=1)
+    release = threading.Event()
+    running = []
+
+    def work(idx):
+        running.append(executor.stats()["batch_running"])
+        release.wait(5)
+        return idx
+
+    async def main():
+        single = executor.submit(release.wait, 5)
+        batch = [asyncio.ensure_future(executor.run_batch(work, idx)) for idx in range(3)]
+        await asyncio.sleep(0.1)
+        stats = executor.stats()
+        # 单条请求只剩下批量子名额之外的位置，立即失败；批量任务排队等待
+        with pytest.raises(extract_api.ExecutorBusy):
+            executor.submit(release.wait, 5)
+        release.set()
+        single.result(5)
+        return stats, await asyncio.gather(*batch)
+
+    try:
+        stats, results = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert results == [0, 1, 2]
+    assert (stats["batch_running"], stats["batch_waiting"]) == (1, 2)
+    assert max(running) == 1
+    assert executor.stats()["batch_running"] == 0
+
+
+def test_cancelled_queued_batch_jobs_release_their_slots():
+    executor = BoundedExecutor(max_workers=1, queue_size=4, batch_workers=3)
+    release = threading.Event()
+
+    async def main():
+        # 第一个任务占住唯一的线程，其余两个在线程池队列中排队
+        jobs = [asyncio.ensure_future(executor.run_batch(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        queued = executor.stats()["queued"]
+        for job in jobs[1:]:
+            job.cancel()
+        await asyncio.gather(*jobs[1:], return_exceptions=True)
+        release.set()
+        await jobs[0]
+        return queued
+
+    try:
+        queued = asyncio.run(main())
+        deadline = time.monotonic() + 5
+        while executor.stats()["active"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = executor.stats()
+        # 信号量名额也已全部归还
+        for future in [executor.submit(time.sleep, 0) for _ in range(5)]:
+            future.result(5)
+    finally:
+        executor.shutdown()
+    assert queued == 2
+    assert (stats["active"], stats["queued"], stats["batch_running"]) == (0, 0, 0)
+
+
+def test_cancelled_queued_request_does_not_leak_capacity():
+    executor = BoundedExecutor(max_workers=1, queue_size=1)
+    release = threading.Event()
+
+    async def main():
+        running = executor.submit(release.wait, 5)
+        # 客户端断开：排队中的请求被取消
+        queued = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.1)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        stats = executor.stats()
+        # 名额已归还，不会一直返回 503
+        retry = executor.submit(time.sleep, 0)
+        release.set()
+        running.result(5)
+        retry.result(5)
+        return stats
+
+    try:
+        stats = asyncio.run(main())
+    finally:
+        executor.shutdown()
+    assert (stats["active"], stats["queued"], stats["rejected"]) == (1, 0, 0)
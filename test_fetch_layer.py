@@ -0,0 +1,373 @@
+"""
+抓取层测试：会话连接池等（使用本地 HTTP 服务，无需外网）
+"""
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from news_crawler.core import BaseNewsCrawler, ContentItem, NewsItem, NewsMetaInfo
+from news_crawler.core.fetchers import (
+    FetchRequest,
+    HttpxFetcher,
+    RecordingFetcher,
+    ReplayFetcher,
+    RequestsFetcher,
+    iter_corpus,
+    request_key,
+)
+from news_crawler.core.http_cache import CachingFetcher, HttpCache
+from news_crawler.core.pipeline import CrawlJob, CrawlPipeline
+from news_crawler.core.ratelimit import HostRateLimiter, RateLimit
+from news_crawler.core.sessions import (
+    SessionPool,
+    SessionPoolConfig,
+    _requests_session,
+    aclose_async_clients,
+)
+from news_crawler.core.sinks import JsonlSink, iter_news_items
+from news_crawler.core.urls import canonicalize_url
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    hits = []
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        _Handler.hits.append(self.path)
+        if self.path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        body = f"<html><title>{self.path}</title></html>".encode("utf-8")
+        status = 404 if self.path.startswith("/missing") else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    _Handler.connections = set()
+    _Handler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_fetcher_reuses_connection(http_server):
+    pool = SessionPool(_requests_session, SessionPoolConfig())
+    fetcher = RequestsFetcher(pool=pool)
+    for idx in range(5):
+        html = fetcher.fetch(FetchRequest(url=f"{http_server}/a{idx}"))
+        assert f"/a{idx}" in html
+    assert len(_Handler.connections) == 1
+    assert pool.stats()["created"] == 1
+    assert pool.stats()["reused"] == 4
+    pool.close()
+
+
+def test_requests_fetcher_raises_on_error_status(http_server):
+    fetcher = RequestsFetcher(pool=SessionPool(_requests_session))
+    with pytest.raises(RuntimeError):
+        fetcher.fetch(FetchRequest(url=f"{http_server}/missing"))
+    response = fetcher.fetch_response(FetchRequest(url=f"{http_server}/missing"))
+    assert response.status_code == 404
+
+
+def test_session_pool_evicts_idle_sessions():
+    closed = []
+
+    class _Session:
+        def close(self):
+            closed.append(self)
+
+    pool = SessionPool(lambda config: _Session(), SessionPoolConfig(idle_timeout=0))
+    with pool.session("https://example.com/a"):
+        pass
+    with pool.session("https://example.com/b"):
+        pass
+    assert pool.stats()["created"] == 2
+    assert len(closed) >= 1
+
+
+class _TitleCrawler(BaseNewsCrawler):
+    async_fetch_strategy = HttpxFetcher
+    persist_by_default = False
+
+    def parse_content(self, html: str) -> NewsItem:
+        title = html.split("<title>")[1].split("</title>")[0]
+        return self.compose_news_item(
+            title=title,
+            meta_info=NewsMetaInfo(),
+            contents=[ContentItem(content=title)],
+        )
+
+    def get_article_id(self) -> str:
+        return self.new_url.rsplit("/", 1)[-1]
+
+
+def test_arun_fetches_concurrently_on_one_loop(http_server):
+    async def main():
+        crawlers = [_TitleCrawler(f"{http_server}/item{idx}") for idx in range(10)]
+        try:
+            return await asyncio.gather(*(c.arun() for c in crawlers))
+        finally:
+            await aclose_async_clients()
+
+    items = asyncio.run(main())
+    assert [item.title for item in items] == [f"/item{idx}" for idx in range(10)]
+
+
+class _DelayedFetcher:
+    """Async fetcher that records how many requests are in flight at once."""
+
+    def __init__(self, pages, delay=0.05):
+        self.pages = pages
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.urls = []
+
+    async def afetch(self, request):
+        self.urls.append(request.url)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.pages(request.url)
+        finally:
+            self.in_flight -= 1
+
+
+def test_arun_overlaps_fetches():
+    fetcher = _DelayedFetcher(lambda url: f"<html><title>{url}</title></html>")
+
+    async def main():
+        crawlers = [_TitleCrawler(f"https://a.example.com/{idx}", afetcher=fetcher) for idx in range(5)]
+        return await asyncio.gather(*(c.arun() for c in crawlers))
+
+    items = asyncio.run(main())
+    assert [item.title for item in items] == [f"https://a.example.com/{idx}" for idx in range(5)]
+    assert fetcher.peak > 1
+
+
+def test_naver_resolves_iframe_without_blocking_the_loop(monkeypatch):
+    from news_crawler.naver_news import naver_news
+
+    monkeypatch.setattr(naver_news.requests, "get", lambda *a, **kw: pytest.fail("blocking request"))
+    monkeypatch.setattr(naver_news.NaverNewsCrawler, "persist_by_default", False)
+
+    def pages(url):
+        if "PostView" in url:
+            return (
+                "<html><div class='se-module se-module-text se-title-text'><span>T</span></div>"
+                "<div class='se-main-container'><p>body</p></div></html>"
+            )
+        return "<html><iframe id='mainFrame' src='/PostView.naver?logNo=1'></iframe></html>"
+
+    fetcher = _DelayedFetcher(pages)
+
+    async def main():
+        crawlers = [naver_news.NaverNewsCrawler(f"https://blog.naver.com/u/{idx}") for idx in range(3)]
+        for crawler in crawlers:
+            crawler.afetcher = fetcher
+        return await asyncio.gather(*(c.arun() for c in crawlers))
+
+    items = asyncio.run(main())
+    assert [item.title for item in items] == ["T"] * 3
+    assert fetcher.urls.count("https://blog.naver.com/PostView.naver?logNo=1") == 3
+    # iframe 地址的解析也在事件循环上并发进行
+    assert fetcher.peak > 1
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter()
+    limiter.configure("https://a.example.com", RateLimit(rate=10, burst=2))
+    delays = [limiter.reserve("https://a.example.com/x") for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.02)
+    assert delays[3] == pytest.approx(0.2, abs=0.02)
+    # 未配置的主机不限速
+    assert limiter.reserve("https://b.example.com/x") == 0.0
+
+
+def test_rate_limiter_backs_off_on_throttle():
+    limiter = HostRateLimiter()
+    limiter.configure("a.example.com", RateLimit(rate=4, burst=1))
+    limiter.feedback("https://a.example.com/x", 429, retry_after="2")
+    assert limiter.snapshot()["a.example.com"]["rate"] == 2
+    assert limiter.reserve("https://a.example.com/x") >= 1.9
+    for _ in range(20):
+        limiter.feedback("https://a.example.com/x", 200)
+    assert limiter.snapshot()["a.example.com"]["rate"] == 4
+
+
+def test_caching_fetcher_revalidates_with_etag(http_server, tmp_path):
+    cache = HttpCache(tmp_path, max_bytes=1024 * 1024)
+    fetcher = CachingFetcher(RequestsFetcher(pool=SessionPool(_requests_session)), cache)
+    first = fetcher.fetch(FetchRequest(url=f"{http_server}/etag"))
+    second = fetcher.fetch(FetchRequest(url=f"{http_server}/etag"))
+    assert first == second
+    # 第二次请求走条件请求，服务端返回 304
+    assert _Handler.hits == ["/etag", "/etag"]
+
+    fresh = FetchRequest(url=f"{http_server}/etag", extras={"cache_ttl": 60})
+    assert fetcher.fetch(fresh) == first
+    assert len(_Handler.hits) == 2
+
+
+def test_caching_fetcher_serves_response_api_from_cache(http_server, tmp_path):
+    cache = HttpCache(tmp_path / "cache", max_bytes=1024 * 1024)
+    fetcher = CachingFetcher(RequestsFetcher(pool=SessionPool(_requests_session)), cache)
+    recorder = RecordingFetcher(fetcher, tmp_path / "corpus")
+    request = FetchRequest(url=f"{http_server}/etag", extras={"cache_ttl": 60})
+    first = recorder.fetch_response(request)
+    second = recorder.fetch_response(request)
+    assert (second.status_code, second.text) == (first.status_code, first.text)
+    # 第二次由缓存返回，不访问服务端
+    assert _Handler.hits == ["/etag"]
+
+    revalidated = fetcher.fetch_response(FetchRequest(url=f"{http_server}/etag"))
+    assert revalidated.status_code == 200 and revalidated.text == first.text
+    assert _Handler.hits == ["/etag", "/etag"]
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path):
+    from news_crawler.core.http_cache import CacheEntry
+
+    cache = HttpCache(tmp_path, max_bytes=700)
+    for idx in range(3):
+        cache.put(f"k{idx}", CacheEntry(url=f"u{idx}", text=os.urandom(200).hex()))
+        cache.get("k0")
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+
+
+def test_caching_fetcher_passes_through_plain_fetchers(tmp_path):
+    class PlainFetcher:
+        def fetch(self, request):
+            return "plain"
+
+        async def afetch(self, request):
+            return "plain"
+
+    cache = HttpCache(tmp_path)
+    fetcher = CachingFetcher(PlainFetcher(), cache)
+    assert fetcher.fetch(FetchRequest(url="http://example.com/")) == "plain"
+    assert asyncio.run(fetcher.afetch(FetchRequest(url="http://example.com/"))) == "plain"
+    assert cache.get(request_key(FetchRequest(url="http://example.com/"))) is None
+
+
+def test_crawler_http_cache_is_opt_in(tmp_path):
+    from news_crawler.core.simple_crawler import SimpleNewsCrawler
+
+    assert not isinstance(SimpleNewsCrawler().create_fetcher(), CachingFetcher)
+
+    class CachedCrawler(SimpleNewsCrawler):
+        use_http_cache = True
+        http_cache_dir = str(tmp_path / "cache")
+
+    fetcher = CachedCrawler().create_fetcher()
+    assert isinstance(fetcher, CachingFetcher)
+    assert fetcher.cache.directory == (tmp_path / "cache").resolve()
+    assert CachedCrawler().create_fetcher().cache is fetcher.cache
+
+
+def test_record_then_replay_offline(http_server, tmp_path):
+    recorder = RecordingFetcher(RequestsFetcher(pool=SessionPool(_requests_session)), tmp_path)
+    html = recorder.fetch(FetchRequest(url=f"{http_server}/article?b=2&a=1&utm_source=x"))
+
+    replay = ReplayFetcher(tmp_path, latency=(0.0, 0.01))
+    # 规范化后的 URL 命中同一条记录
+    assert replay.fetch(FetchRequest(url=f"{http_server}/article?a=1&b=2")) == html
+    assert asyncio.run(replay.afetch(FetchRequest(url=f"{http_server}/article?a=1&b=2"))) == html
+    with pytest.raises(RuntimeError):
+        replay.fetch(FetchRequest(url=f"{http_server}/never-recorded"))
+    assert len(list(iter_corpus(tmp_path))) == 1
+
+
+def test_canonicalize_url():
+    assert (
+        canonicalize_url("HTTPS://Example.COM:443/a?z=1&utm_medium=x&a=2#frag")
+        == "https://example.com/a?a=2&z=1"
+    )
+
+
+def test_pipeline_parses_in_worker_processes(http_server):
+    jobs = [CrawlJob(_TitleCrawler, f"{http_server}/p{idx}") for idx in range(6)]
+    jobs.append(CrawlJob(_TitleCrawler, f"{http_server}/missing"))
+    with CrawlPipeline(fetch_concurrency=4, parse_workers=2, queue_size=2) as pipeline:
+        results = pipeline.run_all(jobs)
+
+        async def collect():
+            try:
+                return [r async for r in pipeline.arun(jobs[:3])]
+            finally:
+                await aclose_async_clients()
+
+        async_results = asyncio.run(collect())
+    assert [r.item.title for r in results[:6]] == [f"/p{idx}" for idx in range(6)]
+    assert not results[-1].ok and "404" in results[-1].error
+    assert sorted(r.item.title for r in async_results) == ["/p0", "/p1", "/p2"]
+
+
+def test_pipeline_writes_results_to_sink(http_server, tmp_path):
+    jobs = [CrawlJob(_TitleCrawler, f"{http_server}/s{idx}") for idx in range(4)]
+    sink = JsonlSink(tmp_path, batch_size=2)
+    with CrawlPipeline(fetch_concurrency=2, parse_workers=2, persist=True, sink=sink) as pipeline:
+        results = pipeline.run_all(jobs)
+    sink.close()
+    assert all(r.saved_path == str(sink.current_path) for r in results)
+    assert sorted(item.title for item in iter_news_items(tmp_path)) == [f"/s{idx}" for idx in range(4)]
+
+
+def test_jsonl_sink_flushes_tail_of_burst_in_background(tmp_path):
+    sink = JsonlSink(tmp_path, batch_size=100, fsync_interval=0.05)
+    try:
+        sink.write(NewsItem(title="tail"), "k")
+        deadline = time.monotonic() + 5
+        while not list(iter_news_items(tmp_path)) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        # 没有后续写入、也没有 close，缓冲中的条目仍会落盘
+        assert [item.title for item in iter_news_items(tmp_path)] == ["tail"]
+    finally:
+        sink.close()
+    assert sink._flusher is None
+
+
+def test_unclosed_jsonl_sink_is_flushed_when_collected(tmp_path):
+    import gc
+
+    sink = JsonlSink(tmp_path, batch_size=100, fsync_interval=60)
+    sink.write(NewsItem(title="orphan"), "k")
+    del sink
+    gc.collect()
+    # 未 close 的 sink 被回收时，缓冲中的条目仍会写入文件
+    assert [item.title for item in iter_news_items(tmp_path)] == ["orphan"]
+
+
+def test_item_sink_requires_write():
+    from news_crawler.core.sinks import ItemSink
+
+    class IncompleteSink(ItemSink):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSink()
@@ -0,0 +1,216 @@
+"""
+图片代理测试：异步流式转发、内容寻址磁盘缓存、ETag/Range、大小上限（离线）
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from news_extractor_backend.api import proxy as proxy_api
+from news_extractor_core.services import (
+    ImageDownloader,
+    ImageStore,
+    configure_image_downloader,
+    configure_image_store,
+)
+
+IMAGE = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def proxy_app(monkeypatch, tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if request.url.path == "/huge.jpg":
+            return httpx.Response(200, headers={"content-length": str(10 ** 9)})
+        if request.url.path == "/missing.jpg":
+            return httpx.Response(404)
+        if request.url.path == "/unbounded.jpg":
+            # 不带 Content-Length 的分块响应
+            async def chunks():
+                for _ in range(4):
+                    yield IMAGE
+
+            return httpx.Response(200, content=chunks())
+        return httpx.Response(200, content=IMAGE, headers={"content-type": "image/png", "etag": '"v1"'})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(proxy_api, "get_async_client", lambda kind: upstream)
+    store = configure_image_store(ImageStore(str(tmp_path / "store"), max_bytes=1024 * 1024))
+    downloader = configure_image_downloader(ImageDownloader(max_concurrency=2, per_host=1))
+    app = FastAPI()
+    app.include_router(proxy_api.router, prefix="/api/proxy")
+    yield app, calls, store
+    # 每个上游请求结束后都归还下载名额
+    assert downloader.stats()["running"] == 0
+    configure_image_store(None)
+    configure_image_downloader(None)
+
+
+def _run(app, *requests):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get("/api/proxy/image", params={"url": url}, headers=headers)
+                    for url, headers in requests]
+
+    return asyncio.run(main())
+
+
+def test_proxy_streams_then_serves_from_cache(proxy_app):
+    app, calls, store = proxy_app
+    url = "https://mmbiz.qpic.cn/a.png"
+    miss, hit, not_modified, partial = _run(
+        app,
+        (url, {}),
+        (url, {}),
+        (url, {"If-None-Match": '"v1"'}),
+        (url, {"Range": "bytes=10-19"}),
+    )
+    assert miss.headers["x-proxy-cache"] == "MISS" and miss.content == IMAGE
+    assert calls[0].headers["referer"] == "https://mp.weixin.qq.com/"
+    # 之后的请求不再访问上游
+    assert len(calls) == 1
+    assert hit.headers["x-proxy-cache"] == "HIT" and hit.content == IMAGE
+    assert hit.headers["content-type"] == "image/png" and hit.headers["etag"] == '"v1"'
+    assert not_modified.status_code == 304
+    assert partial.status_code == 206 and partial.content == IMAGE[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(IMAGE)}"
+    assert store.stats()["blobs"] == 1
+
+
+def test_proxy_rejects_oversized_and_failed_images(proxy_app):
+    app, calls, store = proxy_app
+    huge, missing, bad_scheme = _run(
+        app,
+        ("https://cdn.example.com/huge.jpg", {}),
+        ("https://cdn.example.com/missing.jpg", {}),
+        ("file:///etc/passwd", {}),
+    )
+    assert huge.status_code == 413
+    assert missing.status_code == 404
+    assert bad_scheme.status_code == 400
+    assert store.stats()["blobs"] == 0
+
+
+def test_proxy_cleans_up_when_client_leaves_before_body(proxy_app):
+    app, calls, store = proxy_app
+    downloader = proxy_api.get_image_downloader()
+
+    async def main():
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/proxy/image", "raw_path": b"/api/proxy/image",
+            "query_string": b"url=https://cdn.example.com/gone.png", "headers": [],
+            "server": ("test", 80), "client": ("test", 1234), "root_path": "",
+        }
+
+        async def receive():
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            # 发送响应头时客户端已断开，body() 不会被迭代
+            raise OSError("client disconnected")
+
+        with pytest.raises(OSError):
+            await app(scope, receive, send)
+        for _ in range(100):
+            if not proxy_api._pump_tasks:
+                break
+            await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert downloader.stats()["running"] == 0
+    assert list(store.tmp_dir.iterdir()) == []
+    # 上游已完整读取，图片照常写入缓存
+    assert store.get("https://cdn.example.com/gone.png").size == len(IMAGE)
+
+
+def test_proxy_aborts_oversized_stream_without_length(proxy_app, monkeypatch):
+    app, calls, store = proxy_app
+    monkeypatch.setattr(proxy_api, "PROXY_MAX_BYTES", len(IMAGE) * 2)
+    # 响应头已经发出，不能再返回 413：中止传输，而不是返回截断的 200
+    with pytest.raises(proxy_api.UpstreamTooLarge):
+        _run(app, ("https://cdn.example.com/unbounded.jpg", {}))
+    assert store.stats()["blobs"] == 0
+    assert list(store.tmp_dir.iterdir()) == []
+
+
+def test_image_store_deduplicates_and_evicts(tmp_path):
+    store = ImageStore(str(tmp_path), max_bytes=2500)
+    first = store.put_bytes("https://a.com/1.jpg", b"x" * 1000)
+    same = store.put_bytes("https://b.com/copy.jpg", b"x" * 1000)
+    assert same.sha256 == first.sha256 and store.stats()["deduplicated"] == 1
+    store.put_bytes("https://a.com/2.jpg", b"y" * 1000)
+    store.get("https://a.com/1.jpg")
+    # 超过上限时淘汰最久未访问的 blob（2.jpg），刚访问过的 1.jpg 保留
+    store.put_bytes("https://a.com/3.jpg", b"z" * 1000)
+    assert store.get("https://a.com/2.jpg") is None
+    assert store.get("https://b.com/copy.jpg").size == 1000
+    assert store.stats()["bytes"] == 2000
+
+
+def test_proxy_releases_download_slot_before_client_finishes(proxy_app):
+    app, calls, store = proxy_app
+    downloader = proxy_api.get_image_downloader()
+    running = []
+
+    async def main():
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/api/proxy/image", "raw_path": b"/api/proxy/image",
+            "query_string": b"url=https://cdn.example.com/slow-client.png", "headers": [],
+            "server": ("test", 80), "client": ("test", 1234), "root_path": "",
+        }
+
+        async def receive():
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                # 模拟接收很慢的客户端：上游已读完，名额应已归还
+                await asyncio.sleep(0.05)
+                running.append(downloader.stats()["running"])
+
+        await app(scope, receive, send)
+
+    asyncio.run(main())
+    assert running and running[0] == 0
+    assert store.get("https://cdn.example.com/slow-client.png").size == len(IMAGE)
+
+
+def test_image_store_concurrent_puts_and_gets_stay_consistent(tmp_path):
+    store = ImageStore(str(tmp_path), max_bytes=20 * 1000)
+    errors = []
+
+    def worker(seed):
+        for idx in range(60):
+            key = (seed + idx) % 30
+            other = (key + 7) % 30
+            try:
+                store.put_bytes(f"https://a.com/{key}.jpg", bytes([key]) * 1000)
+                image = store.get(f"https://a.com/{other}.jpg")
+                if image is not None:
+                    with open(image.path, "rb") as f:
+                        # 读到的总是完整且正确的内容
+                        assert f.read() == bytes([other]) * 1000
+            except FileNotFoundError:
+                pass  # 读之前刚好被其他线程淘汰
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert store.stats()["bytes"] <= 20 * 1000
+    # 磁盘上没有索引之外的 blob，也没有遗留的临时文件
+    on_disk = {path.name for path in (tmp_path / "blobs").glob("*/*")}
+    assert on_disk <= set(store._index)
+    assert list(store.tmp_dir.iterdir()) == []
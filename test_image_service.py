@@ -0,0 +1,225 @@
+"""
+图片服务测试：共享图片存储去重、文章目录链接、重复导出不访问网络、流式限额下载、
+共享下载引擎的并发上限与主机轮转（离线）
+"""
+import base64
+import io
+import os
+import threading
+import time
+
+import pytest
+
+from news_crawler.core.sessions import SessionPool
+from news_extractor_core.models import NewsItem
+from news_extractor_core.services import ImageDownloader, ImageService, ImageStore, to_markdown
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+class FakeResponse:
+    def __init__(self, chunks, status_code=200, headers=None):
+        self.chunks = chunks
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.consumed = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, calls, responses):
+        self.calls = calls
+        self.responses = responses or {}
+
+    def get(self, url, stream=False, **kwargs):
+        assert stream
+        self.calls.append(url)
+        return self.responses.get(url) or FakeResponse([PNG[:4], PNG[4:]])
+
+    def close(self):
+        pass
+
+
+def _service(monkeypatch, store, calls, responses=None):
+    pool = SessionPool(lambda config: FakeSession(calls, responses))
+    return ImageService(store=store, downloader=ImageDownloader(max_concurrency=4, pool=pool))
+
+
+def test_repeated_exports_reuse_store(monkeypatch, tmp_path):
+    store = ImageStore(str(tmp_path / "store"))
+    calls = []
+    service = _service(monkeypatch, store, calls)
+    urls = ["https://cdn.a.com/1", "https://cdn.b.com/same-image"]
+
+    first = service.download_to_local(urls, str(tmp_path / "article1"))
+    second = service.download_to_local(urls, str(tmp_path / "article2"))
+    embedded = service.download_images(urls)
+
+    # 每个 URL 只下载一次（不同主机并发下载，顺序不定），内容相同的两张图只存一个 blob
+    assert sorted(calls) == sorted(urls)
+    assert store.stats()["blobs"] == 1
+    assert first[urls[0]].endswith("1.png") and second[urls[1]].endswith("2.png")
+    assert os.path.samefile(first[urls[0]], second[urls[1]])
+    assert embedded[urls[0]].mime_type == "image/png" and embedded[urls[0]].success
+
+
+def test_markdown_export_uses_store(monkeypatch, tmp_path):
+    from news_extractor_core.services import formatter
+
+    store = ImageStore(str(tmp_path / "store"))
+    calls = []
+    service = _service(monkeypatch, store, calls)
+    monkeypatch.setattr(formatter, "ImageService",
+                        lambda platform="default": ImageService(platform, store=store, downloader=service.downloader))
+    item = NewsItem({"title": "t", "news_url": "https://a.com/n", "news_id": "n1",
+                     "images": ["https://cdn.a.com/1"],
+                     "contents": [{"type": "image", "content": "https://cdn.a.com/1"}]})
+
+    for _ in range(2):
+        markdown = to_markdown(item, save_images_locally=True, images_dir=str(tmp_path / "n1"))
+    assert calls == ["https://cdn.a.com/1"]
+    assert os.path.exists(tmp_path / "n1" / "1.png")
+    assert "1.png" in markdown
+
+
+def test_streamed_download_is_size_capped(monkeypatch, tmp_path):
+    store = ImageStore(str(tmp_path / "store"))
+    monkeypatch.setattr(ImageService, "MAX_IMAGE_SIZE", 100)
+    monkeypatch.setattr(ImageService, "CHUNK_SIZE", 5)  # Base64 按 15 字节分块编码
+    declared = FakeResponse([b"x" * 50] * 10, headers={"content-length": "500"})
+    undeclared = FakeResponse([b"GIF89a" + b"x" * 44] * 10)
+    service = _service(monkeypatch, store, [], {"https://a.com/declared": declared,
+                                                 "https://a.com/undeclared": undeclared})
+
+    results = service.download_images(["https://a.com/declared", "https://a.com/undeclared", "https://a.com/ok"])
+
+    # 声明长度超限时不读取内容；未声明长度时在超过预算的那一块中止
+    assert not results["https://a.com/declared"].success and declared.consumed == 0
+    assert not results["https://a.com/undeclared"].success and undeclared.consumed == 3
+    assert declared.closed and undeclared.closed
+    ok = results["https://a.com/ok"]
+    assert ok.mime_type == "image/png" and base64.b64decode(ok.base64_data) == PNG
+    assert store.stats()["blobs"] == 1 and not os.listdir(store.tmp_dir)
+
+
+def test_downloader_caps_concurrency_and_rotates_hosts():
+    downloader = ImageDownloader(max_concurrency=2, per_host=1)
+    gate = threading.Event()
+    order, active, peak = [], [], []
+    lock = threading.Lock()
+
+    def job(name):
+        with lock:
+            active.append(name)
+            peak.append(len(active))
+            order.append(name)
+        gate.wait(5)
+        with lock:
+            active.remove(name)
+        return name
+
+    futures = [downloader.submit(f"https://{host}.com/{idx}", job, f"{host}{idx}")
+               for host, idx in [("a", 1), ("a", 2), ("a", 3), ("b", 1), ("b", 2), ("c", 1)]]
+    time.sleep(0.1)
+    # 同一主机最多 1 个，全局最多 2 个
+    assert order == ["a1", "b1"]
+    gate.set()
+    assert [f.result() for f in futures] == ["a1", "a2", "a3", "b1", "b2", "c1"]
+    assert max(peak) == 2
+    # 名额空出后先服务从未被服务过的主机 c，而不是继续排在前面的 a
+    assert order.index("c1") < order.index("a3")
+    assert downloader.stats()["running"] == 0
+    downloader.shutdown()
+
+
+def test_embed_transcoding_shrinks_and_caches(monkeypatch, tmp_path):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    from news_extractor_core.services import ImageTranscoder, TranscodeOptions
+
+    buffer = io.BytesIO()
+    Image.effect_noise((1600, 1200), 64).convert("RGB").save(buffer, format="PNG")
+    big_png = buffer.getvalue()
+    store = ImageStore(str(tmp_path / "store"))
+    calls = []
+    service = _service(monkeypatch, store, calls, {"https://a.com/big.png": FakeResponse([big_png])})
+    monkeypatch.setattr(ImageService, "MAX_IMAGE_SIZE", 10 * 1024 * 1024)
+    transcoder = ImageTranscoder(store=store, max_workers=1)
+    service.transcode = TranscodeOptions(max_dimension=400, format="webp", quality=70)
+    service._transcoder = transcoder
+    running = []
+    transcode_many = transcoder.transcode_many
+
+    def tracking_transcode_many(images, options):
+        # 转码时下载名额已经归还
+        running.append(service.downloader.stats()["running"])
+        return transcode_many(images, options)
+
+    monkeypatch.setattr(transcoder, "transcode_many", tracking_transcode_many)
+
+    try:
+        first = service.download_images(["https://a.com/big.png"])["https://a.com/big.png"]
+        assert transcoder._executor._mp_context.get_start_method() == "spawn"
+        # 第二次必须命中 (内容哈希, 参数) 缓存，不再提交到进程池
+        monkeypatch.setattr(transcoder, "_pool", lambda: pytest.fail("transcoded twice"))
+        second = service.download_images(["https://a.com/big.png"])["https://a.com/big.png"]
+    finally:
+        transcoder.shutdown()
+
+    assert first.success and first.mime_type == "image/webp"
+    assert second.base64_data == first.base64_data
+    data = base64.b64decode(first.base64_data)
+    assert len(data) < len(big_png)
+    assert max(Image.open(io.BytesIO(data)).size) == 400
+    assert calls == ["https://a.com/big.png"]
+    assert running == [0, 0]
+
+
+def test_transcode_retries_after_worker_crash(tmp_path):
+    pytest.importorskip("PIL")
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    from PIL import Image
+
+    from news_extractor_core.services import ImageTranscoder, TranscodeOptions
+
+    buffer = io.BytesIO()
+    Image.effect_noise((800, 600), 64).convert("RGB").save(buffer, format="PNG")
+    store = ImageStore(str(tmp_path / "store"))
+    original = store.put_bytes("https://a.com/p.png", buffer.getvalue(), "image/png")
+    svg = store.put_bytes("https://a.com/p.svg", b"<svg xmlns='http://www.w3.org/2000/svg'/>", "image/svg+xml")
+    options = TranscodeOptions(max_dimension=200)
+
+    class CrashedPool:
+        def submit(self, *args):
+            future = Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            return future
+
+        def shutdown(self, **kwargs):
+            pass
+
+    transcoder = ImageTranscoder(store=store, max_workers=1)
+    transcoder._executor = CrashedPool()
+    try:
+        # 进程崩溃：本次返回原图，不写缓存，并丢弃坏掉的进程池
+        assert transcoder.transcode(original, options) is original
+        assert store.get(f"transcode:{original.sha256}:{options.key}") is None
+        assert transcoder._executor is None
+        retried, unsupported = transcoder.transcode_many([original, svg], options)
+    finally:
+        transcoder.shutdown()
+    assert retried.content_type == "image/webp" and retried.size < original.size
+    # 无法识别的格式是确定的结果，按原图缓存
+    assert unsupported.sha256 == svg.sha256
+    assert store.get(f"transcode:{svg.sha256}:{options.key}") is not None
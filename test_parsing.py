@@ -0,0 +1,146 @@
+"""
+解析层测试：文档只解析一次等（离线，无需外网）
+"""
+import pytest
+
+from news_crawler.bbc_news import BBCNewsCrawler
+from news_crawler.core import document as document_module
+from news_crawler.core import ParsedDocument, as_document
+from news_crawler.wechat_news import WeChatNewsCrawler
+
+BBC_HTML = """
+<html><body>
+<h1>Headline</h1>
+<time datetime="2025-01-01T00:00:00Z">1 Jan</time>
+<div data-component="byline-block"><p>Jane Doe</p></div>
+<article>
+  <figure><img src="//ichef.bbci.co.uk/cover.jpg"/><figcaption>Cover</figcaption></figure>
+  <div data-component="text-block"><p>First paragraph.</p><p>Second paragraph.</p></div>
+</article>
+</body></html>
+"""
+
+WECHAT_HTML = """
+<html><body>
+<h1 id="activity-name">  公众号标题 </h1>
+<span id="profileBt">某公众号</span>
+<script>var createTime = '2025-01-01 08:00';</script>
+<div id="js_content"><p>正文第一段</p><section><img data-src="https://mmbiz.qpic.cn/a.jpg"/></section></div>
+</body></html>
+"""
+
+
+@pytest.fixture
+def selector_builds(monkeypatch):
+    builds = []
+    original = document_module.CompiledSelector
+
+    def counting_selector(*args, **kwargs):
+        builds.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(document_module, "CompiledSelector", counting_selector)
+    return builds
+
+
+def test_bbc_parses_document_once(selector_builds, tmp_path):
+    crawler = BBCNewsCrawler("https://www.bbc.com/news/articles/abc123", save_path=str(tmp_path))
+    item = crawler.parse_content(BBC_HTML)
+    assert item.title == "Headline"
+    assert item.meta_info.author_name == "Jane Doe"
+    assert [c.content for c in item.contents][:2] == [
+        "https://ichef.bbci.co.uk/cover.jpg",
+        "First paragraph.",
+    ]
+    assert len(selector_builds) == 1
+
+
+def test_wechat_parses_document_once(selector_builds, tmp_path):
+    crawler = WeChatNewsCrawler("https://mp.weixin.qq.com/s/abc", save_path=str(tmp_path))
+    item = crawler.parse_content(WECHAT_HTML)
+    assert item.title == "公众号标题"
+    assert item.meta_info.publish_time == "2025-01-01 08:00"
+    assert [c.content for c in item.contents] == ["正文第一段", "https://mmbiz.qpic.cn/a.jpg"]
+    assert len(selector_builds) == 1
+
+
+def test_hooks_still_accept_raw_html(tmp_path):
+    crawler = BBCNewsCrawler("https://www.bbc.com/news/articles/abc123", save_path=str(tmp_path))
+    assert crawler.parse_html_to_news_meta(BBC_HTML).author_name == "Jane Doe"
+    document = as_document(BBC_HTML)
+    assert as_document(document) is document
+    assert isinstance(crawler.parse_document(BBC_HTML), ParsedDocument)
+
+
+def test_compiled_selector_matches_parsel():
+    from parsel import Selector
+
+    from news_crawler.core.selectors import CompiledSelector, compile_css, compile_xpath
+
+    plain = Selector(text=BBC_HTML)
+    compiled = CompiledSelector(text=BBC_HTML)
+    for query in ("//h1/text()", "string(//article)", "//time/@datetime", "//nothing"):
+        assert compiled.xpath(query).getall() == plain.xpath(query).getall()
+    # 子节点上的相对查询同样走预编译
+    figure = compiled.xpath("//figure")[0]
+    assert isinstance(figure, CompiledSelector)
+    assert figure.xpath(".//img/@src").get() == "//ichef.bbci.co.uk/cover.jpg"
+    assert compiled.css("div[data-component=text-block] p::text").getall() == [
+        "First paragraph.",
+        "Second paragraph.",
+    ]
+    assert compile_xpath("//h1") is compile_xpath("//h1")
+    assert compile_css("h1, .title") is compile_css("h1, .title")
+    with pytest.raises(ValueError):
+        compiled.xpath("//h1[")
+
+
+ENHANCED_HTML = """<?xml version="1.0" encoding="utf-8"?>
+<html><body>
+<div class="ad">广告</div>
+<h1 class="headline__text">Title <b>bold</b></h1>
+<span class="byline__name"> Reporter </span>
+<div class="timestamp"><time datetime="2025-02-03">Feb 3</time></div>
+<div class="article__content">
+  <p>First <!-- note --> para<script>var x = 1;</script></p>
+  <div class="ad">inline ad</div>
+  <h2>Section</h2>
+  <img src="/img/a.jpg" alt="A"/>
+  <img data-src="//cdn.example.com/b.jpg"/>
+  <video><source src="/v.mp4"/></video>
+  <p>Last para</p>
+</div>
+</body></html>
+"""
+
+
+@pytest.mark.filterwarnings("ignore:It looks like you're using an HTML parser")
+@pytest.mark.parametrize("backend", ["lxml", "selectolax"])
+def test_enhanced_backends_match_beautifulsoup(backend):
+    if backend == "selectolax":
+        pytest.importorskip("selectolax.lexbor")
+    from news_crawler.sites.enhanced_crawlers import CNNCrawler
+
+    def parse(name):
+        crawler_cls = type("BackendCrawler", (CNNCrawler,), {"dom_backend": name})
+        crawler = crawler_cls("https://www.cnn.com/2025/a")
+        assert crawler.dom.name == name
+        item = crawler.parse_content(ENHANCED_HTML)
+        return item.title, item.meta_info, [(c.type, c.content) for c in item.contents]
+
+    expected = parse("bs4")
+    assert expected[0] == "Titlebold"
+    assert parse(backend) == expected
+
+
+def test_dom_backend_requires_full_interface():
+    from news_crawler.core.dom import DomBackend
+
+    class PartialBackend(DomBackend):
+        name = "partial"
+
+        def parse(self, html):
+            return html
+
+    with pytest.raises(TypeError):
+        PartialBackend()
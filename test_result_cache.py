@@ -0,0 +1,93 @@
+"""
+提取结果缓存测试：TTL/LRU、磁盘层、并发请求合并（离线）
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from news_extractor_core.models import NewsItem
+from news_extractor_core.services import ExtractorService, ResultCache, configure_result_cache
+from news_extractor_core.services import extractor as extractor_module
+
+
+class _SlowAdapter:
+    platform_name = "bbc"
+
+    def __init__(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def extract(self, url):
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.2)
+        return NewsItem({"title": "标题", "news_url": url, "contents": [{"type": "text", "content": "正文"}]})
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = _SlowAdapter()
+    monkeypatch.setitem(extractor_module.ADAPTERS, "bbc", adapter)
+    yield adapter
+    configure_result_cache(None)
+
+
+def test_concurrent_requests_share_one_extraction(adapter):
+    cache = configure_result_cache(ResultCache(ttl=60))
+    urls = [
+        "https://www.bbc.com/news/articles/abc",
+        "https://www.bbc.com/news/articles/abc?utm_source=twitter",
+        "https://www.bbc.com/news/articles/abc#top",
+    ] * 3
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        results = list(pool.map(ExtractorService.extract_news, urls))
+    assert adapter.calls == 1
+    assert {platform for _, platform in results} == {"bbc"}
+    assert cache.stats()["coalesced"] + cache.stats()["hits"] == len(urls) - 1
+
+    # 命中缓存返回的是副本，修改不会影响缓存
+    results[0][0].contents.clear()
+    item, _ = ExtractorService.extract_news(urls[0])
+    assert item.contents == [{"type": "text", "content": "正文"}]
+    # 带 Cookie 或显式关闭缓存时总是重新抓取
+    ExtractorService.extract_news(urls[0], use_cache=False)
+    assert adapter.calls == 2
+
+
+def test_ttl_lru_and_disk_tier(adapter, tmp_path):
+    cache = ResultCache(ttl=60, max_entries=1, disk_dir=str(tmp_path))
+    item = NewsItem({"title": "a", "news_url": "https://x.com/a"})
+    cache.put("bbc:a", item, "bbc")
+    cache.put("bbc:b", item, "bbc")
+    assert list(cache._entries) == ["bbc:b"]
+    # 内存中被淘汰的条目仍可从磁盘层读回
+    cached, platform = cache.get("bbc:a")
+    assert cached.title == "a" and platform == "bbc"
+    assert ResultCache(ttl=60, disk_dir=str(tmp_path)).get("bbc:b")[0].news_url == "https://x.com/a"
+
+    expired = ResultCache(ttl=0.05)
+    expired.put("k", item, "bbc")
+    time.sleep(0.1)
+    assert expired.get("k") is None
+
+
+def test_errors_are_shared_but_not_cached(monkeypatch):
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    cache = ResultCache(ttl=60)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get_or_extract, "k", failing) for _ in range(4)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result()
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        cache.get_or_extract("k", failing)
+    assert len(calls) == 2
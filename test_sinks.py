@@ -0,0 +1,75 @@
+"""
+持久化 sink 测试：滚动 JSONL、zstd 压缩、流式读取（离线）
+"""
+import json
+
+import pytest
+
+from news_crawler.core import (
+    BaseNewsCrawler,
+    ContentItem,
+    JsonFileSink,
+    JsonlSink,
+    NewsItem,
+    NewsMetaInfo,
+    configure_default_sink,
+    iter_jsonl,
+    iter_news_items,
+)
+
+
+class _StaticCrawler(BaseNewsCrawler):
+    def parse_content(self, html: str) -> NewsItem:
+        return self.compose_news_item(
+            title=html,
+            meta_info=NewsMetaInfo(),
+            contents=[ContentItem(content=html)],
+        )
+
+    def get_article_id(self) -> str:
+        return self.new_url.rsplit("/", 1)[-1]
+
+
+def _items(count):
+    crawler = _StaticCrawler("https://example.com/x")
+    return [crawler.parse_content(f"标题{idx}") for idx in range(count)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_jsonl_sink_rolls_and_streams_back(tmp_path, compress):
+    if compress:
+        pytest.importorskip("zstandard")
+    items = _items(50)
+    with JsonlSink(tmp_path, compress=compress, batch_size=8, max_file_bytes=1024) as sink:
+        for idx, item in enumerate(items):
+            sink.write(item, str(idx))
+        # 未满一批的数据在 flush 之前只在内存中
+        assert sum(1 for _ in iter_jsonl(tmp_path)) == 48
+    files = sorted(tmp_path.iterdir())
+    assert len(files) > 1
+    assert all(f.name.endswith(".jsonl.zst" if compress else ".jsonl") for f in files)
+    assert [item.title for item in iter_news_items(tmp_path)] == [item.title for item in items]
+
+
+def test_jsonl_reader_skips_truncated_tail(tmp_path):
+    path = tmp_path / "items.jsonl"
+    path.write_text(json.dumps({"a": 1}) + "\n" + '{"a": ', encoding="utf-8")
+    assert list(iter_jsonl(path)) == [{"a": 1}]
+
+
+def test_crawler_persists_through_sink(tmp_path):
+    crawler = _StaticCrawler("https://example.com/a1", save_path=str(tmp_path / "json"))
+    item = crawler.parse_content("正文")
+    # 默认仍为每篇文章一个 JSON 文件
+    saved = crawler.save_item(item)
+    assert saved == crawler.get_save_json_path()
+    assert json.loads((tmp_path / "json" / "a1.json").read_text(encoding="utf-8"))["title"] == "正文"
+    assert JsonFileSink(tmp_path / "other").write(item, "a1").endswith("a1.json")
+
+    sink = configure_default_sink(JsonlSink(tmp_path / "jsonl", batch_size=1))
+    try:
+        crawler.save_item(item)
+    finally:
+        configure_default_sink(None)
+    assert [i.title for i in iter_news_items(tmp_path / "jsonl")] == ["正文"]
+    assert sink.current_path.exists()
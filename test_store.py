@@ -0,0 +1,202 @@
+"""
+SQLite 存储与调度器测试：持久化、键集分页、批量写入、URL 去重、堆调度（离线）
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from news_crawler.core import NewsItem
+from news_crawler.scheduler import NewsScheduler
+from news_crawler.store import Article, CrawlerHistory, CrawlerTask, SQLiteSink, SQLiteStore
+
+
+def _article(idx, source_id="cnn", created_at=None):
+    return Article(
+        id=0,
+        source_id=source_id,
+        article_id=f"a{idx}",
+        title=f"标题{idx}",
+        url=f"https://Example.com/news/{idx}?utm_source=x",
+        author=None,
+        publish_time=None,
+        summary=None,
+        category=None,
+        created_at=created_at or datetime(2025, 1, 1) + timedelta(minutes=idx),
+    )
+
+
+def test_store_survives_restart(tmp_path):
+    db_path = str(tmp_path / "db" / "scheduler.db")
+    scheduler = NewsScheduler(db_path=db_path)
+    scheduler.register_crawler("cnn", object, "CNN", "https://www.cnn.com", "美国")
+    scheduler.init_tasks_from_config(interval_minutes=30)
+    task = scheduler.db.get_task_by_source_id("cnn")
+    scheduler.db.add_history(CrawlerHistory(
+        id=0, task_id=task.id, source_id="cnn", url=task.url, status="success",
+        articles_count=3, error_message=None, crawl_time=datetime.now(), duration_seconds=1.5,
+    ))
+    scheduler.db.close()
+
+    reopened = SQLiteStore(db_path)
+    assert reopened._query("PRAGMA journal_mode")[0][0] == "wal"
+    restored = reopened.get_task_by_source_id("cnn")
+    assert restored.interval_minutes == 30 and restored.country == "美国"
+    assert reopened.get_history_by_task_id(restored.id)[0].duration_seconds == 1.5
+    assert reopened.count_history_by_status(datetime.now() - timedelta(hours=1)) == {"success": 1}
+
+
+def test_keyset_pagination_over_articles():
+    store = SQLiteStore()
+    store.add_articles([_article(idx, "cnn" if idx % 2 else "bbc") for idx in range(25)])
+    # 相同时间戳的记录按 id 排序，不会在翻页时丢失
+    store.add_articles([_article(100 + idx, "cnn", datetime(2024, 1, 1)) for idx in range(3)])
+
+    seen, cursor = [], None
+    while True:
+        page = store.list_articles(source_id="cnn", cursor=cursor, limit=4)
+        seen.extend(a.article_id for a in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    expected = [f"a{idx}" for idx in range(23, 0, -2)] + ["a102", "a101", "a100"]
+    assert seen == expected
+    assert [a.article_id for a in store.get_articles_by_source("bbc", limit=2)] == ["a24", "a22"]
+    assert len(store.find_articles_by_url("https://example.com/news/3")) == 1
+    with pytest.raises(ValueError):
+        store.list_articles(cursor="bogus")
+
+
+def test_news_items_deduplicate_by_canonical_url():
+    store = SQLiteStore()
+    sink = SQLiteSink(store, source_id="bbc", batch_size=2)
+    sink.write(NewsItem(title="v1", news_url="https://bbc.com/a?utm_medium=rss", news_id="a"), "a")
+    assert store.get_news_item_by_url("https://bbc.com/a") is None
+    sink.write(NewsItem(title="b", news_url="https://bbc.com/b", news_id="b"), "b")
+    sink.write(NewsItem(title="v2", news_url="https://BBC.com/a", news_id="a"), "a")
+    sink.close()
+    assert store.get_news_item_by_url("https://bbc.com/a").title == "v2"
+    assert [item.title for item in store.get_news_items_by_news_id("a")] == ["v2"]
+    assert len(store.list_news_items(source_id="bbc").items) == 2
+
+
+def test_history_api_pages_with_cursor_header(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from news_extractor_backend.api import scheduler as api
+
+    scheduler = NewsScheduler()
+    scheduler.db.add_task(CrawlerTask(id=0, source_id="cnn", source_name="CNN", url="", country="美国"))
+    scheduler.db.add_history_batch([
+        CrawlerHistory(
+            id=0, task_id=1, source_id="cnn", url="", status="failed" if idx == 2 else "success",
+            articles_count=idx, error_message=None,
+            crawl_time=datetime(2025, 1, 1) + timedelta(hours=idx), duration_seconds=0.1,
+        )
+        for idx in range(5)
+    ])
+    monkeypatch.setattr(api, "_scheduler", scheduler)
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    client = TestClient(app)
+
+    first = client.get("/api/history", params={"source_id": "cnn", "limit": 3})
+    assert [h["articles_count"] for h in first.json()] == [4, 3, 2]
+    second = client.get("/api/history", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+    assert [h["articles_count"] for h in second.json()] == [1, 0]
+    assert "X-Next-Cursor" not in second.headers
+    failed = client.get("/api/history", params={"status": "failed"})
+    assert [h["articles_count"] for h in failed.json()] == [2]
+    assert client.get("/api/articles", params={"cursor": "bogus"}).status_code == 400
+
+
+def test_heap_scheduler_runs_sub_minute_tasks_without_blocking():
+    release = threading.Event()
+    calls = {"fast": 0, "slow": 0}
+
+    def factory(source_id):
+        def build():
+            calls[source_id] += 1
+            if source_id == "slow":
+                release.wait(5)
+        return build
+
+    scheduler = NewsScheduler(max_workers=2, jitter_ratio=0)
+    for source_id in calls:
+        scheduler.register_crawler(source_id, factory(source_id))
+    scheduler.init_tasks_from_config(interval_minutes=0.1 / 60)
+    scheduler.start()
+    try:
+        deadline = time.time() + 5
+        while calls["fast"] < 5 and time.time() < deadline:
+            time.sleep(0.05)
+        # 慢源仍在执行时快源照常按 0.1 秒间隔运行，且慢源不会重叠执行
+        assert calls["fast"] >= 5
+        assert calls["slow"] == 1
+        release.set()
+    finally:
+        scheduler.stop()
+    assert scheduler.db.count_history_by_status(datetime(2000, 1, 1))["success"] >= 6
+
+
+def test_manual_runs_respect_host_caps_and_never_overlap(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from news_extractor_backend.api import scheduler as api
+
+    release = threading.Event()
+    scheduler = NewsScheduler(max_workers=2, max_per_host=1)
+    urls = {"a1": "https://a.com/x", "a2": "https://a.com/y", "b": "https://b.com/", "a3": "https://a.com/z"}
+    for source_id, url in urls.items():
+        scheduler.register_crawler(source_id, lambda: release.wait(5), url=url)
+    scheduler.init_tasks_from_config()
+    monkeypatch.setattr(api, "_scheduler", scheduler)
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    client = TestClient(app)
+
+    for source_id in urls:
+        assert client.post(f"/api/tasks/{source_id}/run").status_code == 200
+    assert client.post("/api/tasks/a1/run").status_code == 409
+    status = client.get("/api/scheduler/status").json()
+    assert status["in_flight_sources"] == ["a1", "b"]
+    assert status["queue_depth"] == 2
+    assert status["in_flight_by_host"] == {"a.com": 1, "b.com": 1}
+
+    release.set()
+    deadline = time.time() + 5
+    while client.get("/api/scheduler/status").json()["in_flight"] and time.time() < deadline:
+        time.sleep(0.05)
+    assert scheduler.get_status()["queue_depth"] == 0
+    assert scheduler.db.count_history_by_status(datetime(2000, 1, 1)) == {"success": 4}
+
+
+def test_task_update_during_run_is_not_reverted():
+    started, release = threading.Event(), threading.Event()
+
+    def build():
+        started.set()
+        release.wait(5)
+
+    scheduler = NewsScheduler(max_workers=1)
+    scheduler.register_crawler("cnn", build, url="https://cnn.com/")
+    scheduler.init_tasks_from_config(interval_minutes=60)
+    assert scheduler.run_now(scheduler.db.get_task_by_source_id("cnn"))
+    assert started.wait(5)
+    # 执行期间修改配置（等同 PATCH /api/tasks/cnn）
+    task = scheduler.db.get_task_by_source_id("cnn")
+    task.enabled, task.interval_minutes = False, 5
+    scheduler.update_task(task)
+    release.set()
+    deadline = time.time() + 5
+    while scheduler.is_busy("cnn") and time.time() < deadline:
+        time.sleep(0.02)
+
+    task = scheduler.db.get_task_by_source_id("cnn")
+    assert (task.enabled, task.interval_minutes) == (False, 5)
+    assert task.last_crawl_time is not None
+    # 下次执行时间按新间隔计算
+    assert task.next_crawl_time - task.last_crawl_time <= timedelta(minutes=5 * 1.2)